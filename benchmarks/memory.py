@@ -0,0 +1,71 @@
+# Reports the bytes used per sentence node and per truth assignment, against
+# equivalent objects that keep their state in a per instance __dict__
+import sys
+import tracemalloc
+from os.path import realpath, abspath, dirname, join
+
+sys.path = [realpath(join(dirname(abspath(__file__)), '..'))] + sys.path
+
+from logic.language import PropositionalConstant, PropositionalVocabulary
+from logic.syntax import SimpleSentence, Negation, Conjunction
+
+NUM_OBJECTS = 100000
+NUM_CONSTANTS = 20
+
+class DictSentence(object):
+    def __init__(self, sub_sentences, **fields):
+        self._sub_sentences = sub_sentences
+        self._hash = hash(sub_sentences)
+        self._depth = 1
+        self._all_constants = None
+        self._compiled = None
+        self.__dict__.update(fields)
+
+class DictTruthAssignment(object):
+    def __init__(self, constants_to_value):
+        self._constants_to_value = constants_to_value
+
+def measure(create):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [create(i) for i in range(NUM_OBJECTS)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return float(after - before) / NUM_OBJECTS
+
+def report(name, slotted, with_dict):
+    print("%-12s %8.1f bytes  (__dict__: %8.1f bytes, saved %5.1f%%)" % (
+        name, slotted, with_dict, 100 * (with_dict - slotted) / with_dict
+    ))
+
+def main():
+    leaf = SimpleSentence(PropositionalConstant("a"))
+    other = SimpleSentence(PropositionalConstant("b"))
+
+    report(
+        "negation",
+        measure(lambda i: Negation(leaf)),
+        measure(lambda i: DictSentence((leaf, ), _target=leaf))
+    )
+    report(
+        "conjunction",
+        measure(lambda i: Conjunction(leaf, other)),
+        measure(lambda i: DictSentence((leaf, other), _conjunct_1=leaf, _conjunct_2=other))
+    )
+
+    vocab = PropositionalVocabulary.from_constant_names(
+        ["c%d" % i for i in range(NUM_CONSTANTS)]
+    )
+    assignments = vocab.iter_assignments()
+    constants = vocab.ordered_constants
+    report(
+        "assignment",
+        measure(lambda i: next(assignments)),
+        measure(lambda i: DictTruthAssignment(
+            dict((c, bool(i >> n & 1)) for n, c in enumerate(constants))
+        ))
+    )
+
+if __name__ == '__main__':
+    main()
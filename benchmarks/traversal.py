@@ -0,0 +1,68 @@
+# Compares the recursive eval, str and repr used for ordinary sentences with
+# the explicit stack traversals used past MAX_RECURSIVE_DEPTH, then runs the
+# latter on a chain far deeper than the recursion limit allows
+import sys
+from timeit import default_timer
+from os.path import realpath, abspath, dirname, join
+
+sys.path = [realpath(join(dirname(abspath(__file__)), '..'))] + sys.path
+
+from logic.language import PropositionalConstant, TruthAssignment
+from logic.parser import parse
+from logic.syntax import (Negation, Conjunction, Implication, MAX_RECURSIVE_DEPTH,
+    SimpleSentence, eval_iteratively, render_sentence)
+
+SHALLOW_REPEATS = 20000
+MEDIUM_REPEATS = 200
+DEEP_DEPTH = 1000000
+
+def chain(depth):
+    a = SimpleSentence(PropositionalConstant("a"))
+    b = SimpleSentence(PropositionalConstant("b"))
+    sentence = a
+    for i in range(depth):
+        sentence = Conjunction(sentence, b) if i % 2 else Implication(sentence, Negation(b))
+    return sentence
+
+def measure(function, repeats):
+    start = default_timer()
+    for _ in range(repeats):
+        function()
+    return (default_timer() - start) / repeats
+
+def report(name, repeats, recursive, iterative):
+    recursive_time = measure(recursive, repeats)
+    iterative_time = measure(iterative, repeats)
+    print("%-8s recursive %10.2f us  explicit stack %10.2f us  (%.2fx)" % (
+        name, recursive_time * 1e6, iterative_time * 1e6, iterative_time / recursive_time
+    ))
+
+def main():
+    assignment = TruthAssignment(dict(
+        (PropositionalConstant(label), True) for label in ("a", "b", "c", "d")
+    ))
+
+    for label, sentence, repeats in (
+        ("shallow", parse("(a ^ b) | (-c => (d <=> a))"), SHALLOW_REPEATS),
+        ("depth %d" % MAX_RECURSIVE_DEPTH, chain(MAX_RECURSIVE_DEPTH - 1), MEDIUM_REPEATS)
+    ):
+        print(label)
+        report("  eval", repeats,
+            lambda: sentence.eval(assignment), lambda: eval_iteratively(sentence, assignment))
+        report("  str", repeats,
+            lambda: str(sentence), lambda: render_sentence(sentence, lambda n: n.str_parts()))
+        report("  repr", repeats,
+            lambda: repr(sentence), lambda: render_sentence(sentence, lambda n: n.repr_parts()))
+
+    sentence = chain(DEEP_DEPTH)
+    print("depth %d (explicit stack only)" % DEEP_DEPTH)
+    for name, function in (
+        ("eval", lambda: sentence.eval(assignment)),
+        ("str", lambda: str(sentence)),
+        ("repr", lambda: repr(sentence)),
+        ("all_constants", lambda: Conjunction(sentence, sentence).all_constants),
+    ):
+        print("  %-12s %8.2f s" % (name, measure(function, 1)))
+
+if __name__ == '__main__':
+    main()
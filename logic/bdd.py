@@ -0,0 +1,458 @@
+from weakref import WeakSet
+from logic.language import PropositionalConstant, TruthAssignment
+
+class VariableOrdering(object):
+    SORTED = 'sorted'
+    APPEARANCE = 'appearance'
+
+def appearance_order(sentence):
+    constants = []
+    seen = set()
+    visited = set()
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        if node.sub_sentences:
+            stack.extend(reversed(list(node.sub_sentences)))
+        else:
+            for constant in node.all_constants:
+                if constant not in seen:
+                    seen.add(constant)
+                    constants.append(constant)
+    return constants
+
+def sorted_order(sentence):
+    return sorted(sentence.all_constants)
+
+ORDERING_HEURISTICS = {
+    VariableOrdering.SORTED: sorted_order,
+    VariableOrdering.APPEARANCE: appearance_order
+}
+
+class BDD(object):
+    __slots__ = ('_manager', '_node', '__weakref__')
+
+    def __init__(self, manager, node):
+        self._manager = manager
+        self._node = node
+
+    @property
+    def manager(self):
+        return self._manager
+
+    @property
+    def node(self):
+        return self._node
+
+    @property
+    def is_true(self):
+        return self._node == BDDManager.TRUE
+
+    @property
+    def is_false(self):
+        return self._node == BDDManager.FALSE
+
+    @property
+    def size(self):
+        return self._manager.size([self._node])
+
+    def entails(self, other):
+        return (self & ~other).is_false
+
+    def count_models(self):
+        return self._manager.count_models(self._node)
+
+    def iter_models(self, offset=0):
+        return self._manager.iter_models(self._node, offset)
+
+    def find_model(self):
+        return self._manager.find_model(self._node)
+
+    def to_tuple(self):
+        return self._manager.to_tuple(self._node)
+
+    def __invert__(self):
+        return self._manager.wrap(self._manager.negation(self._node))
+
+    def __and__(self, other):
+        return self._manager.wrap(self._manager.conjunction([self._node, other.node]))
+
+    def __or__(self, other):
+        return self._manager.wrap(self._manager.disjunction([self._node, other.node]))
+
+    def __eq__(self, other):
+        return (isinstance(other, BDD) and self._manager is other.manager and
+            self._node == other.node)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self._manager), self._node))
+
+    def __repr__(self):
+        return '%s(%d)' % (self.__class__.__name__, self._node)
+
+# Reduced ordered BDDs. Nodes are ints indexing parallel var/low/high lists,
+# with 0 and 1 as the terminals. Level swaps rewrite nodes in place, so node
+# ids (and cached apply results) keep their meaning when the order changes
+class BDDManager(object):
+    FALSE = 0
+    TRUE = 1
+    MAX_SIFT_GROWTH = 1.2
+
+    def __init__(self, ordering=VariableOrdering.APPEARANCE, sift_threshold=None):
+        if ordering not in ORDERING_HEURISTICS:
+            raise ValueError('Unknown variable ordering %r' % ordering)
+        self._ordering = ordering
+        self._sift_threshold = sift_threshold
+        self._constants = []
+        self._variables = {}
+        self._levels = []
+        self._order = []
+        self._var = [None, None]
+        self._low = [0, 1]
+        self._high = [0, 1]
+        self._free = []
+        self._unique = {}
+        self._cache = {}
+        self._roots = WeakSet()
+
+    @property
+    def ordered_constants(self):
+        return tuple([self._constants[v] for v in self._order])
+
+    @property
+    def num_nodes(self):
+        return len(self._unique)
+
+    def add_constant(self, constant):
+        variable = self._variables.get(constant)
+        if variable is None:
+            variable = len(self._constants)
+            self._variables[constant] = variable
+            self._constants.append(constant)
+            self._levels.append(len(self._order))
+            self._order.append(variable)
+        return variable
+
+    def level(self, node):
+        if node <= 1:
+            return len(self._order)
+        return self._levels[self._var[node]]
+
+    def wrap(self, node):
+        bdd = BDD(self, node)
+        self._roots.add(bdd)
+        return bdd
+
+    def compile(self, sentence):
+        for constant in ORDERING_HEURISTICS[self._ordering](sentence):
+            self.add_constant(constant)
+
+        nodes = {}
+        stack = [(sentence, False)]
+        while stack:
+            sentence_node, visited = stack.pop()
+            if id(sentence_node) in nodes:
+                continue
+            if not visited:
+                stack.append((sentence_node, True))
+                stack.extend([(s, False) for s in sentence_node.sub_sentences])
+            else:
+                operands = [nodes[id(s)][0] for s in sentence_node.sub_sentences]
+                # The sentence is kept alongside its node so its id can't be reused
+                nodes[id(sentence_node)] = (sentence_node.bdd_node(self, operands), sentence_node)
+
+        result = self.wrap(nodes[id(sentence)][0])
+        if self._sift_threshold is not None and self.num_nodes > self._sift_threshold:
+            self.sift()
+            self._sift_threshold = max(self._sift_threshold, 2 * self.num_nodes)
+        return result
+
+    def make_node(self, variable, low, high):
+        if low == high:
+            return low
+        key = (variable, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            if self._free:
+                node = self._free.pop()
+                self._var[node] = variable
+                self._low[node] = low
+                self._high[node] = high
+            else:
+                node = len(self._var)
+                self._var.append(variable)
+                self._low.append(low)
+                self._high.append(high)
+            self._unique[key] = node
+        return node
+
+    def variable(self, constant):
+        return self.make_node(self.add_constant(constant), self.FALSE, self.TRUE)
+
+    # If-then-else is enough for every connective and shares one cache. The
+    # recursion would go one level per variable, so an explicit stack stands
+    # in for it. Each frame holds its cofactor calls, or their results where
+    # those are already known, until both are in the cache
+    def ite(self, f, g, h):
+        result = self._ite_result(f, g, h)
+        if result is not None:
+            return result
+
+        cache = self._cache
+        root = (f, g, h)
+        stack = [(root, None, None, None)]
+        while stack:
+            key, variable, low, high = stack.pop()
+            if variable is not None:
+                if isinstance(low, tuple):
+                    low = cache[low]
+                if isinstance(high, tuple):
+                    high = cache[high]
+                cache[key] = self.make_node(variable, low, high)
+                continue
+            if key in cache:
+                continue
+
+            f, g, h = key
+            top = min(self.level(f), self.level(g), self.level(h))
+            f_low, f_high = self._cofactors(f, top)
+            g_low, g_high = self._cofactors(g, top)
+            h_low, h_high = self._cofactors(h, top)
+            low = (f_low, g_low, h_low)
+            high = (f_high, g_high, h_high)
+            low_result = self._ite_result(*low)
+            high_result = self._ite_result(*high)
+            stack.append((
+                key, self._order[top],
+                low if low_result is None else low_result,
+                high if high_result is None else high_result
+            ))
+            if high_result is None:
+                stack.append((high, None, None, None))
+            if low_result is None:
+                stack.append((low, None, None, None))
+        return cache[root]
+
+    # The terminal cases and cached results of ite, otherwise None
+    def _ite_result(self, f, g, h):
+        if f == self.TRUE:
+            return g
+        if f == self.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == self.TRUE and h == self.FALSE:
+            return f
+        return self._cache.get((f, g, h))
+
+    def _cofactors(self, node, level):
+        if self.level(node) == level:
+            return self._low[node], self._high[node]
+        return node, node
+
+    def negation(self, node):
+        return self.ite(node, self.FALSE, self.TRUE)
+
+    def conjunction(self, nodes):
+        result = self.TRUE
+        for node in nodes:
+            result = self.ite(result, node, self.FALSE)
+        return result
+
+    def disjunction(self, nodes):
+        result = self.FALSE
+        for node in nodes:
+            result = self.ite(result, self.TRUE, node)
+        return result
+
+    def implication(self, antecedent, consequent):
+        return self.ite(antecedent, consequent, self.TRUE)
+
+    def equivalence(self, node_1, node_2):
+        return self.ite(node_1, node_2, self.negation(node_2))
+
+    def iter_nodes(self, roots):
+        seen = set()
+        stack = [r for r in roots if r > 1]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            yield node
+            stack.extend([n for n in (self._low[node], self._high[node]) if n > 1])
+
+    def size(self, roots):
+        return sum(1 for _ in self.iter_nodes(roots))
+
+    def count_models(self, node):
+        return self._model_counts(node)[node] << self.level(node)
+
+    # Models over every constant in the manager, high branches first. Whole
+    # sub diagrams are skipped by their model count to reach the offset. The
+    # walk is depth first, so one list holds the values of the current path
+    def iter_models(self, node, offset=0):
+        counts = self._model_counts(node)
+        constants = self.ordered_constants
+        num_levels = len(constants)
+        values = []
+        stack = [(node, 0, None)]
+        while stack:
+            current, level, value = stack.pop()
+            models = counts[current] << (self.level(current) - level)
+            if offset >= models:
+                offset -= models
+                continue
+            if level > 0:
+                del values[level - 1:]
+                values.append(value)
+            if level == num_levels:
+                yield TruthAssignment(dict(zip(constants, values)))
+                continue
+            low, high = self._cofactors(current, level)
+            stack.append((low, level + 1, False))
+            stack.append((high, level + 1, True))
+
+    # Models of each node counted from its own level down
+    def _model_counts(self, node):
+        counts = {self.FALSE: 0, self.TRUE: 1}
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+            low, high = self._low[current], self._high[current]
+            pending = [n for n in (low, high) if n not in counts]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            level = self.level(current)
+            counts[current] = (
+                counts[low] << (self.level(low) - level - 1)
+            ) + (
+                counts[high] << (self.level(high) - level - 1)
+            )
+        return counts
+
+    # Takes the high branch whenever it is satisfiable, so with sorted order
+    # this is the first satisfying row of the truth table
+    def find_model(self, node):
+        if node == self.FALSE:
+            return None
+        values = dict((constant, True) for constant in self._constants)
+        while node > 1:
+            constant = self._constants[self._var[node]]
+            if self._high[node] != self.FALSE:
+                node = self._high[node]
+            else:
+                values[constant] = False
+                node = self._low[node]
+        return TruthAssignment(values)
+
+    # A canonical form for the current order: the labels of the constants the
+    # node depends on from the top level down, then nodes numbered in post
+    # order as (label index, low, high)
+    def to_tuple(self, node):
+        support = sorted(set([self.level(n) for n in self.iter_nodes([node])]))
+        indexes = dict((level, i) for i, level in enumerate(support))
+        refs = {self.FALSE: 0, self.TRUE: 1}
+        nodes = []
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if current in refs:
+                stack.pop()
+                continue
+            pending = [n for n in (self._high[current], self._low[current]) if n not in refs]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            refs[current] = len(nodes) + 2
+            nodes.append((
+                indexes[self.level(current)], refs[self._low[current]], refs[self._high[current]]
+            ))
+        labels = tuple([self._constants[self._order[level]].label for level in support])
+        return (labels, tuple(nodes), refs[node])
+
+    def from_tuple(self, data):
+        labels, nodes, root = data
+        constants = [PropositionalConstant(label) for label in labels]
+        for constant in constants:
+            self.add_constant(constant)
+        built = [self.FALSE, self.TRUE]
+        for index, low, high in nodes:
+            variable = self.variable(constants[index])
+            built.append(self.ite(variable, built[high], built[low]))
+        return self.wrap(built[root])
+
+    def collect_garbage(self):
+        live = set(self.iter_nodes([bdd.node for bdd in self._roots]))
+        for key, node in list(self._unique.items()):
+            if node not in live:
+                del self._unique[key]
+                self._var[node] = None
+                self._free.append(node)
+        self._cache.clear()
+
+    def swap_levels(self, level):
+        x, y = self._order[level], self._order[level + 1]
+        var, low, high = self._var, self._low, self._high
+        for node in [n for (v, _, _), n in self._unique.items() if v == x]:
+            f0, f1 = low[node], high[node]
+            if var[f0] != y and var[f1] != y:
+                continue
+            f00, f01 = (low[f0], high[f0]) if var[f0] == y else (f0, f0)
+            f10, f11 = (low[f1], high[f1]) if var[f1] == y else (f1, f1)
+            del self._unique[(x, f0, f1)]
+            new_low = self.make_node(x, f00, f10)
+            new_high = self.make_node(x, f01, f11)
+            var[node], low[node], high[node] = y, new_low, new_high
+            self._unique[(y, new_low, new_high)] = node
+        self._order[level], self._order[level + 1] = y, x
+        self._levels[x], self._levels[y] = level + 1, level
+
+    def _move(self, from_level, to_level):
+        while from_level < to_level:
+            self.swap_levels(from_level)
+            from_level += 1
+        while from_level > to_level:
+            self.swap_levels(from_level - 1)
+            from_level -= 1
+        self.collect_garbage()
+        return self.num_nodes
+
+    # Rudell's sifting: each variable, largest first, is tried at every level
+    # and left where the live node count was smallest
+    def sift(self):
+        self.collect_garbage()
+        counts = dict((v, 0) for v in range(len(self._constants)))
+        for variable, _, _ in self._unique:
+            counts[variable] += 1
+
+        for variable in sorted(counts, key=lambda v: -counts[v]):
+            start = self._levels[variable]
+            best_size, best_level = self.num_nodes, start
+            limit = best_size * self.MAX_SIFT_GROWTH
+            for target in range(start + 1, len(self._order)):
+                size = self._move(self._levels[variable], target)
+                if size < best_size:
+                    best_size, best_level = size, target
+                if size > limit:
+                    break
+            for target in range(self._levels[variable] - 1, -1, -1):
+                size = self._move(self._levels[variable], target)
+                if size < best_size:
+                    best_size, best_level = size, target
+                if size > limit and target < start:
+                    break
+            self._move(self._levels[variable], best_level)
+        return self.num_nodes
@@ -0,0 +1,125 @@
+from binascii import unhexlify
+from struct import pack
+from logic.syntax import eval_bits_shared
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_ALIGNMENT = 64
+
+class NumpyUnavailableException(Exception):
+    pass
+
+def pack_bits(bits, num_rows):
+    # Little endian bit order: row i is bit i % 8 of byte i // 8, which is what
+    # numpy.unpackbits(..., bitorder='little') expects
+    num_bytes = (num_rows + 7) // 8
+    return bytes(bytearray(unhexlify('%0*x' % (num_bytes * 2, bits)))[::-1])
+
+def unpack_bits(bits, num_rows):
+    digits = format(bits, '0%db' % num_rows)[::-1]
+    return digits.replace('0', '\x00').replace('1', '\x01').encode('latin-1')
+
+class ColumnarTruthTable(object):
+    def __init__(self, vocabulary, column_sentences):
+        self._vocabulary = vocabulary
+        self._column_sentences = tuple(column_sentences)
+
+    @property
+    def constants(self):
+        return self._vocabulary.ordered_constants
+
+    @property
+    def column_sentences(self):
+        return self._column_sentences
+
+    @property
+    def headings(self):
+        return [str(sentence) for sentence in self._column_sentences]
+
+    @property
+    def num_rows(self):
+        return 1 << len(self.constants)
+
+    @property
+    def num_columns(self):
+        return len(self._column_sentences)
+
+    def iter_column_blocks(self, index):
+        sentence = self._column_sentences[index]
+        for bit_assignment in self._vocabulary.iter_bit_assignments():
+            yield bit_assignment.num_rows, sentence.eval_bits(bit_assignment)
+
+    def packed_column(self, index):
+        return b''.join([
+            pack_bits(bits, num_rows)
+            for num_rows, bits in self.iter_column_blocks(index)
+        ])
+
+    def column(self, index):
+        return b''.join([
+            unpack_bits(bits, num_rows)
+            for num_rows, bits in self.iter_column_blocks(index)
+        ])
+
+    def to_numpy(self, packed=False):
+        if numpy is None:
+            raise NumpyUnavailableException('numpy is required for to_numpy')
+        if packed:
+            if not self.num_columns:
+                return numpy.zeros((0, (self.num_rows + 7) // 8), numpy.uint8)
+            return numpy.array([
+                numpy.frombuffer(self.packed_column(i), dtype=numpy.uint8)
+                for i in range(self.num_columns)
+            ]).reshape(self.num_columns, -1)
+        columns = [
+            numpy.frombuffer(self.column(i), dtype=numpy.bool_)
+            for i in range(self.num_columns)
+        ]
+        return numpy.column_stack(columns) if columns else numpy.zeros((self.num_rows, 0), bool)
+
+    def write_csv(self, output):
+        output.write(",".join(['"%s"' % h for h in self.headings]) + "\n")
+        for bit_assignment in self._vocabulary.iter_bit_assignments():
+            columns = [
+                format(bits, '0%db' % bit_assignment.num_rows)[::-1]
+                for bits in eval_bits_shared(self._column_sentences, bit_assignment)
+            ]
+            for row in zip(*columns):
+                output.write(",".join(row) + "\n")
+
+    # Writes an .npy file column by column, so memory use stays at one block
+    # regardless of table size. Bools are stored in Fortran order with shape
+    # (rows, columns); packed columns are uint8 with shape (columns, rows / 8)
+    def write_npy(self, output, packed=False):
+        if packed:
+            num_bytes = (self.num_rows + 7) // 8
+            header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d, %d), }" % (
+                self.num_columns, num_bytes
+            )
+            encode = pack_bits
+        else:
+            header = "{'descr': '|b1', 'fortran_order': True, 'shape': (%d, %d), }" % (
+                self.num_rows, self.num_columns
+            )
+            encode = unpack_bits
+
+        padding = NPY_HEADER_ALIGNMENT - (len(NPY_MAGIC) + 2 + len(header) + 1) % NPY_HEADER_ALIGNMENT
+        header += ' ' * (padding % NPY_HEADER_ALIGNMENT) + '\n'
+        output.write(NPY_MAGIC + pack('<H', len(header)) + header.encode('latin-1'))
+        for index in range(self.num_columns):
+            for num_rows, bits in self.iter_column_blocks(index):
+                output.write(encode(bits, num_rows))
+
+    def save_npy(self, path, packed=False):
+        with open(path, 'wb') as output:
+            self.write_npy(output, packed)
+
+    @staticmethod
+    def load_npy(path, mmap=True):
+        if numpy is None:
+            raise NumpyUnavailableException('numpy is required for load_npy')
+        return numpy.load(path, mmap_mode='r' if mmap else None)
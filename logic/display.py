@@ -1,41 +1,58 @@
-from logic.syntax import SimpleSentence, SentenceSet
+from logic.syntax import SimpleSentence, SentenceSet, eval_bits_shared, distinct_sub_sentences
 from logic.language import PropositionalVocabulary
+from logic.columnar import ColumnarTruthTable
 
 class TruthTable(object):
-    def __init__(self, vocabulary, sentences = tuple()):
+    def __init__(self, vocabulary, sentences = tuple(), include_sub_sentences = False):
         self._vocabulary = vocabulary
         self._sentences = tuple(sentences)
+        self._include_sub_sentences = include_sub_sentences
 
     @property
     def simple_string(self):
-        display_matrix = self.string_matrix
+        return "\n".join(self.iter_simple_lines())
 
-        col_sizes = [
-            max([len(c) for c in display_column])
-            for display_column in display_matrix
-        ]
+    def write_simple_string(self, output):
+        for line in self.iter_simple_lines():
+            output.write(line + "\n")
+
+    # Cells are always a single character, so column widths come from the
+    # headings alone and rows can be rendered as they are evaluated
+    def iter_simple_lines(self):
+        headings = [str(sentence) for sentence in self.column_sentences]
+        col_sizes = [max(len(heading), 1) for heading in headings]
 
         row_divider = "+"
         for col_size in col_sizes:
             row_divider += "-" + ("-" * col_size) + "-+"
 
-        rows = [row_divider]
-        num_rows = len(display_matrix[0])
-        for row_num in range(0, num_rows):
-            row_values = [
-                display_column[row_num] 
-                for display_column in display_matrix
-            ]
-            row_values_and_sizes = zip(row_values, col_sizes)
-            padded_row_values = [
-                x[0].center(x[1], " ") 
-                for x in row_values_and_sizes
+        cells = [
+            {True : '1'.center(col_size, " "), False : '0'.center(col_size, " ")}
+            for col_size in col_sizes
+        ]
+
+        yield row_divider
+        yield "| " + " | ".join([
+            heading.center(col_size, " ")
+            for heading, col_size in zip(headings, col_sizes)
+        ]) + " |"
+        yield row_divider
+        for row in self.iter_rows():
+            yield "| " + " | ".join([
+                column_cells[value]
+                for column_cells, value in zip(cells, row)
+            ]) + " |"
+        yield row_divider
+
+    def iter_rows(self):
+        column_sentences = self.column_sentences
+        for bit_assignment in self._vocabulary.iter_bit_assignments():
+            columns = [
+                bit_assignment.iter_values(bits)
+                for bits in eval_bits_shared(column_sentences, bit_assignment)
             ]
-            rows.append("| " + " | ".join(padded_row_values) + " |")
-            if row_num == 0:
-                rows.append(row_divider)
-        rows.append(row_divider)
-        return "\n".join(rows)
+            for row in zip(*columns):
+                yield row
 
     @property
     def string_matrix(self):
@@ -54,30 +71,49 @@ class TruthTable(object):
         ]
 
     @property
-    def matrix(self):
+    def column_sentences(self):
         constant_sentences = [
             SimpleSentence(c) 
             for c in self._vocabulary.constants
         ]
-        all_sentences = sorted(constant_sentences) + list(self._sentences)
-        table = [""] * len(all_sentences)
-
-        sorted_assignments = sorted(self._vocabulary.all_assignments)
-        for index, sentence in enumerate(all_sentences):
-            assignment_column = [
-                sentence.eval(assignment) 
-                for assignment in sorted_assignments
-            ]
-            column = [sentence] + assignment_column
-            table[index] = column
+        if not self._include_sub_sentences:
+            return sorted(constant_sentences) + list(self._sentences)
+
+        # Sub sentences come before the sentences containing them. Every
+        # requested sentence keeps its column, as without sub sentences
+        columns = sorted(constant_sentences)
+        seen = set()
+        for sentence in self._sentences:
+            for sub_sentence in distinct_sub_sentences(sentence.sub_sentences):
+                if sub_sentence.sub_sentences and sub_sentence not in seen:
+                    seen.add(sub_sentence)
+                    columns.append(sub_sentence)
+            seen.add(sentence)
+            columns.append(sentence)
+        return columns
+
+    @property
+    def matrix(self):
+        column_sentences = self.column_sentences
+        table = [[sentence] for sentence in column_sentences]
+
+        for bit_assignment in self._vocabulary.iter_bit_assignments():
+            all_bits = eval_bits_shared(column_sentences, bit_assignment)
+            for column, bits in zip(table, all_bits):
+                column.extend(bit_assignment.iter_values(bits))
 
         return table
 
+    def to_columnar(self):
+        return ColumnarTruthTable(self._vocabulary, self.column_sentences)
+
     @staticmethod
-    def for_sentence_set(sentence_set):
-        return TruthTable(sentence_set.vocabulary, sentence_set.sentences)
+    def for_sentence_set(sentence_set, include_sub_sentences = False):
+        return TruthTable(
+            sentence_set.vocabulary, sentence_set.sentences, include_sub_sentences
+        )
 
     @staticmethod
-    def for_sentences(sentences):
+    def for_sentences(sentences, include_sub_sentences = False):
         vocab = PropositionalVocabulary(SentenceSet(sentences).all_constants)
-        return TruthTable(vocab, sentences)
\ No newline at end of file
+        return TruthTable(vocab, sentences, include_sub_sentences)
\ No newline at end of file
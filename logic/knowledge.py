@@ -0,0 +1,103 @@
+from logic.language import TruthAssignment
+from logic.sat import Solver, TseitinEncoder
+from logic.syntax import SentenceSet
+
+class KnowledgeBaseException(Exception):
+    pass
+
+# A SentenceSet that changes one sentence at a time. Every sentence is Tseitin
+# encoded into one long lived solver once, guarded by a selector variable; the
+# selectors of the current sentences are passed as assumptions, so clauses and
+# everything the solver learnt carry over between checks
+class KnowledgeBase(object):
+    def __init__(self, sentences=()):
+        self._encoder = TseitinEncoder()
+        self._solver = Solver()
+        self._num_clauses = 0
+        self._selectors = {}
+        self._is_consistent = None
+        for sentence in sentences:
+            self.add(sentence)
+
+    @property
+    def sentences(self):
+        return frozenset(self._selectors)
+
+    @property
+    def sentence_set(self):
+        return SentenceSet(self._selectors)
+
+    @property
+    def solver(self):
+        return self._solver
+
+    def add(self, sentence):
+        if sentence in self._selectors:
+            return
+        root = self._encode(sentence)
+        selector = self._encoder.new_variable()
+        self._solver.add_clause([-selector, root])
+        self._selectors[sentence] = selector
+        if self._is_consistent is False:
+            return
+        self._is_consistent = None
+
+    def retract(self, sentence):
+        selector = self._selectors.pop(sentence, None)
+        if selector is None:
+            raise KnowledgeBaseException('%s is not in the knowledge base' % sentence)
+        # The selector is never assumed again, so its clauses can go for good
+        self._solver.add_clause([-selector])
+        if self._is_consistent is True:
+            return
+        self._is_consistent = None
+
+    @property
+    def is_consistent(self):
+        if self._is_consistent is None:
+            self._is_consistent = self._solver.solve(self._assumptions())
+        return self._is_consistent
+
+    def find_model(self):
+        if not self._solver.solve(self._assumptions()):
+            return None
+        return self._assignment(self.sentence_set.all_constants)
+
+    def entails(self, sentence):
+        return self.find_entailment_counterexample(sentence) is None
+
+    def find_entailment_counterexample(self, sentence):
+        root = self._encode(sentence)
+        if not self._solver.solve(self._assumptions() + [-root]):
+            return None
+        return self._assignment(self.sentence_set.all_constants.union(sentence.all_constants))
+
+    def _encode(self, sentence):
+        root = self._encoder.encode(sentence)
+        clauses = self._encoder.clauses
+        for clause in clauses[self._num_clauses:]:
+            self._solver.add_clause(clause)
+        self._num_clauses = len(clauses)
+        return root
+
+    def _assumptions(self):
+        return list(self._selectors.values())
+
+    def _assignment(self, constants):
+        variables = self._encoder.constants_to_variables
+        return TruthAssignment(dict(
+            (constant, self._solver.model_value(variables[constant]))
+            for constant in constants
+        ))
+
+    def __contains__(self, sentence):
+        return sentence in self._selectors
+
+    def __len__(self):
+        return len(self._selectors)
+
+    def __iter__(self):
+        return iter(self._selectors)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self._selectors))
@@ -1,35 +1,73 @@
 import re
 
+DEFAULT_ROWS_PER_BLOCK = 1 << 16
+
+def _true_then_false_pattern(period, num_rows):
+    pattern = (1 << period) - 1
+    width = period * 2
+    while width < num_rows:
+        pattern |= pattern << width
+        width *= 2
+    return pattern
+
 class PropositionalVocabulary(object):
+    __slots__ = ('_constants', '_ordered_constants', '_bit_positions')
+
     def __init__(self, constants):
         self._constants = frozenset(constants)
+        self._ordered_constants = None
+        self._bit_positions = None
 
     @property
     def all_assignments(self):
-        def get_next(remaining_constants, accu):
-            if len(remaining_constants) == 0:
-                return accu
-            else:
-                head = remaining_constants[0]
-                tail = remaining_constants[1:]
-                true_ass = TruthAssignment({head : True})
-                false_ass = TruthAssignment({head : False})
-                if len(accu) == 0:
-                    return get_next(tail, frozenset([true_ass, false_ass]))
-                else:
-                    return get_next(tail, append_new(accu, true_ass, false_ass, frozenset()))
-
-        def append_new(current, add_1, add_2, accu):
-            if len(current) == 0:
-                return accu
-            else:
-                current_list = list(current)
-                head = current_list[0]
-                tail = frozenset(current_list[1:])
-                new_accu = accu.union((head + add_1, head + add_2))
-                return append_new(tail, add_1, add_2, new_accu)
-
-        return get_next(tuple(self._constants), frozenset())
+        return frozenset(self.iter_assignments())
+
+    def iter_assignments(self):
+        bits = (1 << len(self._constants)) - 1
+        while bits >= 0:
+            yield TruthAssignment.from_bits(self, bits)
+            bits -= 1
+
+    def iter_bit_assignments(self, rows_per_block=DEFAULT_ROWS_PER_BLOCK):
+        if rows_per_block < 1 or rows_per_block & (rows_per_block - 1):
+            raise ValueError('rows_per_block must be a power of 2')
+
+        constants = self.ordered_constants
+        num_constants = len(constants)
+        num_rows = 1 << num_constants
+        block_rows = min(num_rows, rows_per_block)
+        block_mask = (1 << block_rows) - 1
+        periods = [1 << (num_constants - 1 - index) for index in range(num_constants)]
+        patterns = [
+            _true_then_false_pattern(period, block_rows) if period < block_rows else None
+            for period in periods
+        ]
+
+        first_row = 0
+        while first_row < num_rows:
+            constant_bits = [
+                pattern if pattern is not None else (0 if first_row & period else block_mask)
+                for period, pattern in zip(periods, patterns)
+            ]
+            yield BitAssignment(self, constant_bits, first_row, block_rows)
+            first_row += block_rows
+
+    @property
+    def ordered_constants(self):
+        if self._ordered_constants is None:
+            self._ordered_constants = tuple(sorted(self._constants))
+        return self._ordered_constants
+
+    # The first ordered constant is the most significant bit, so comparing
+    # bits orders assignments the same way as a truth table
+    def bit_position(self, constant):
+        if self._bit_positions is None:
+            last_index = len(self._constants) - 1
+            self._bit_positions = dict(
+                (c, last_index - index)
+                for index, c in enumerate(self.ordered_constants)
+            )
+        return self._bit_positions.get(constant)
 
     @property
     def constants(self):
@@ -46,6 +84,9 @@ class PropositionalVocabulary(object):
     def __eq__(self, other):
         return self.__class__ == other.__class__ and self.constants == other.constants
 
+    def __hash__(self):
+        return hash(self._constants)
+
     def __str__(self):
         return str([c.label for c in sorted(self.constants)])
 
@@ -53,6 +94,8 @@ class PropositionalVocabulary(object):
         return "%s(%r)" % (self.__class__.__name__, self.constants)
 
 class PropositionalConstant(object):
+    __slots__ = ('_label', )
+
     def __init__(self, label):
         if not isinstance(label, str):
             raise InvalidConstantLabelException('Must be a string')
@@ -91,39 +134,122 @@ class InvalidConstantLabelException(BaseException):
     pass
 
 class TruthAssignment(object):
+    __slots__ = ('_vocabulary', '_bits')
+
     def __init__(self, constants_to_value):
         # TODO: assert values are boolean
-        self._constants_to_value = constants_to_value
+        vocabulary = PropositionalVocabulary(constants_to_value.keys())
+        bits = 0
+        for constant, value in constants_to_value.items():
+            if value:
+                bits |= 1 << vocabulary.bit_position(constant)
+        self._vocabulary = vocabulary
+        self._bits = bits
+
+    @staticmethod
+    def from_bits(vocabulary, bits):
+        assignment = TruthAssignment.__new__(TruthAssignment)
+        assignment._vocabulary = vocabulary
+        assignment._bits = bits
+        return assignment
+
+    @property
+    def vocabulary(self):
+        return self._vocabulary
+
+    @property
+    def bits(self):
+        return self._bits
 
     @property
     def constants_to_value(self):
-        return self._constants_to_value
+        return dict((c, self.get(c)) for c in self._vocabulary.ordered_constants)
 
     @property
     def constants(self):
-        return self.constants_to_value.keys()
+        return self._vocabulary.ordered_constants
 
     def get(self, constant):
-        return self._constants_to_value.get(constant)
+        position = self._vocabulary.bit_position(constant)
+        if position is None:
+            return None
+        return self._bits >> position & 1 == 1
 
     def __add__(self, other):
-        combined = self._constants_to_value.copy()
+        combined = self.constants_to_value
         combined.update(other.constants_to_value)
         return TruthAssignment(combined)
 
     def __eq__(self, other):
         return (isinstance(other, self.__class__)
-            and self.constants_to_value == other.constants_to_value)
+            and self._bits == other._bits
+            and self._vocabulary == other._vocabulary)
 
     def __gt__(self, other):
-        keys = sorted(self.constants)
-        other_keys = sorted(other.constants)
-        values = [self.get(i) for i in keys]
-        other_values = [other.get(i) for i in other_keys]
-        return keys < other_keys or (keys == other_keys and values < other_values)
+        keys = self.constants
+        other_keys = other.constants
+        return keys < other_keys or (keys == other_keys and self._bits < other._bits)
 
     def __repr__(self):
-        return 'TruthAssignment(%r)' % self._constants_to_value
+        return 'TruthAssignment(%r)' % self.constants_to_value
 
     def __hash__(self):
-        return hash(frozenset(self._constants_to_value.items()))
\ No newline at end of file
+        return hash((self._vocabulary, self._bits))
+
+class BitAssignment(object):
+    def __init__(self, vocabulary, constant_bits, first_row, num_rows):
+        self._vocabulary = vocabulary
+        self._constants_to_bits = dict(zip(vocabulary.ordered_constants, constant_bits))
+        self._first_row = first_row
+        self._num_rows = num_rows
+        self._mask = (1 << num_rows) - 1
+
+    @property
+    def vocabulary(self):
+        return self._vocabulary
+
+    @property
+    def constants(self):
+        return self._vocabulary.ordered_constants
+
+    @property
+    def constants_to_bits(self):
+        return self._constants_to_bits
+
+    @property
+    def first_row(self):
+        return self._first_row
+
+    @property
+    def num_rows(self):
+        return self._num_rows
+
+    @property
+    def mask(self):
+        return self._mask
+
+    def get(self, constant):
+        return self._constants_to_bits.get(constant)
+
+    def iter_values(self, bits):
+        digits = format(bits, '0%db' % self._num_rows)[::-1]
+        return (digit == '1' for digit in digits)
+
+    def iter_rows(self, bits):
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def assignment(self, row):
+        all_true = (1 << len(self.constants)) - 1
+        return TruthAssignment.from_bits(self._vocabulary, all_true ^ (self._first_row + row))
+
+    def __repr__(self):
+        return '%s(%r, %r, %r, %r)' % (
+            self.__class__.__name__,
+            self._vocabulary,
+            [self._constants_to_bits[c] for c in self.constants],
+            self._first_row,
+            self._num_rows
+        )
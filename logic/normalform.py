@@ -0,0 +1,243 @@
+from logic.language import PropositionalConstant
+from logic.syntax import (SimpleSentence, Negation, Conjunction, Disjunction,
+    Implication, Reduction, Equivalence, SentenceSet, DEFAULT_INTERNER)
+
+class CNFMethod(object):
+    DISTRIBUTE = 'distribute'
+    TSEITIN = 'tseitin'
+    PLAISTED_GREENBAUM = 'plaisted_greenbaum'
+
+DEFAULT_FRESH_PREFIX = 'cnf'
+
+class NormalFormException(Exception):
+    pass
+
+class NormalFormSizeException(NormalFormException):
+    pass
+
+def is_literal(sentence):
+    return isinstance(sentence, SimpleSentence) or (
+        isinstance(sentence, Negation) and isinstance(sentence.target, SimpleSentence)
+    )
+
+# Literals are (constant, value) pairs
+def literal_of(sentence):
+    if isinstance(sentence, SimpleSentence):
+        return (sentence.constant, True)
+    return (sentence.target.constant, False)
+
+def literal_sentence(literal, interner=DEFAULT_INTERNER):
+    constant, value = literal
+    sentence = interner.create(SimpleSentence, constant)
+    return sentence if value else interner.create(Negation, sentence)
+
+# Each rule gives the (sentence, polarity) pairs a node's NNF needs, and a
+# function building the NNF from their results
+def _nnf_rule(node, positive, interner):
+    if isinstance(node, SimpleSentence):
+        return (), lambda results: (
+            interner.create(SimpleSentence, node.constant) if positive
+            else interner.create(Negation, interner.create(SimpleSentence, node.constant))
+        )
+
+    join = lambda cls: lambda results: _chain(cls, results, interner)
+    both = Conjunction if positive else Disjunction
+    either = Disjunction if positive else Conjunction
+    if isinstance(node, Negation):
+        return ((node.target, not positive), ), lambda results: results[0]
+    if isinstance(node, SentenceSet):
+        if not node.sentences:
+            raise NormalFormException('An empty SentenceSet has no normal form')
+        return [(s, positive) for s in node.sentences], join(both)
+    if isinstance(node, Conjunction):
+        return [(s, positive) for s in node.sub_sentences], join(both)
+    if isinstance(node, Disjunction):
+        return [(s, positive) for s in node.sub_sentences], join(either)
+    if isinstance(node, (Implication, Reduction)):
+        if isinstance(node, Implication):
+            antecedent, consequent = node.sub_sentences
+        else:
+            consequent, antecedent = node.sub_sentences
+        if positive:
+            return ((antecedent, False), (consequent, True)), join(Disjunction)
+        return ((antecedent, True), (consequent, False)), join(Conjunction)
+    if isinstance(node, Equivalence):
+        first, second = node.sub_sentences
+        return (
+            (first, True), (second, positive), (first, False), (second, not positive)
+        ), lambda results: interner.create(
+            Disjunction,
+            interner.create(Conjunction, results[0], results[1]),
+            interner.create(Conjunction, results[2], results[3])
+        )
+    raise NormalFormException('Unsupported sentence %s' % node.__class__.__name__)
+
+def _chain(cls, sentences, interner):
+    result = sentences[0]
+    for sentence in sentences[1:]:
+        result = interner.create(cls, result, sentence)
+    return result
+
+def to_nnf(sentence, interner=DEFAULT_INTERNER):
+    results = {}
+    stack = [(sentence, True)]
+    while stack:
+        key = stack[-1]
+        if key in results:
+            stack.pop()
+            continue
+        requirements, build = _nnf_rule(key[0], key[1], interner)
+        pending = [r for r in requirements if r not in results]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        results[key] = build([results[r] for r in requirements])
+    return results[(sentence, True)]
+
+def _flatten(sentence, cls):
+    operands = []
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, cls):
+            stack.extend(reversed(node.sub_sentences))
+        else:
+            operands.append(node)
+    return operands
+
+def _unique(items):
+    seen = set()
+    return tuple([i for i in items if not (i in seen or seen.add(i))])
+
+def _distribute(nnf, outer, max_items):
+    # Clauses (or terms) of every node, as frozensets of literals, bottom up
+    inner = Conjunction if outer is Disjunction else Disjunction
+    results = {}
+    stack = [nnf]
+    while stack:
+        node = stack[-1]
+        if node in results:
+            stack.pop()
+            continue
+        if is_literal(node):
+            stack.pop()
+            results[node] = [frozenset([literal_of(node)])]
+            continue
+        pending = [s for s in node.sub_sentences if s not in results]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        first, second = [results[s] for s in node.sub_sentences]
+        if isinstance(node, inner):
+            if max_items is not None and len(first) * len(second) > max_items:
+                raise NormalFormSizeException(
+                    'More than %d clauses or terms needed' % max_items
+                )
+            results[node] = list(_unique([a | b for a in first for b in second]))
+        else:
+            results[node] = list(_unique(first + second))
+    return [tuple(sorted(items, key=_literal_key)) for items in results[nnf]]
+
+def _literal_key(literal):
+    return (literal[0].label, not literal[1])
+
+class _FreshConstants(object):
+    def __init__(self, used, prefix):
+        self._used = set([c.label for c in used])
+        self._prefix = prefix
+        self._count = 0
+
+    def create(self):
+        while True:
+            self._count += 1
+            label = '%s%d' % (self._prefix, self._count)
+            if label not in self._used:
+                return PropositionalConstant(label)
+
+# Definitional encodings over the NNF. Tseitin adds both directions of each
+# definition, Plaisted-Greenbaum only the one the (always positive) NNF
+# polarity needs. Top level conjuncts and disjunctions of literals become
+# clauses directly
+def _define(nnf, method, prefix):
+    fresh = _FreshConstants(nnf.all_constants, prefix)
+    clauses = []
+    literals = {}
+
+    def encode(sentence):
+        stack = [sentence]
+        while stack:
+            node = stack[-1]
+            if node in literals:
+                stack.pop()
+                continue
+            if is_literal(node):
+                stack.pop()
+                literals[node] = literal_of(node)
+                continue
+            cls = node.__class__
+            operands = _flatten(node, cls)
+            pending = [s for s in operands if s not in literals]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            output = (fresh.create(), True)
+            operand_literals = _unique([literals[s] for s in operands])
+            negated = lambda l: (l[0], not l[1])
+            if cls is Conjunction:
+                clauses.extend([(negated(output), l) for l in operand_literals])
+                if method == CNFMethod.TSEITIN:
+                    clauses.append((output, ) + tuple([negated(l) for l in operand_literals]))
+            else:
+                clauses.append((negated(output), ) + operand_literals)
+                if method == CNFMethod.TSEITIN:
+                    clauses.extend([(output, negated(l)) for l in operand_literals])
+            literals[node] = output
+        return literals[sentence]
+
+    roots = []
+    for conjunct in _unique(_flatten(nnf, Conjunction)):
+        disjuncts = _unique(_flatten(conjunct, Disjunction))
+        roots.append(tuple(sorted(_unique([encode(d) for d in disjuncts]), key=_literal_key)))
+    return roots + clauses
+
+def cnf_clauses(sentence, method=CNFMethod.DISTRIBUTE, max_clauses=None,
+        prefix=DEFAULT_FRESH_PREFIX):
+    nnf = to_nnf(sentence)
+    if method == CNFMethod.DISTRIBUTE:
+        return _distribute(nnf, Conjunction, max_clauses)
+    elif method in (CNFMethod.TSEITIN, CNFMethod.PLAISTED_GREENBAUM):
+        return _define(nnf, method, prefix)
+    raise ValueError('Unknown CNF method %r' % method)
+
+def dnf_terms(sentence, max_terms=None):
+    return _distribute(to_nnf(sentence), Disjunction, max_terms)
+
+def _join(groups, outer, inner, interner):
+    return _chain(outer, [
+        _chain(inner, [literal_sentence(l, interner) for l in group], interner)
+        for group in groups
+    ], interner)
+
+def to_cnf(sentence, method=CNFMethod.DISTRIBUTE, max_clauses=None,
+        prefix=DEFAULT_FRESH_PREFIX, interner=DEFAULT_INTERNER):
+    clauses = cnf_clauses(sentence, method, max_clauses, prefix)
+    return _join(clauses, Conjunction, Disjunction, interner)
+
+def to_dnf(sentence, max_terms=None, interner=DEFAULT_INTERNER):
+    return _join(dnf_terms(sentence, max_terms), Disjunction, Conjunction, interner)
+
+def write_dimacs(clauses, output):
+    variables = {}
+    for clause in clauses:
+        for constant, _ in clause:
+            if constant not in variables:
+                variables[constant] = len(variables) + 1
+    output.write('p cnf %d %d\n' % (len(variables), len(clauses)))
+    for clause in clauses:
+        output.write(' '.join([
+            str(variables[c] if value else -variables[c]) for c, value in clause
+        ] + ['0']) + '\n')
+    return variables
@@ -2,24 +2,214 @@
 # also see http://effbot.org/zone/simple-top-down-parsing.htm
 
 from abc import ABCMeta, abstractproperty, abstractmethod
+from collections import OrderedDict, deque
+from itertools import islice
+from multiprocessing import Pool
+from threading import Lock
 import re
 from logic.language import PropositionalConstant
 from logic.syntax import SimpleSentence, Negation, Conjunction, Disjunction, \
-    Equivalence, Implication, Reduction
+    Equivalence, Implication, Reduction, DEFAULT_INTERNER, sentence_to_postfix, \
+    sentence_from_postfix
+
+DEFAULT_LINES_PER_CHUNK = 1000
+CHUNKS_IN_FLIGHT_PER_PROCESS = 2
+DEFAULT_PARSE_CACHE_CAPACITY = 4096
+
+def parse(text, interner=DEFAULT_INTERNER):
+    return PrattParser(interner).parse(iter_tokens(text))
+
+def parse_many(lines, processes=None, chunk_size=DEFAULT_LINES_PER_CHUNK, 
+        interner=DEFAULT_INTERNER):
+    numbered_lines = (
+        (line_number, line.strip())
+        for line_number, line in enumerate(lines, 1)
+        if line.strip()
+    )
+
+    if processes is None:
+        for line_number, text in numbered_lines:
+            try:
+                yield LineParseResult(line_number, text, parse(text, interner), None)
+            except ParsingError as error:
+                yield LineParseResult(line_number, text, None, error)
+        return
+
+    # Only a bounded window of chunks is read ahead of the consumer, so large
+    # inputs are streamed rather than all queued up in the pool
+    pool = Pool(processes)
+    try:
+        chunks = iter(lambda: list(islice(numbered_lines, chunk_size)), [])
+        window = processes * CHUNKS_IN_FLIGHT_PER_PROCESS
+        in_flight = deque(
+            pool.apply_async(_parse_serialised_chunk, (chunk, ))
+            for chunk in islice(chunks, window)
+        )
+        while in_flight:
+            results = in_flight.popleft().get()
+            for chunk in islice(chunks, 1):
+                in_flight.append(pool.apply_async(_parse_serialised_chunk, (chunk, )))
+            for line_number, text, postfix, error in results:
+                sentence = None
+                if postfix is not None:
+                    sentence = sentence_from_postfix(postfix, interner)
+                yield LineParseResult(line_number, text, sentence, error)
+    finally:
+        pool.terminate()
+
+def parse_file(path_or_file, processes=None, chunk_size=DEFAULT_LINES_PER_CHUNK, 
+        interner=DEFAULT_INTERNER):
+    if hasattr(path_or_file, 'read'):
+        for result in parse_many(path_or_file, processes, chunk_size, interner):
+            yield result
+    else:
+        with open(path_or_file) as lines:
+            for result in parse_many(lines, processes, chunk_size, interner):
+                yield result
+
+# Runs in worker processes. Sentences are sent back in postfix form, which
+# pickles without recursion and is re-interned by the parent
+def _parse_serialised_chunk(chunk):
+    results = []
+    for line_number, text in chunk:
+        try:
+            postfix = sentence_to_postfix(parse(text))
+            results.append((line_number, text, postfix, None))
+        except ParsingError as error:
+            results.append((line_number, text, None, error))
+    return results
+
+class LineParseResult(object):
+    def __init__(self, line_number, text, sentence, error):
+        self._line_number = line_number
+        self._text = text
+        self._sentence = sentence
+        self._error = error
+
+    @property
+    def line_number(self):
+        return self._line_number
+
+    @property
+    def text(self):
+        return self._text
+
+    @property
+    def sentence(self):
+        return self._sentence
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def is_valid(self):
+        return self._error is None
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__) and 
+            self.line_number == other.line_number and 
+            self.text == other.text and 
+            self.sentence == other.sentence and 
+            repr(self.error) == repr(other.error))
+
+    def __repr__(self):
+        return '%s(%r, %r, %r, %r)' % (
+            self.__class__.__name__,
+            self._line_number,
+            self._text,
+            self._sentence,
+            self._error
+        )
+
+# Sentences are immutable, so cached ones can be handed to any thread
+class ParseCache(object):
+    def __init__(self, capacity=DEFAULT_PARSE_CACHE_CAPACITY, interner=DEFAULT_INTERNER):
+        if capacity < 1:
+            raise ValueError('Capacity must be at least 1')
+        self._capacity = capacity
+        self._interner = interner
+        self._sentences = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def normalise(text):
+        return ' '.join(text.split())
+
+    def parse(self, text):
+        key = self.normalise(text)
+        with self._lock:
+            sentence = self._sentences.pop(key, None)
+            if sentence is not None:
+                self._sentences[key] = sentence
+                self._hits += 1
+                return sentence
+            self._misses += 1
+
+        sentence = parse(key, self._interner)
+        with self._lock:
+            self._sentences.pop(key, None)
+            self._sentences[key] = sentence
+            while len(self._sentences) > self._capacity:
+                self._sentences.popitem(last=False)
+        return sentence
+
+    def invalidate(self, text=None):
+        with self._lock:
+            if text is None:
+                self._sentences.clear()
+            else:
+                self._sentences.pop(self.normalise(text), None)
+
+    def reset_statistics(self):
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
 
-def parse(text):
-    return parse_program(tokenise(text))
+    @property
+    def hit_rate(self):
+        lookups = self._hits + self._misses
+        return float(self._hits) / lookups if lookups else 0.0
+
+    def __contains__(self, text):
+        with self._lock:
+            return self.normalise(text) in self._sentences
+
+    def __len__(self):
+        return len(self._sentences)
+
+    def __repr__(self):
+        return '%s(capacity=%r, size=%r, hits=%r, misses=%r)' % (
+            self.__class__.__name__,
+            self._capacity,
+            len(self),
+            self._hits,
+            self._misses
+        )
 
-def parse_program(tokens):
-    initial_state = ParseState(tokens, [SentinelToken()], [])
+def parse_program(tokens, interner=DEFAULT_INTERNER):
+    initial_state = ParseState(tokens, [SentinelToken()], [], interner)
     if initial_state.next_token == EndToken():
         raise ParsingError("Empty expression")
     expression_state = expression(initial_state)
     completed_state = expect(expression_state, EndToken()) 
     return completed_state.next_operand
 
-def tokenise(text):
-    token_pattern = r"""
+TOKEN_PATTERN = re.compile(r"""
 (?P<constant>[a-z]{1}[a-zA-Z0-9\_]*)
 |(?P<negation>\-{1})
 |(?P<conjunction>\^{1})
@@ -30,27 +220,52 @@ def tokenise(text):
 |(?P<left_parenthesis>\({1})
 |(?P<right_parenthesis>\){1})
 |(?P<invalid>[^\s]+)
-"""
-    return tuple([
-        create_token(m.lastgroup, m.group(m.lastgroup), m.start(m.lastgroup))
-        for m in re.finditer(token_pattern, text, re.VERBOSE)
-    ] + [EndToken()])
+""", re.VERBOSE)
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+def tokenise(text):
+    return tuple(iter_tokens(text))
+
+def iter_tokens(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+    else:
+        chunks = iter((source, ))
+
+    # A match touching the end of the buffer may continue into the next chunk
+    # (a longer constant, <= becoming <=>), so it is held back until then
+    pending = ''
+    offset = 0
+    for chunk in chunks:
+        text = pending + chunk
+        held = None
+        for match in TOKEN_PATTERN.finditer(text):
+            if held is not None:
+                yield _match_token(held, offset)
+            held = match
+
+        if held is not None and held.end() == len(text):
+            pending = text[held.start():]
+            offset += held.start()
+        else:
+            if held is not None:
+                yield _match_token(held, offset)
+            pending = ''
+            offset += len(text)
+
+    for match in TOKEN_PATTERN.finditer(pending):
+        yield _match_token(match, offset)
+    yield END_TOKEN
+
+def _match_token(match, offset):
+    token_type = match.lastgroup
+    return create_token(token_type, match.group(token_type), offset + match.start(token_type))
 
 def create_token(token_type, value, position):
-    simple_type_map = {
-        "negation": NegationToken,
-        "conjunction": ConjunctionToken,
-        "disjunction": DisjunctionToken,
-        "equivalence": EquivalenceToken,
-        "implication": ImplicationToken,
-        "reduction": ReductionToken,
-        "left_parenthesis": LeftParenthesisToken,
-        "right_parenthesis": RightParenthesisToken
-    }
-
-    constructor = simple_type_map.get(token_type)
-    if constructor is not None:
-        return constructor()
+    token = OPERATOR_TOKENS.get(token_type)
+    if token is not None:
+        return token
     elif token_type == 'constant':
         return ConstantToken(value)
     else:
@@ -69,10 +284,15 @@ class ParsingSyntaxError(ParsingError):
     pass
 
 class ParseState(object):
-    def __init__(self, tokens, operators, operands):
+    def __init__(self, tokens, operators, operands, interner):
         self._tokens = tuple(tokens)
         self._operators = tuple(operators)
         self._operands = tuple(operands)
+        self._interner = interner
+
+    @property
+    def interner(self):
+        return self._interner
 
     @property
     def next_token(self):
@@ -97,21 +317,21 @@ class ParseState(object):
 
     def pop_operands(self, amount):
         new_operands = self._operands[amount:]
-        return ParseState(self._tokens, self._operators, new_operands)
+        return ParseState(self._tokens, self._operators, new_operands, self._interner)
 
     def pop_operator(self):
-        return ParseState(self._tokens, self._operators[1:], self._operands)
+        return ParseState(self._tokens, self._operators[1:], self._operands, self._interner)
 
     def push_operator(self, operator):
         new_operators = (operator, ) + self._operators
-        return ParseState(self._tokens, new_operators, self._operands)
+        return ParseState(self._tokens, new_operators, self._operands, self._interner)
 
     def push_operand(self, operand):
         new_operands = (operand, ) + self._operands
-        return ParseState(self._tokens, self._operators, new_operands)
+        return ParseState(self._tokens, self._operators, new_operands, self._interner)
 
     def consume_token(self):
-        return ParseState(self._tokens[1:], self._operators, self._operands)
+        return ParseState(self._tokens[1:], self._operators, self._operands, self._interner)
 
 def expression(state):
     state = progress(state)
@@ -129,8 +349,8 @@ def expression(state):
     return state
 
 def progress(state):
-    if "create_value_sentence" in dir(state.next_token):
-        state = state.push_operand(state.next_token.create_value_sentence())
+    if state.next_token.kind == TokenKind.VALUE:
+        state = state.push_operand(state.next_token.create_value_sentence(state.interner))
         state = state.consume_token()
     elif state.next_token == LeftParenthesisToken():
         state = state.consume_token()
@@ -139,7 +359,7 @@ def progress(state):
         state = expect(state, RightParenthesisToken())
         state = state.pop_operator()
     elif state.next_token.is_unary:
-        state = push_operator(state.next_token, state)
+        state = state.push_operator(state.next_token)
         state = state.consume_token()
         state = progress(state)
     else:
@@ -158,11 +378,15 @@ def pop_operator(state):
     if operator.is_binary:
         right, left = state.next_operands(2)
         state = state.pop_operands(2)
-        state = state.push_operand(operator.create_binary_sentence(left, right))
+        state = state.push_operand(
+            operator.create_binary_sentence(state.interner, left, right)
+        )
     elif operator.is_unary:
         next_operand = state.next_operand
         state = state.pop_operand()
-        state = state.push_operand(operator.create_unary_sentence(next_operand))
+        state = state.push_operand(
+            operator.create_unary_sentence(state.interner, next_operand)
+        )
     else:
         raise Exception("Request a pop of a non-operator %r" % operator)
     return state
@@ -172,6 +396,73 @@ def push_operator(operator, state):
         state = pop_operator(state)
     return state.push_operator(operator)
 
+# Binding powers as in a Pratt parser, but nesting is kept on explicit operator
+# and operand stacks so parsing is linear and deep input can't overflow
+class PrattParser(object):
+    def __init__(self, interner=DEFAULT_INTERNER):
+        self._interner = interner
+
+    def parse(self, tokens):
+        interner = self._interner
+        operators = [SentinelToken()]
+        operands = []
+        expecting_operand = True
+        for token in tokens:
+            kind = token.kind
+            if expecting_operand:
+                if kind == TokenKind.VALUE:
+                    operands.append(token.create_value_sentence(interner))
+                    expecting_operand = False
+                elif kind == TokenKind.PREFIX:
+                    operators.append(token)
+                elif kind == TokenKind.OPEN:
+                    operators.append(SentinelToken())
+                elif kind == TokenKind.END and len(operands) == 0 and len(operators) == 1:
+                    raise ParsingError("Empty expression")
+                else:
+                    raise ParsingSyntaxError("Expected an operand, got %r" % token)
+            elif kind == TokenKind.INFIX:
+                binding_power = token.binding_power
+                while operators[-1].binding_power >= binding_power:
+                    self._reduce(operators, operands)
+                operators.append(token)
+                expecting_operand = True
+            elif kind == TokenKind.CLOSE:
+                self._reduce_group(operators, operands)
+                if len(operators) == 1:
+                    raise ParsingSyntaxError("Unmatched %r" % token)
+                operators.pop()
+            elif kind == TokenKind.END:
+                self._reduce_group(operators, operands)
+                if len(operators) > 1:
+                    raise ParsingSyntaxError("Expected %r got %r" % (RightParenthesisToken(), token))
+                return operands[0]
+            else:
+                raise ParsingSyntaxError("Expected an operator, got %r" % token)
+        raise ParsingSyntaxError("Expected %r" % EndToken())
+
+    def _reduce_group(self, operators, operands):
+        while operators[-1].kind != TokenKind.SENTINEL:
+            self._reduce(operators, operands)
+
+    def _reduce(self, operators, operands):
+        operator = operators.pop()
+        if operator.is_binary:
+            right = operands.pop()
+            left = operands.pop()
+            operands.append(operator.create_binary_sentence(self._interner, left, right))
+        else:
+            operands.append(operator.create_unary_sentence(self._interner, operands.pop()))
+
+class TokenKind(object):
+    VALUE = 'value'
+    PREFIX = 'prefix'
+    INFIX = 'infix'
+    OPEN = 'open'
+    CLOSE = 'close'
+    END = 'end'
+    SENTINEL = 'sentinel'
+
 class TokenBindingPower(object):
     LEVEL_1 = 100
     LEVEL_2 = 80
@@ -183,11 +474,16 @@ class TokenBindingPower(object):
 
 class AbstractToken(object):
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def binding_power(self):
         pass
 
+    @abstractproperty
+    def kind(self):
+        pass
+
     @property
     def is_binary(self):
         return False
@@ -199,19 +495,35 @@ class AbstractToken(object):
     def __repr__(self):
         return "%s()" % self.__class__.__name__
 
+    @property
+    def value(self):
+        return None
+
     def __eq__(self, other):
         return (isinstance(other, self.__class__) and 
-            self.__dict__ == other.__dict__)
+            self.value == other.value)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
 class SentinelToken(AbstractToken):
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.SENTINEL
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_LOWEST
 
 class LeftParenthesisToken(AbstractToken):
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.OPEN
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_6
@@ -220,6 +532,12 @@ class LeftParenthesisToken(AbstractToken):
         return "("
 
 class RightParenthesisToken(AbstractToken):
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.CLOSE
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_6
@@ -228,26 +546,42 @@ class RightParenthesisToken(AbstractToken):
         return ")"
 
 class ConstantToken(AbstractToken):
+    __slots__ = ('_value', )
+
+    @property
+    def kind(self):
+        return TokenKind.VALUE
+
     def __init__(self, value):
         self._value = value
 
+    @property
+    def value(self):
+        return self._value
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_1
 
-    def create_value_sentence(self):
-        return SimpleSentence(PropositionalConstant(self._value))
+    def create_value_sentence(self, interner):
+        return interner.create(SimpleSentence, PropositionalConstant(self._value))
 
     def __repr__(self):
         return "%s(%r)" % (self.__class__.__name__, self._value)
 
 class NegationToken(AbstractToken):
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.PREFIX
+
     @property
     def binding_power(self):
         return  TokenBindingPower.LEVEL_2
 
-    def create_unary_sentence(self, target):
-        return Negation(target)
+    def create_unary_sentence(self, interner, target):
+        return interner.create(Negation, target)
 
     @property
     def is_unary(self):
@@ -255,9 +589,14 @@ class NegationToken(AbstractToken):
 
 class BinaryOperationToken(AbstractToken):
     __metaclass__ = ABCMeta
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.INFIX
 
     @abstractmethod
-    def create_binary_sentence(self, left, right):
+    def create_binary_sentence(self, interner, left, right):
         pass
 
     @property
@@ -265,58 +604,87 @@ class BinaryOperationToken(AbstractToken):
         return True
 
 class ConjunctionToken(BinaryOperationToken):
+    __slots__ = ()
+
     @property
     def binding_power(self):
         return  TokenBindingPower.LEVEL_3
 
-    def create_binary_sentence(self, left, right):
-        return Conjunction(left, right)
+    def create_binary_sentence(self, interner, left, right):
+        return interner.create(Conjunction, left, right)
 
 class DisjunctionToken(BinaryOperationToken):
+    __slots__ = ()
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_4
 
-    def create_binary_sentence(self, left, right):
-        return Disjunction(left, right)
+    def create_binary_sentence(self, interner, left, right):
+        return interner.create(Disjunction, left, right)
 
 class EquivalenceToken(BinaryOperationToken):
+    __slots__ = ()
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_5
 
-    def create_binary_sentence(self, left, right):
-        return Equivalence(left, right)
+    def create_binary_sentence(self, interner, left, right):
+        return interner.create(Equivalence, left, right)
 
     def __str__(self):
         return "<=>"
 
 class ImplicationToken(BinaryOperationToken):
+    __slots__ = ()
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_5
 
-    def create_binary_sentence(self, left, right):
-        return Implication(left, right)
+    def create_binary_sentence(self, interner, left, right):
+        return interner.create(Implication, left, right)
 
     def __str__(self):
         return "=>"
 
 class ReductionToken(BinaryOperationToken):
+    __slots__ = ()
+
     @property
     def binding_power(self):
         return TokenBindingPower.LEVEL_5
 
-    def create_binary_sentence(self, left, right):
-        return Reduction(left, right)
+    def create_binary_sentence(self, interner, left, right):
+        return interner.create(Reduction, left, right)
 
     def __str__(self):
         return "<="
 
 class EndToken(AbstractToken):
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return TokenKind.END
+
     @property
     def binding_power(self):
         return  TokenBindingPower.LEVEL_6
 
     def __str__(self):
-        return "(end)"
\ No newline at end of file
+        return "(end)"
+
+END_TOKEN = EndToken()
+
+OPERATOR_TOKENS = {
+    "negation": NegationToken(),
+    "conjunction": ConjunctionToken(),
+    "disjunction": DisjunctionToken(),
+    "equivalence": EquivalenceToken(),
+    "implication": ImplicationToken(),
+    "reduction": ReductionToken(),
+    "left_parenthesis": LeftParenthesisToken(),
+    "right_parenthesis": RightParenthesisToken()
+}
\ No newline at end of file
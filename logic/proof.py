@@ -1,4 +1,25 @@
-from logic.syntax import Implication, Negation, SimpleSentence
+from collections import OrderedDict
+from heapq import heappush, heappop
+from itertools import chain, count, product
+from multiprocessing import Pool
+from threading import Lock
+from timeit import default_timer
+import json
+import sqlite3
+from logic.language import PropositionalConstant
+from logic.syntax import (Implication, Negation, SimpleSentence, iter_sentences,
+    DEFAULT_INTERNER, sentence_to_postfix, sentence_from_postfix, POSTFIX_SYMBOLS)
+
+class SearchStrategy(object):
+    BREADTH_FIRST = 'breadth_first'
+    ITERATIVE_DEEPENING = 'iterative_deepening'
+    BEST_FIRST = 'best_first'
+
+DEFAULT_MAX_DEPTH = 8
+DEFAULT_MAX_NODES = 50000
+DEFAULT_PROOF_CACHE_CAPACITY = 4096
+DEFAULT_MAX_LEMMA_CONSTANTS = 2
+MAX_WIDENED_POOL = 512
 
 class ImplicationElimination(object):
     def __init__(self, implication):
@@ -8,6 +29,10 @@ class ImplicationElimination(object):
     def implication(self):
         return self._implication
 
+    @property
+    def sentences(self):
+        return (self._implication, )
+
     @property
     def resulting_premise(self):
         return self.implication.consequent
@@ -16,15 +41,67 @@ class ImplicationElimination(object):
         return (isinstance(other, type(self)) and 
             self._implication == other.implication)
 
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.__class__, self._implication))
+
     def __repr__(self):
         return "%s(%r)" % (self.__class__, self.implication)
 
-class ImplicationDistribution(object):
+# Cites one of the problem's premises. Proofs from the prover leave these out
+class Premise(object):
+    def __init__(self, sentence):
+        self._sentence = sentence
+
+    @property
+    def sentences(self):
+        return (self._sentence, )
+
+    @property
+    def resulting_premise(self):
+        return self._sentence
+
+    def __eq__(self, other):
+        return isinstance(other, type(self)) and self._sentence == other.resulting_premise
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.__class__, self._sentence))
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self._sentence)
+
+# Axiom schemas compare by the sentences they were instantiated with, which
+# each schema gives as sentences
+class AxiomSchema(object):
+    def __eq__(self, other):
+        return isinstance(other, type(self)) and self.sentences == other.sentences
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.__class__, ) + self.sentences)
+
+    def __repr__(self):
+        return "%s(%s)" % (
+            self.__class__.__name__, ', '.join([repr(s) for s in self.sentences])
+        )
+
+class ImplicationDistribution(AxiomSchema):
     def __init__(self, sentence_1, sentence_2, sentence_3):
         self._sentence_1 = sentence_1
         self._sentence_2 = sentence_2
         self._sentence_3 = sentence_3
     
+    @property
+    def sentences(self):
+        return (self._sentence_1, self._sentence_2, self._sentence_3)
+
     @property
     def resulting_premise(self):
         return Implication(
@@ -35,11 +112,15 @@ class ImplicationDistribution(object):
             )
         )
 
-class ImplicationCreation(object):
+class ImplicationCreation(AxiomSchema):
     def __init__(self, sentence_1, sentence_2):
         self._sentence_1 = sentence_1
         self._sentence_2 = sentence_2
     
+    @property
+    def sentences(self):
+        return (self._sentence_1, self._sentence_2)
+
     @property
     def resulting_premise(self):
         return Implication(
@@ -47,11 +128,15 @@ class ImplicationCreation(object):
             Implication(self._sentence_2, self._sentence_1)
         )
 
-class ContradictionRealisation(object):
+class ContradictionRealisation(AxiomSchema):
     def __init__(self, sentence_1, sentence_2):
         self._sentence_1 = sentence_1
         self._sentence_2 = sentence_2
     
+    @property
+    def sentences(self):
+        return (self._sentence_1, self._sentence_2)
+
     @property
     def resulting_premise(self):
         return Implication(
@@ -81,8 +166,659 @@ class ProofProblem(object):
     def premises(self):
         return self._premises
 
+def is_valid_mendelson_sentence(sentence):
+    return all(
+        s.__class__ in (Implication, Negation, SimpleSentence)
+        for s in iter_sentences(sentence)
+    )
+
+def _canonical_order(sentences):
+    return sorted(set(sentences), key=lambda s: (s.depth, str(s)))
+
+def _problem_pool(premises, conclusion):
+    return _canonical_order([
+        s for sentence in list(premises) + [conclusion] for s in iter_sentences(sentence)
+    ])
+
+def _is_past(deadline):
+    return deadline is not None and default_timer() > deadline
+
+# The pool, then each time one more layer of negations and implications over
+# it, keeping to sentences no deeper than bound. Stops at the deadline, and
+# before a layer that could grow the pool past MAX_WIDENED_POOL sentences
+def _widenings(pool, bound, deadline=None):
+    while True:
+        yield pool
+        shallow = [s for s in pool if s.depth < bound]
+        if len(pool) + len(shallow) * (1 + len(shallow)) > MAX_WIDENED_POOL:
+            return
+        widened = pool + [Negation(s) for s in shallow]
+        for antecedent in shallow:
+            if _is_past(deadline):
+                return
+            widened.extend([Implication(antecedent, consequent) for consequent in shallow])
+        widened = _canonical_order(widened)
+        if len(widened) == len(pool):
+            return
+        pool = widened
+
+# The antecedents along the consequents of a sentence, and the sentence they
+# finally imply
+def _hypotheses(sentence):
+    hypotheses = []
+    while isinstance(sentence, Implication):
+        hypotheses.append(sentence.antecedent)
+        sentence = sentence.consequent
+    return hypotheses, sentence
+
+# The deduction theorem: turns a proof of goal that may also use the
+# hypotheses as premises into one of h1 => (h2 => ... goal), discharging the
+# last hypothesis first. Each formula f proved becomes h => f
+def _discharge(hypotheses, goal, proof):
+    for hypothesis in reversed(hypotheses):
+        steps = []
+        discharged = set()
+
+        # Premises and the hypothesis, which proofs leave out, and axioms
+        def cite(formula):
+            if formula in discharged:
+                return
+            discharged.add(formula)
+            if formula == hypothesis:
+                steps.extend(_identity_steps(hypothesis))
+            else:
+                creation = ImplicationCreation(formula, hypothesis)
+                steps.extend([creation, ImplicationElimination(creation.resulting_premise)])
+
+        for step in proof:
+            formula = step.resulting_premise
+            if formula in discharged:
+                continue
+            if isinstance(step, ImplicationElimination):
+                cite(step.implication.antecedent)
+                cite(step.implication)
+                discharged.add(formula)
+                distribution = ImplicationDistribution(
+                    hypothesis, step.implication.antecedent, formula
+                )
+                steps.extend([
+                    distribution,
+                    ImplicationElimination(distribution.resulting_premise),
+                    ImplicationElimination(distribution.resulting_premise.consequent)
+                ])
+            else:
+                steps.append(step)
+                cite(formula)
+        cite(goal)
+        proof = tuple(steps)
+        goal = Implication(hypothesis, goal)
+    return proof
+
+def _identity_steps(sentence):
+    implication = Implication(sentence, sentence)
+    distribution = ImplicationDistribution(sentence, implication, sentence)
+    return [
+        distribution,
+        ImplicationCreation(sentence, implication),
+        ImplicationElimination(distribution.resulting_premise),
+        ImplicationCreation(sentence, sentence),
+        ImplicationElimination(distribution.resulting_premise.consequent)
+    ]
+
+def _axiom_instances(pool):
+    for first in pool:
+        for second in pool:
+            yield ImplicationCreation(first, second)
+            yield ContradictionRealisation(first, second)
+            for third in pool:
+                yield ImplicationDistribution(first, second, third)
+
+# A cached theorem with its constants substituted. Used like an axiom
+# instance while searching, then replaced by the steps of its proof
+class _LemmaInstance(object):
+    def __init__(self, conclusion, proof, substitutions, interner):
+        self._conclusion = conclusion
+        self._proof = proof
+        self._substitutions = substitutions
+        self._interner = interner
+
+    @property
+    def resulting_premise(self):
+        return self._conclusion
+
+    @property
+    def size(self):
+        return len(self._proof)
+
+    @property
+    def steps(self):
+        return tuple([
+            _step_from_postfix(s, self._interner, self._substitutions) for s in self._proof
+        ])
+
+def _theorem_labels(conclusion):
+    return sorted(set([i for i in conclusion if i not in POSTFIX_SYMBOLS]))
+
+def _lemma_instances(pool, theorems, interner):
+    for conclusion, proof in theorems:
+        labels = _theorem_labels(conclusion)
+        for sentences in product(pool, repeat=len(labels)):
+            substitutions = dict(zip(labels, sentences))
+            yield _LemmaInstance(
+                sentence_from_postfix(conclusion, interner, substitutions),
+                proof, substitutions, interner
+            )
+
+def _seed_steps(pool, theorems, interner):
+    return chain(_axiom_instances(pool), _lemma_instances(pool, theorems, interner))
+
+def _seed_size(step):
+    return step.size if isinstance(step, _LemmaInstance) else 1
+
+_SEED_SCHEMAS = (ImplicationCreation, ContradictionRealisation, ImplicationDistribution)
+_SCHEMA_LABELS = ('s1', 's2', 's3')
+
+# The resulting premise of each schema in postfix form, over _SCHEMA_LABELS
+_SCHEMA_POSTFIXES = dict(
+    (schema, sentence_to_postfix(schema(*[
+        SimpleSentence(PropositionalConstant(l)) for l in _SCHEMA_LABELS[:arity]
+    ]).resulting_premise))
+    for schema, arity in zip(_SEED_SCHEMAS, (2, 2, 3))
+)
+
+# Keys of the seed steps whose first sentence is pool[i] for i in share,
+# share + num_shares and so on. Keys sort in the order _seed_steps yields the
+# steps: (0, i, j, 0), (0, i, j, 1) and (0, i, j, 2, k) for the axiom schemas
+# of _SEED_SCHEMAS, (1, theorem, pool indices) for lemmas
+def _seed_keys(pool_size, theorems, share, num_shares):
+    for i in range(share, pool_size, num_shares):
+        for j in range(pool_size):
+            yield (0, i, j, 0)
+            yield (0, i, j, 1)
+            for k in range(pool_size):
+                yield (0, i, j, 2, k)
+    for theorem, (conclusion, _) in enumerate(theorems):
+        for indices in product(range(pool_size), repeat=len(_theorem_labels(conclusion))):
+            if (indices[0] if indices else 0) % num_shares == share:
+                yield (1, theorem, indices)
+
+# The interned resulting premise and the step of a seed key. Pool sentences
+# must be interned, so only the sentences around them are created
+def _seed_from_key(key, pool, theorems, interner):
+    if key[0] == 0:
+        schema = _SEED_SCHEMAS[key[3]]
+        sentences = [pool[i] for i in key[1:3] + key[4:]]
+        formula = sentence_from_postfix(
+            _SCHEMA_POSTFIXES[schema], interner, dict(zip(_SCHEMA_LABELS, sentences))
+        )
+        return formula, schema(*sentences)
+    conclusion, proof = theorems[key[1]]
+    substitutions = dict(zip(_theorem_labels(conclusion), [pool[i] for i in key[2]]))
+    formula = sentence_from_postfix(conclusion, interner, substitutions)
+    return formula, _LemmaInstance(formula, proof, substitutions, interner)
+
+# Runs in worker processes. Instantiates and interns a share of the seed
+# steps, and sends back each distinct formula once: the key of its first
+# step, then the size and key of its first smallest step. Stops after
+# max_formulas + 1 formulas, when the search is over budget anyway, and
+# returns None when out of time
+def _seed_share(item):
+    pool, theorems, share, num_shares, max_formulas, time_left = item
+    deadline = None if time_left is None else default_timer() + time_left
+    pool = [sentence_from_postfix(s) for s in pool]
+    formulas = {}
+    for key in _seed_keys(len(pool), theorems, share, num_shares):
+        if _is_past(deadline):
+            return None
+        formula, step = _seed_from_key(key, pool, theorems, DEFAULT_INTERNER)
+        size = _seed_size(step)
+        entry = formulas.get(formula)
+        if entry is None:
+            if len(formulas) > max_formulas:
+                break
+            formulas[formula] = [key, size, key]
+        elif size < entry[1]:
+            entry[1:] = [size, key]
+    return [tuple(entry) for entry in formulas.values()]
+
+# Derived formulas by antecedent, with their proof tree sizes. Yields the
+# modus ponens each formula can take part in with those already added
+class _ModusPonensIndex(object):
+    def __init__(self):
+        self._sizes = {}
+        self._implications = {}
+
+    def add(self, formula, size):
+        self._sizes[formula] = size
+        if isinstance(formula, Implication):
+            self._implications.setdefault(formula.antecedent, []).append(formula)
+
+    def iter_eliminations(self, formula):
+        sizes = self._sizes
+        implications = list(self._implications.get(formula, ()))
+        if isinstance(formula, Implication) and formula.antecedent in sizes:
+            implications.append(formula)
+        for implication in implications:
+            yield implication, 1 + sizes[implication] + sizes[implication.antecedent]
+
+# Forward search in levels: level 0 holds the premises, level 1 the axiom
+# instances over the pool, and every later level the modus ponens results
+# needing something from the level before. Formulas keep the justification
+# of the level they were first derived at (preferring the smallest proof
+# tree within a level), so the proof extracted is one of minimal depth,
+# though not necessarily the one with fewest steps. Implications are indexed
+# by antecedent, so a new formula only meets the implications it can fire.
+# The search is saturated when a level derives nothing new within budget
+class _LevelSearch(object):
+    def __init__(self, premises, goal, pool, max_depth, max_nodes, interner, deadline=None,
+            theorems=(), workers=None, num_workers=0):
+        self._goal = interner.intern(goal)
+        self._theorems = theorems
+        self._pool = [interner.intern(s) for s in pool]
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._interner = interner
+        self._deadline = deadline
+        self._workers = workers
+        self._num_workers = num_workers
+        # formula -> (depth, proof tree size, step or None for premises)
+        self._derived = {}
+        self._index = _ModusPonensIndex()
+        self._level = []
+        self._premises = [interner.intern(s) for s in premises]
+        self.num_expanded = 0
+        self.timed_out = False
+        self.saturated = False
+
+    @property
+    def num_nodes(self):
+        return len(self._derived)
+
+    def run(self):
+        self._add_level(dict((s, (0, 0, None)) for s in self._premises))
+        for depth in range(1, self._max_depth + 1):
+            if self._goal in self._derived:
+                break
+            candidates = self._expand(depth)
+            if candidates is None:
+                return None
+            if not candidates:
+                self.saturated = True
+                return None
+            self._add_level(candidates)
+        if self._goal not in self._derived:
+            return None
+        return _extract_proof(self._derived, self._goal)
+
+    def _add_level(self, entries):
+        self._level = list(entries)
+        for formula in self._level:
+            self._derived[formula] = entries[formula]
+            self._index.add(formula, entries[formula][1])
+
+    def _is_late(self):
+        if _is_past(self._deadline):
+            self.timed_out = True
+        return self.timed_out
+
+    def _expand(self, depth):
+        derived = self._derived
+        candidates = {}
+
+        def offer(formula, size, step):
+            if formula in derived:
+                return True
+            current = candidates.get(formula)
+            if current is None:
+                if len(derived) + len(candidates) >= self._max_nodes:
+                    return False
+            elif current[1] <= size:
+                return True
+            candidates[formula] = (depth, size, step)
+            return True
+
+        if depth == 1:
+            if self._workers is None:
+                seeds = (
+                    (self._interner.intern(step.resulting_premise), _seed_size(step), step)
+                    for step in _seed_steps(self._pool, self._theorems, self._interner)
+                )
+            else:
+                seeds = self._shared_seeds()
+                if seeds is None:
+                    return None
+            for formula, size, step in seeds:
+                if self._is_late():
+                    return None
+                if not offer(formula, size, step):
+                    return None
+        for formula in self._level:
+            self.num_expanded += 1
+            if self._is_late():
+                return None
+            for implication, size in self._index.iter_eliminations(formula):
+                if not offer(implication.consequent, size, ImplicationElimination(implication)):
+                    return None
+        return candidates
+
+    # The seeds instantiated by the workers, merged into the order and with
+    # the steps the sequential search would offer them in
+    def _shared_seeds(self):
+        time_left = None
+        if self._deadline is not None:
+            time_left = self._deadline - default_timer()
+        pool = [sentence_to_postfix(s) for s in self._pool]
+        shares = self._workers.map(_seed_share, [
+            (pool, self._theorems, share, self._num_workers, self._max_nodes, time_left)
+            for share in range(self._num_workers)
+        ])
+        if any([share is None for share in shares]):
+            self.timed_out = True
+            return None
+
+        # More distinct seeds than max_nodes cannot all be offered
+        seeds = {}
+        for first_key, size, key in chain.from_iterable(shares):
+            formula, step = _seed_from_key(key, self._pool, self._theorems, self._interner)
+            entry = seeds.get(formula)
+            if entry is None:
+                if len(seeds) >= self._max_nodes:
+                    return None
+                seeds[formula] = [first_key, size, key, step]
+                continue
+            entry[0] = min(entry[0], first_key)
+            if (size, key) < (entry[1], entry[2]):
+                entry[1:] = [size, key, step]
+        return [
+            (formula, size, step)
+            for formula, (_, size, _, step) in sorted(seeds.items(), key=lambda i: i[1][0])
+        ]
+
+# Walks the justifications back from the goal, emitting the steps each
+# formula needs before it and every formula once
+def _extract_proof(derived, goal):
+    steps = []
+    emitted = set()
+    stack = [(goal, False)]
+    while stack:
+        formula, visited = stack.pop()
+        if formula in emitted:
+            continue
+        step = derived[formula][2]
+        if step is None:
+            emitted.add(formula)
+        elif isinstance(step, _LemmaInstance):
+            emitted.add(formula)
+            steps.extend(step.steps)
+        elif visited or not isinstance(step, ImplicationElimination):
+            emitted.add(formula)
+            steps.append(step)
+        else:
+            stack.append((formula, True))
+            stack.append((step.implication, False))
+            stack.append((step.implication.antecedent, False))
+    return tuple(steps)
+
+# Follows the consequents of a formula until reaching a goal; formulas
+# unrelated to the goals rank behind, smaller ones first
+def _goal_distance(formula, goals):
+    distance = 0
+    node = formula
+    while node not in goals:
+        if not isinstance(node, Implication):
+            return distance + formula.depth + 1
+        node = node.consequent
+        distance += 1
+    return distance
+
+# Given clause style best first search. Premises and axiom instances are
+# queued by their distance to the goals, then proof tree size; each one
+# taken off the queue meets every implication already taken off through the
+# antecedent index. Goals chain backwards from the conclusion: the
+# consequents of an implication goal are goals (reachable by
+# ImplicationCreation), and so is the antecedent of any derived implication
+# concluding a goal. Proofs are usually found with far fewer formulas than
+# the level search, but need not be of minimal depth. The search is
+# saturated when the queue empties without any formula cut off by max_depth
+class _BestFirstSearch(object):
+    def __init__(self, premises, goal, pool, max_depth, max_nodes, interner, deadline=None,
+            theorems=()):
+        self._goal = interner.intern(goal)
+        self._theorems = theorems
+        self._premises = [interner.intern(s) for s in premises]
+        self._pool = [interner.intern(s) for s in pool]
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._interner = interner
+        self._derived = {}
+        self._expanded = set()
+        self._implications = {}
+        self._concluding = {}
+        self._goals = set()
+        self._queue = []
+        self._order = count()
+        self._deadline = deadline
+        self._cut_off = False
+        self.num_expanded = 0
+        self.timed_out = False
+        self.saturated = False
+
+    @property
+    def num_nodes(self):
+        return len(self._derived)
+
+    def run(self):
+        node = self._goal
+        while True:
+            self._add_goal(node)
+            if not isinstance(node, Implication):
+                break
+            node = node.consequent
+
+        for premise in self._premises:
+            self._offer(premise, 0, 0, None)
+        for step in _seed_steps(self._pool, self._theorems, self._interner):
+            if self._goal in self._derived:
+                break
+            if self._is_late():
+                return None
+            formula = self._interner.intern(step.resulting_premise)
+            if not self._offer(formula, 1, _seed_size(step), step):
+                return None
+
+        while self._queue and self._goal not in self._derived:
+            formula = heappop(self._queue)[-1]
+            if formula in self._expanded:
+                continue
+            if self._is_late() or not self._expand(formula):
+                return None
+        if self._goal not in self._derived:
+            self.saturated = not self._cut_off
+            return None
+        return _extract_proof(self._derived, self._goal)
+
+    def _is_late(self):
+        if _is_past(self._deadline):
+            self.timed_out = True
+        return self.timed_out
+
+    def _offer(self, formula, depth, size, step):
+        current = self._derived.get(formula)
+        if current is None:
+            if len(self._derived) >= self._max_nodes:
+                return False
+            if isinstance(formula, Implication):
+                self._concluding.setdefault(formula.consequent, []).append(formula)
+                if formula.consequent in self._goals:
+                    self._add_goal(formula.antecedent)
+        elif current[1] <= size or formula in self._expanded:
+            return True
+        self._derived[formula] = (depth, size, step)
+        self._push(formula)
+        return True
+
+    def _push(self, formula):
+        size = self._derived[formula][1]
+        heappush(self._queue, (
+            _goal_distance(formula, self._goals), size, next(self._order), formula
+        ))
+
+    def _add_goal(self, goal):
+        stack = [goal]
+        while stack:
+            goal = stack.pop()
+            if goal in self._goals:
+                continue
+            self._goals.add(goal)
+            if goal in self._derived and goal not in self._expanded:
+                self._push(goal)
+            stack.extend([i.antecedent for i in self._concluding.get(goal, ())])
+
+    def _expand(self, formula):
+        self.num_expanded += 1
+        self._expanded.add(formula)
+        implications = list(self._implications.get(formula, ()))
+        if isinstance(formula, Implication):
+            self._implications.setdefault(formula.antecedent, []).append(formula)
+            if formula.antecedent in self._expanded:
+                implications.append(formula)
+        for implication in implications:
+            antecedent_entry = self._derived[implication.antecedent]
+            implication_entry = self._derived[implication]
+            depth = 1 + max(antecedent_entry[0], implication_entry[0])
+            if depth > self._max_depth:
+                self._cut_off = True
+                continue
+            size = 1 + antecedent_entry[1] + implication_entry[1]
+            if not self._offer(implication.consequent, depth, size,
+                    ImplicationElimination(implication)):
+                return False
+        return True
+
+class ProofSearchStatistics(object):
+    def __init__(self, strategy, nodes_expanded, nodes_generated, elapsed, timed_out=False,
+            from_cache=False, saturated=False):
+        self._strategy = strategy
+        self._nodes_expanded = nodes_expanded
+        self._nodes_generated = nodes_generated
+        self._elapsed = elapsed
+        self._timed_out = timed_out
+        self._from_cache = from_cache
+        self._saturated = saturated
+
+    @property
+    def strategy(self):
+        return self._strategy
+
+    @property
+    def nodes_expanded(self):
+        return self._nodes_expanded
+
+    @property
+    def nodes_generated(self):
+        return self._nodes_generated
+
+    @property
+    def elapsed(self):
+        return self._elapsed
+
+    @property
+    def timed_out(self):
+        return self._timed_out
+
+    @property
+    def from_cache(self):
+        return self._from_cache
+
+    # Every formula within reach was derived without finding a proof, even
+    # with the pool widened as far as it goes; unlike running out of
+    # max_depth, max_nodes or time_limit, a larger budget would not help
+    @property
+    def saturated(self):
+        return self._saturated
+
+    def __repr__(self):
+        return ('%s(%r, expanded=%d, generated=%d, elapsed=%.6f, timed_out=%r, from_cache=%r, '
+            'saturated=%r)') % (
+            self.__class__.__name__, self._strategy, self._nodes_expanded, self._nodes_generated,
+            self._elapsed, self._timed_out, self._from_cache, self._saturated
+        )
+
+class ProofSearchResult(object):
+    def __init__(self, problem, proof, statistics):
+        self._problem = problem
+        self._proof = proof
+        self._statistics = statistics
+
+    @property
+    def problem(self):
+        return self._problem
+
+    @property
+    def proof(self):
+        return self._proof
+
+    @property
+    def statistics(self):
+        return self._statistics
+
+    @property
+    def is_proven(self):
+        return (self._proof is not None and
+            (len(self._proof) > 0 or self._problem.conclusion in self._problem.premises))
+
 class BruteForceMendelsonProver(object):
+    # time_limit is in seconds per problem. A ProofCache is consulted before
+    # searching, and its theorems are used as lemmas. processes spreads the
+    # instantiation of axioms and lemmas for a single search across workers
+    def __init__(self, strategy=SearchStrategy.BREADTH_FIRST, max_depth=DEFAULT_MAX_DEPTH,
+            max_nodes=DEFAULT_MAX_NODES, interner=DEFAULT_INTERNER, time_limit=None,
+            cache=None, processes=None):
+        if processes is not None and strategy == SearchStrategy.BEST_FIRST:
+            raise ValueError('Best first search runs in a single process')
+        self._processes = processes
+        self._strategy = strategy
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._interner = interner
+        self._time_limit = time_limit
+        self._cache = cache
+
+    @property
+    def strategy(self):
+        return self._strategy
+
+    @property
+    def max_depth(self):
+        return self._max_depth
+
+    @property
+    def max_nodes(self):
+        return self._max_nodes
+
+    @property
+    def time_limit(self):
+        return self._time_limit
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def processes(self):
+        return self._processes
+
     def __call__(self, problem):
+        return self.search(problem).proof
+
+    def search(self, problem):
+        result = self._cached_search(problem)
+        if result is None:
+            result = self._validated_search(problem, self._theorems())
+            self._store(result)
+        return result
+
+    def _validated_search(self, problem, theorems):
         if not self.is_valid_mendelson_sentence(problem.conclusion):
             raise InvalidMendelsonProblem(
                 'Invalid Mendelson sentence in conclusion: %r' % problem.conclusion
@@ -95,31 +831,394 @@ class BruteForceMendelsonProver(object):
                 )
 
         if problem.conclusion in problem.premises:
-            return tuple()
+            return ProofSearchResult(problem, tuple(),
+                ProofSearchStatistics(self._strategy, 0, 0, 0.0))
         else:
-            return self.find_best_solution(problem)
+            return self._search(problem, theorems)
+
+    def _cached_search(self, problem):
+        if self._cache is None:
+            return None
+        start = default_timer()
+        proof = self._cache.get(problem, self._interner)
+        if proof is None:
+            return None
+        return ProofSearchResult(problem, proof, ProofSearchStatistics(
+            self._strategy, 0, 0, default_timer() - start, from_cache=True
+        ))
+
+    def _store(self, result):
+        if self._cache is not None and result.proof:
+            self._cache.put(result.problem, result.proof)
+
+    def _theorems(self):
+        if self._cache is None:
+            return ()
+        return self._cache.theorems()
+
+    # Searches each problem in turn, or spread across a pool of worker
+    # processes, yielding the results in the order of the problems. The
+    # searches themselves run in a single process each
+    def search_many(self, problems, processes=None):
+        if processes is None:
+            for problem in problems:
+                yield self.search(problem)
+            return
+
+        settings = (self._strategy, self._max_depth, self._max_nodes, self._time_limit)
+        theorems = self._theorems()
+        problems = list(problems)
+        cached = [self._cached_search(p) for p in problems]
+        pool = Pool(processes)
+        try:
+            serialised = pool.imap(_search_serialised_problem, [
+                (settings, theorems, _problem_to_postfix(p))
+                for p, result in zip(problems, cached) if result is None
+            ])
+            for problem, result in zip(problems, cached):
+                if result is None:
+                    proof, statistics = next(serialised)
+                    result = ProofSearchResult(
+                        problem,
+                        tuple([_step_from_postfix(s, self._interner) for s in proof]),
+                        ProofSearchStatistics(*statistics)
+                    )
+                    self._store(result)
+                yield result
+        finally:
+            pool.terminate()
 
+    # Returns an empty tuple when no proof is found within the budgets
     def find_best_solution(self, problem):
-        test_eliminations = [
-            ImplicationElimination(p) 
-            for p in problem.premises 
-            if isinstance(p, Implication)
-        ]
+        return self._search(problem, self._theorems()).proof
+
+    # Axiom schemas and theorems are instantiated with sub sentences of the
+    # problem, and only once those run out with more sentences built from them
+    def _search(self, problem, theorems=()):
+        start = default_timer()
+        deadline = None
+        if self._time_limit is not None:
+            deadline = start + self._time_limit
+        premises = _canonical_order(problem.premises)
+        pool = _problem_pool(premises, problem.conclusion)
+        search_class = _LevelSearch
+        options = {'deadline': deadline, 'theorems': theorems}
+        if self._strategy == SearchStrategy.BREADTH_FIRST:
+            rounds = [pool]
+        elif self._strategy == SearchStrategy.ITERATIVE_DEEPENING:
+            # Deepens the sentences schemas may be instantiated with, so
+            # proofs needing only small instances are found without building
+            # the larger ones
+            rounds = [
+                [s for s in pool if s.depth <= depth]
+                for depth in sorted(set([s.depth for s in pool]))
+            ]
+        elif self._strategy == SearchStrategy.BEST_FIRST:
+            search_class = _BestFirstSearch
+            rounds = [pool]
+        else:
+            raise ValueError('Unknown search strategy %r' % self._strategy)
+
+        workers = None
+        if self._processes is not None:
+            workers = Pool(self._processes)
+            options.update(workers=workers, num_workers=self._processes)
+        try:
+            remaining = self._max_nodes
+            expanded = 0
+            generated = 0
+            proof = None
+            for round_pool in rounds:
+                search = search_class(premises, problem.conclusion, round_pool,
+                    self._max_depth, remaining, self._interner, **options)
+                proof = search.run()
+                expanded += search.num_expanded
+                generated += search.num_nodes
+                remaining -= search.num_nodes
+                if proof is not None or search.timed_out or remaining <= 0:
+                    break
+
+            # Saturated under budget: the deduction theorem moves the antecedents
+            # of the conclusion into the premises, and the pool is widened while
+            # the rounds keep saturating. Proofs found this way need not be of
+            # minimal depth
+            if proof is None and search.saturated:
+                hypotheses, goal = _hypotheses(problem.conclusion)
+                premises = _canonical_order(premises + hypotheses)
+                pool = _problem_pool(premises, goal)
+                bound = 1 + max([s.depth for s in pool])
+                for round_pool in _widenings(pool, bound, deadline):
+                    search = search_class(premises, goal, round_pool,
+                        self._max_depth, remaining, self._interner, **options)
+                    proof = search.run()
+                    expanded += search.num_expanded
+                    generated += search.num_nodes
+                    remaining -= search.num_nodes
+                    if proof is not None:
+                        proof = _discharge(hypotheses, goal, proof)
+                    if not search.saturated or remaining <= 0:
+                        break
+        finally:
+            if workers is not None:
+                workers.terminate()
 
-        return next((
-            tuple([e])
-            for e in test_eliminations 
-            if e.resulting_premise == problem.conclusion
-        ), tuple())
+        # Widening also stops at the deadline, between searches
+        timed_out = search.timed_out or (proof is None and _is_past(deadline))
+        statistics = ProofSearchStatistics(
+            self._strategy, expanded, generated, default_timer() - start, timed_out,
+            saturated=search.saturated and not timed_out
+        )
+        return ProofSearchResult(problem, tuple() if proof is None else proof, statistics)
 
     def is_valid_mendelson_sentence(self, sentence):
-        if sentence.__class__ not in (Implication, Negation, SimpleSentence):
-            return False
-        else:
-            return all([
-                self.is_valid_mendelson_sentence(sub_sentence) 
-                for sub_sentence in sentence.sub_sentences
-            ])
+        return is_valid_mendelson_sentence(sentence)
+
+PROOF_STEP_CLASSES = dict((c.__name__, c) for c in (
+    Premise, ImplicationElimination, ImplicationCreation, ImplicationDistribution,
+    ContradictionRealisation
+))
+
+def _problem_to_postfix(problem):
+    return (
+        [sentence_to_postfix(p) for p in _canonical_order(problem.premises)],
+        sentence_to_postfix(problem.conclusion)
+    )
+
+def _step_to_postfix(step, labels=None):
+    postfixes = [sentence_to_postfix(s) for s in step.sentences]
+    if labels is not None:
+        postfixes = [[labels.get(i, i) for i in p] for p in postfixes]
+    return (step.__class__.__name__, postfixes)
+
+def _step_from_postfix(step, interner, substitutions=None):
+    name, sentences = step
+    return PROOF_STEP_CLASSES[name](*[
+        sentence_from_postfix(s, interner, substitutions) for s in sentences
+    ])
+
+# Runs in worker processes. Problems and proofs travel in postfix form, like
+# the sentences of logic.parser.parse_many
+def _search_serialised_problem(item):
+    (strategy, max_depth, max_nodes, time_limit), theorems, (premises, conclusion) = item
+    prover = BruteForceMendelsonProver(strategy, max_depth, max_nodes, time_limit=time_limit)
+    result = prover._validated_search(ProofProblem(
+        [sentence_from_postfix(p) for p in premises], sentence_from_postfix(conclusion)
+    ), theorems)
+    statistics = result.statistics
+    return (
+        [_step_to_postfix(s) for s in result.proof],
+        (statistics.strategy, statistics.nodes_expanded, statistics.nodes_generated,
+            statistics.elapsed, statistics.timed_out, statistics.from_cache,
+            statistics.saturated)
+    )
+
+# Constants are renamed v1, v2, ... in order of appearance in the conclusion
+# and then the premises, ordered by their shape. Returns the key along with
+# the original label of each new one
+def _canonical_problem(problem):
+    shape = lambda postfix: tuple([i if i in POSTFIX_SYMBOLS else '' for i in postfix])
+    conclusion = sentence_to_postfix(problem.conclusion)
+    premises = sorted(
+        [sentence_to_postfix(p) for p in problem.premises], key=lambda p: (shape(p), p)
+    )
+    labels = OrderedDict()
+    for postfix in [conclusion] + premises:
+        for item in postfix:
+            if item not in POSTFIX_SYMBOLS and item not in labels:
+                labels[item] = 'v%d' % (len(labels) + 1)
+    rename = lambda postfix: tuple([labels.get(i, i) for i in postfix])
+    key = (tuple(sorted([rename(p) for p in premises])), rename(conclusion))
+    return key, dict((canonical, label) for label, canonical in labels.items())
+
+def _key_from_json(text):
+    premises, conclusion = json.loads(text)
+    return (tuple([tuple(p) for p in premises]), tuple(conclusion))
+
+# Proofs by the canonical form of their problem, so a proof of a => a also
+# proves b => b. Held in memory with least recently used eviction and, given
+# a path, in an sqlite database shared between runs. Proofs without premises
+# are theorems, which the prover instantiates like axiom schemas
+class ProofCache(object):
+    def __init__(self, capacity=DEFAULT_PROOF_CACHE_CAPACITY, path=None):
+        if capacity < 1:
+            raise ValueError('Capacity must be at least 1')
+        self._capacity = capacity
+        self._proofs = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS proofs '
+                '(problem TEXT PRIMARY KEY, is_theorem INTEGER NOT NULL, proof TEXT NOT NULL)'
+            )
+            self._connection.commit()
+
+    def get(self, problem, interner=DEFAULT_INTERNER):
+        key, labels = _canonical_problem(problem)
+        with self._lock:
+            proof = self._proofs.pop(key, None)
+            if proof is None and self._connection is not None:
+                row = self._connection.execute(
+                    'SELECT proof FROM proofs WHERE problem = ?', (json.dumps(key), )
+                ).fetchone()
+                if row is not None:
+                    proof = json.loads(row[0])
+            if proof is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._remember(key, proof)
+
+        substitutions = dict(
+            (canonical, interner.create(SimpleSentence, PropositionalConstant(label)))
+            for canonical, label in labels.items()
+        )
+        return tuple([_step_from_postfix(s, interner, substitutions) for s in proof])
+
+    def put(self, problem, proof):
+        key, labels = _canonical_problem(problem)
+        canonical = dict((label, c) for c, label in labels.items())
+        proof = [_step_to_postfix(s, canonical) for s in proof]
+        with self._lock:
+            self._remember(key, proof)
+            if self._connection is not None:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO proofs VALUES (?, ?, ?)',
+                    (json.dumps(key), int(not key[0]), json.dumps(proof))
+                )
+                self._connection.commit()
+
+    def _remember(self, key, proof):
+        self._proofs.pop(key, None)
+        self._proofs[key] = proof
+        while len(self._proofs) > self._capacity:
+            self._proofs.popitem(last=False)
+
+    # (conclusion postfix, proof) pairs of the theorems over at most
+    # max_constants constants, as each one is instantiated with every
+    # combination of sentences from the problem
+    def theorems(self, max_constants=DEFAULT_MAX_LEMMA_CONSTANTS):
+        with self._lock:
+            entries = dict((k, p) for k, p in self._proofs.items() if not k[0])
+            if self._connection is not None:
+                for problem, proof in self._connection.execute(
+                        'SELECT problem, proof FROM proofs WHERE is_theorem = 1'):
+                    entries.setdefault(_key_from_json(problem), json.loads(proof))
+        return [
+            (conclusion, proof) for (_, conclusion), proof in sorted(entries.items())
+            if len(set([i for i in conclusion if i not in POSTFIX_SYMBOLS])) <= max_constants
+        ]
+
+    def invalidate(self):
+        with self._lock:
+            self._proofs.clear()
+            if self._connection is not None:
+                self._connection.execute('DELETE FROM proofs')
+                self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def hit_rate(self):
+        lookups = self._hits + self._misses
+        return float(self._hits) / lookups if lookups else 0.0
+
+    def __contains__(self, problem):
+        key = _canonical_problem(problem)[0]
+        with self._lock:
+            return key in self._proofs
+
+    def __len__(self):
+        return len(self._proofs)
+
+    def __repr__(self):
+        return '%s(capacity=%r, size=%r, hits=%r, misses=%r)' % (
+            self.__class__.__name__,
+            self._capacity,
+            len(self),
+            self._hits,
+            self._misses
+        )
+
+class ProofCheckResult(object):
+    def __init__(self, step_index=None, error=None):
+        self._step_index = step_index
+        self._error = error
+
+    # The index of the first invalid step, or the number of steps when they
+    # are all valid but never reach the conclusion
+    @property
+    def step_index(self):
+        return self._step_index
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def is_valid(self):
+        return self._error is None
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__) and
+            self._step_index == other.step_index and self._error == other.error)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self._step_index, self._error)
+
+# Checks linear proofs in one pass. Everything derived so far sits in one
+# set, so each step is a constant number of hash lookups; sentences built
+# by the parser or prover share sub sentences, so those lookups compare by
+# identity rather than structure
+class ProofChecker(object):
+    def check(self, problem, proof):
+        premises = problem.premises
+        derived = set(premises)
+        for index, step in enumerate(proof):
+            if isinstance(step, Premise):
+                if step.resulting_premise not in premises:
+                    return ProofCheckResult(index, '%s is not a premise' % step.resulting_premise)
+            elif isinstance(step, AxiomSchema):
+                if not all([is_valid_mendelson_sentence(s) for s in step.sentences]):
+                    return ProofCheckResult(index, 'Invalid Mendelson sentence in %r' % step)
+            elif isinstance(step, ImplicationElimination):
+                implication = step.implication
+                if not isinstance(implication, Implication):
+                    return ProofCheckResult(index, '%s is not an implication' % implication)
+                if implication not in derived:
+                    return ProofCheckResult(index, '%s has not been derived' % implication)
+                if implication.antecedent not in derived:
+                    return ProofCheckResult(index,
+                        '%s has not been derived' % implication.antecedent)
+            else:
+                return ProofCheckResult(index, 'Unknown proof step %r' % step)
+            derived.add(step.resulting_premise)
+
+        if problem.conclusion not in derived:
+            return ProofCheckResult(len(proof), '%s is never derived' % problem.conclusion)
+        return ProofCheckResult()
 
 class InvalidMendelsonProblem(Exception):
     pass
\ No newline at end of file
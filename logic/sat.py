@@ -0,0 +1,461 @@
+from heapq import heapify, heappop, heappush
+from logic.language import TruthAssignment
+
+def find_satisfying_assignment(sentence):
+    encoder = TseitinEncoder()
+    solver = Solver()
+    root = encoder.encode(sentence)
+    for clause in encoder.clauses:
+        solver.add_clause(clause)
+    solver.add_clause([root])
+
+    if not solver.solve():
+        return None
+    return encoder.assignment(solver)
+
+class TseitinEncoder(object):
+    def __init__(self):
+        self._num_variables = 0
+        self._clauses = []
+        self._constants_to_variables = {}
+        self._literals = {}
+
+    @property
+    def num_variables(self):
+        return self._num_variables
+
+    @property
+    def clauses(self):
+        return self._clauses
+
+    @property
+    def constants_to_variables(self):
+        return self._constants_to_variables
+
+    def new_variable(self):
+        self._num_variables += 1
+        return self._num_variables
+
+    def variable_for(self, constant):
+        variable = self._constants_to_variables.get(constant)
+        if variable is None:
+            variable = self.new_variable()
+            self._constants_to_variables[constant] = variable
+        return variable
+
+    def encode(self, sentence):
+        literals = self._literals
+        stack = [(sentence, False)]
+        while stack:
+            node, visited = stack.pop()
+            if id(node) in literals:
+                continue
+            if not visited:
+                stack.append((node, True))
+                stack.extend([(s, False) for s in node.sub_sentences])
+            else:
+                operands = [literals[id(s)][0] for s in node.sub_sentences]
+                # The node is kept alongside its literal so its id can't be reused
+                literals[id(node)] = (node.tseitin_literal(self, operands), node)
+        return literals[id(sentence)][0]
+
+    def conjunction(self, literals):
+        output = self.new_variable()
+        for literal in literals:
+            self._clauses.append([-output, literal])
+        self._clauses.append([output] + [-literal for literal in literals])
+        return output
+
+    def disjunction(self, literals):
+        output = self.new_variable()
+        for literal in literals:
+            self._clauses.append([output, -literal])
+        self._clauses.append([-output] + list(literals))
+        return output
+
+    def equivalence(self, literal_1, literal_2):
+        output = self.new_variable()
+        self._clauses.extend([
+            [-output, -literal_1, literal_2],
+            [-output, literal_1, -literal_2],
+            [output, literal_1, literal_2],
+            [output, -literal_1, -literal_2]
+        ])
+        return output
+
+    def assignment(self, solver):
+        return TruthAssignment(dict(
+            (constant, solver.model_value(variable))
+            for constant, variable in self._constants_to_variables.items()
+        ))
+
+def _code(literal):
+    return 2 * literal if literal > 0 else 1 - 2 * literal
+
+def _luby(index):
+    size, sequence = 1, 0
+    while size < index + 1:
+        sequence += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        sequence -= 1
+        index = index % size
+    return 2 ** sequence
+
+# CDCL: two watched literals, first UIP learning, VSIDS with phase saving and
+# Luby restarts. Literals are DIMACS style ints, coded internally as
+# 2 * variable (+ 1 when negated) so a literal's negation is code ^ 1
+class Solver(object):
+    RESTART_BASE = 100
+    ACTIVITY_DECAY = 0.95
+    INITIAL_MAX_LEARNTS = 2000
+    MAX_LEARNTS_GROWTH = 1.1
+    GLUE_QUALITY = 2
+
+    def __init__(self):
+        self._num_variables = 0
+        self._values = [0, 0]
+        self._levels = [0]
+        self._reasons = [None]
+        self._activities = [0.0]
+        self._phases = [False]
+        self._seen = [False]
+        self._watches = [[], []]
+        self._clauses = []
+        self._learnts = []
+        self._learnt_qualities = []
+        self._max_learnts = self.INITIAL_MAX_LEARNTS
+        self._trail = []
+        self._trail_limits = []
+        self._queue_head = 0
+        self._heap = []
+        self._activity_increment = 1.0
+        self._is_unsatisfiable = False
+        self._model = None
+        self._num_conflicts = 0
+        self._num_decisions = 0
+
+    @property
+    def num_variables(self):
+        return self._num_variables
+
+    @property
+    def num_clauses(self):
+        return len(self._clauses)
+
+    @property
+    def num_learnts(self):
+        return len(self._learnts)
+
+    @property
+    def num_conflicts(self):
+        return self._num_conflicts
+
+    @property
+    def num_decisions(self):
+        return self._num_decisions
+
+    def new_variable(self):
+        self._num_variables += 1
+        self._values.extend((0, 0))
+        self._levels.append(0)
+        self._reasons.append(None)
+        self._activities.append(0.0)
+        self._phases.append(False)
+        self._seen.append(False)
+        self._watches.extend(([], []))
+        heappush(self._heap, (0.0, self._num_variables))
+        return self._num_variables
+
+    def ensure_variables(self, num_variables):
+        while self._num_variables < num_variables:
+            self.new_variable()
+
+    def add_clause(self, literals):
+        if self._is_unsatisfiable:
+            return False
+        self._backtrack(0)
+
+        codes = []
+        for literal in literals:
+            if literal == 0:
+                raise ValueError('0 is not a valid literal')
+            self.ensure_variables(abs(literal))
+            code = _code(literal)
+            if code ^ 1 in codes:
+                return True
+            if code not in codes:
+                codes.append(code)
+
+        clause = []
+        for code in codes:
+            value = self._values[code]
+            if value == 1:
+                return True
+            elif value == 0:
+                clause.append(code)
+
+        if len(clause) == 0:
+            self._is_unsatisfiable = True
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self._is_unsatisfiable = True
+        else:
+            self._clauses.append(clause)
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+        return not self._is_unsatisfiable
+
+    # Assumptions are literals decided, in order, before any free decision.
+    # A conflict with them makes this call unsatisfiable without making the
+    # solver unsatisfiable, so clauses stay reusable across calls
+    def solve(self, assumptions=()):
+        self._model = None
+        if self._is_unsatisfiable:
+            return False
+        self._backtrack(0)
+        assumption_codes = []
+        for literal in assumptions:
+            self.ensure_variables(abs(literal))
+            assumption_codes.append(_code(literal))
+
+        num_restarts = 0
+        conflicts_until_restart = self.RESTART_BASE * _luby(num_restarts)
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self._num_conflicts += 1
+                if len(self._trail_limits) == 0:
+                    self._is_unsatisfiable = True
+                    return False
+                learnt, back_level = self._analyze(conflict)
+                self._backtrack(back_level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self._learnts.append(learnt)
+                    self._learnt_qualities.append(
+                        len(set([self._levels[code >> 1] for code in learnt]))
+                    )
+                    self._watches[learnt[0]].append(learnt)
+                    self._watches[learnt[1]].append(learnt)
+                    self._assign(learnt[0], learnt)
+                self._decay_activities()
+                conflicts_until_restart -= 1
+            elif conflicts_until_restart <= 0:
+                num_restarts += 1
+                conflicts_until_restart = self.RESTART_BASE * _luby(num_restarts)
+                self._backtrack(0)
+                if len(self._learnts) > self._max_learnts:
+                    self._reduce_learnts()
+            elif len(self._trail_limits) < len(assumption_codes):
+                code = assumption_codes[len(self._trail_limits)]
+                if self._values[code] == -1:
+                    self._backtrack(0)
+                    return False
+                self._trail_limits.append(len(self._trail))
+                if self._values[code] == 0:
+                    self._assign(code, None)
+            else:
+                variable = self._pick_branch_variable()
+                if variable is None:
+                    values = self._values
+                    self._model = [None] + [
+                        values[2 * v] == 1
+                        for v in range(1, self._num_variables + 1)
+                    ]
+                    self._backtrack(0)
+                    return True
+                self._num_decisions += 1
+                self._trail_limits.append(len(self._trail))
+                self._assign(2 * variable + (0 if self._phases[variable] else 1), None)
+
+    def model_value(self, literal):
+        if self._model is None:
+            raise ValueError('No model, the last solve was unsatisfiable or not run')
+        value = self._model[abs(literal)]
+        return value if literal > 0 else not value
+
+    @property
+    def model(self):
+        if self._model is None:
+            return None
+        return dict((v, self._model[v]) for v in range(1, self._num_variables + 1))
+
+    def _assign(self, code, reason):
+        variable = code >> 1
+        self._values[code] = 1
+        self._values[code ^ 1] = -1
+        self._levels[variable] = len(self._trail_limits)
+        self._reasons[variable] = reason
+        self._trail.append(code)
+
+    def _propagate(self):
+        values = self._values
+        watches = self._watches
+        trail = self._trail
+        while self._queue_head < len(trail):
+            false_code = trail[self._queue_head] ^ 1
+            self._queue_head += 1
+            watch_list = watches[false_code]
+            kept = []
+            num_watched = len(watch_list)
+            index = 0
+            while index < num_watched:
+                clause = watch_list[index]
+                index += 1
+                if clause[0] == false_code:
+                    clause[0], clause[1] = clause[1], false_code
+                first = clause[0]
+                if values[first] == 1:
+                    kept.append(clause)
+                    continue
+
+                for k in range(2, len(clause)):
+                    if values[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], false_code
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if values[first] == -1:
+                        kept.extend(watch_list[index:])
+                        watches[false_code] = kept
+                        self._queue_head = len(trail)
+                        return clause
+                    self._assign(first, clause)
+            watches[false_code] = kept
+        return None
+
+    def _analyze(self, conflict):
+        levels = self._levels
+        reasons = self._reasons
+        seen = self._seen
+        trail = self._trail
+        current_level = len(self._trail_limits)
+
+        learnt = [None]
+        to_clear = []
+        pending = 0
+        implied = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for code in clause:
+                if code == implied:
+                    continue
+                variable = code >> 1
+                if not seen[variable] and levels[variable] > 0:
+                    seen[variable] = True
+                    to_clear.append(variable)
+                    self._bump_activity(variable)
+                    if levels[variable] >= current_level:
+                        pending += 1
+                    else:
+                        learnt.append(code)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            implied = trail[index]
+            index -= 1
+            seen[implied >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+            clause = reasons[implied >> 1]
+        learnt[0] = implied ^ 1
+        seen[implied >> 1] = True
+
+        # Drop literals implied by the rest of the learnt clause
+        minimised = [learnt[0]]
+        for code in learnt[1:]:
+            reason = reasons[code >> 1]
+            if reason is None or any(
+                not seen[other >> 1] and levels[other >> 1] > 0
+                for other in reason if other != code ^ 1
+            ):
+                minimised.append(code)
+        learnt = minimised
+
+        seen[implied >> 1] = False
+        for variable in to_clear:
+            seen[variable] = False
+
+        if len(learnt) == 1:
+            return learnt, 0
+        deepest = max(range(1, len(learnt)), key=lambda i: levels[learnt[i] >> 1])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, levels[learnt[1] >> 1]
+
+    def _reduce_learnts(self):
+        # Keeps the better half of the learnt clauses, ranked by the number of
+        # decision levels they span. Only called at level 0, where no learnt
+        # clause is the reason for an assignment that analysis could visit
+        ranked = sorted(
+            range(len(self._learnts)),
+            key=lambda i: self._learnt_qualities[i]
+        )
+        num_kept = len(ranked) // 2
+        kept = sorted(
+            [i for i in ranked[:num_kept]] +
+            [i for i in ranked[num_kept:] if self._learnt_qualities[i] <= self.GLUE_QUALITY]
+        )
+        removed = set([id(self._learnts[i]) for i in ranked[num_kept:]]) - \
+            set([id(self._learnts[i]) for i in kept])
+
+        self._learnts = [self._learnts[i] for i in kept]
+        self._learnt_qualities = [self._learnt_qualities[i] for i in kept]
+        self._watches = [
+            [clause for clause in watch_list if id(clause) not in removed]
+            for watch_list in self._watches
+        ]
+        self._max_learnts *= self.MAX_LEARNTS_GROWTH
+
+    def _backtrack(self, level):
+        if len(self._trail_limits) <= level:
+            return
+        limit = self._trail_limits[level]
+        values = self._values
+        for code in self._trail[limit:]:
+            variable = code >> 1
+            values[code] = 0
+            values[code ^ 1] = 0
+            self._reasons[variable] = None
+            self._phases[variable] = not code & 1
+            heappush(self._heap, (-self._activities[variable], variable))
+        del self._trail[limit:]
+        del self._trail_limits[level:]
+        self._queue_head = limit
+
+    def _pick_branch_variable(self):
+        values = self._values
+        heap = self._heap
+        while heap:
+            variable = heappop(heap)[1]
+            if values[2 * variable] == 0:
+                return variable
+        return None
+
+    def _bump_activity(self, variable):
+        activities = self._activities
+        activities[variable] += self._activity_increment
+        if activities[variable] > 1e100:
+            for v in range(1, self._num_variables + 1):
+                activities[v] *= 1e-100
+            self._activity_increment *= 1e-100
+            self._rebuild_heap()
+
+    def _decay_activities(self):
+        self._activity_increment /= self.ACTIVITY_DECAY
+        if len(self._heap) > 4 * self._num_variables + 64:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        values = self._values
+        self._heap = [
+            (-self._activities[v], v)
+            for v in range(1, self._num_variables + 1)
+            if values[2 * v] == 0
+        ]
+        heapify(self._heap)
@@ -0,0 +1,349 @@
+from logic.syntax import (SimpleSentence, Negation, Conjunction, Disjunction,
+    Implication, Reduction, Equivalence, SentenceSet, DEFAULT_INTERNER)
+
+DEFAULT_MAX_MINIMISE_CONSTANTS = 8
+
+class SimplificationMethod(object):
+    NONE = 'none'
+    RULES = 'rules'
+    DNF = 'dnf'
+    CNF = 'cnf'
+
+# The syntax has no constant sentences, so truth values only exist while
+# rewriting; they are folded away by their parents or materialised at the end
+class _TruthValue(object):
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return '_TruthValue(%r)' % self.value
+
+_TRUE = _TruthValue(True)
+_FALSE = _TruthValue(False)
+
+def sentence_size(sentence):
+    sizes = {}
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        if id(node) in sizes:
+            stack.pop()
+            continue
+        pending = [s for s in node.sub_sentences if id(s) not in sizes]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        sizes[id(node)] = 1 + sum([sizes[id(s)] for s in node.sub_sentences])
+    return sizes[id(sentence)]
+
+class SimplificationResult(object):
+    def __init__(self, sentence, original_size, simplified_size, rule_counts, method):
+        self._sentence = sentence
+        self._original_size = original_size
+        self._simplified_size = simplified_size
+        self._rule_counts = dict(rule_counts)
+        self._method = method
+
+    @property
+    def sentence(self):
+        return self._sentence
+
+    @property
+    def original_size(self):
+        return self._original_size
+
+    @property
+    def simplified_size(self):
+        return self._simplified_size
+
+    @property
+    def reduction(self):
+        return 1.0 - float(self._simplified_size) / self._original_size
+
+    @property
+    def rule_counts(self):
+        return self._rule_counts
+
+    @property
+    def method(self):
+        return self._method
+
+    def __repr__(self):
+        return '%s(%s, %d -> %d, %r)' % (
+            self.__class__.__name__, self._sentence,
+            self._original_size, self._simplified_size, self._method
+        )
+
+# Bottom up local rewriting. Results are memoised per sub sentence, so
+# hash-consed sub trees are only simplified once per Simplifier
+class Simplifier(object):
+    def __init__(self, interner=DEFAULT_INTERNER):
+        self._interner = interner
+        self._memo = {}
+        self._rule_counts = {}
+
+    @property
+    def rule_counts(self):
+        return dict(self._rule_counts)
+
+    def simplify(self, sentence, minimise=False,
+            max_minimise_constants=DEFAULT_MAX_MINIMISE_CONSTANTS):
+        counts_before = dict(self._rule_counts)
+        simplified = self._materialise(self._rewrite(sentence), sentence)
+        candidates = [(sentence_size(simplified), SimplificationMethod.RULES, simplified)]
+        if minimise and len(sentence.all_constants) <= max_minimise_constants:
+            for method, minimised in minimise_two_level(sentence, self._interner):
+                candidates.append((sentence_size(minimised), method, minimised))
+        # Materialising a constant can cost more than it saved
+        original_size = sentence_size(sentence)
+        candidates.append((original_size, SimplificationMethod.NONE, sentence))
+        size, method, result = min(candidates, key=lambda c: c[0])
+
+        rule_counts = dict(
+            (rule, count - counts_before.get(rule, 0))
+            for rule, count in self._rule_counts.items()
+            if count != counts_before.get(rule, 0)
+        )
+        return SimplificationResult(result, original_size, size, rule_counts, method)
+
+    def _rewrite(self, sentence):
+        memo = self._memo
+        stack = [sentence]
+        while stack:
+            node = stack[-1]
+            if node in memo:
+                stack.pop()
+                continue
+            pending = [s for s in node.sub_sentences if s not in memo]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            memo[node] = self._rewrite_node(node, [memo[s] for s in node.sub_sentences])
+        return memo[sentence]
+
+    def _count(self, rule):
+        self._rule_counts[rule] = self._rule_counts.get(rule, 0) + 1
+
+    def _create(self, cls, *args):
+        return self._interner.create(cls, *args)
+
+    def _negate(self, sentence):
+        if sentence is _TRUE:
+            return _FALSE
+        if sentence is _FALSE:
+            return _TRUE
+        if isinstance(sentence, Negation):
+            self._count('double_negation')
+            return sentence.target
+        return self._create(Negation, sentence)
+
+    def _rewrite_node(self, node, children):
+        if isinstance(node, SimpleSentence):
+            return self._create(SimpleSentence, node.constant)
+        if isinstance(node, Negation):
+            if children[0] in (_TRUE, _FALSE):
+                self._count('constant')
+            return self._negate(children[0])
+        if isinstance(node, Conjunction):
+            return self._conjunction(children[0], children[1])
+        if isinstance(node, Disjunction):
+            return self._disjunction(children[0], children[1])
+        if isinstance(node, Implication):
+            return self._implication(children[0], children[1], node)
+        if isinstance(node, Reduction):
+            return self._implication(children[1], children[0], node)
+        if isinstance(node, Equivalence):
+            return self._equivalence(children[0], children[1])
+        if isinstance(node, SentenceSet):
+            return self._sentence_set(children)
+        return node
+
+    def _binary(self, first, second, identity, absorbing, cls, dual_cls):
+        if first is absorbing or second is absorbing:
+            self._count('constant')
+            return absorbing
+        if first is identity:
+            self._count('constant')
+            return second
+        if second is identity:
+            self._count('constant')
+            return first
+        if first == second:
+            self._count('idempotence')
+            return first
+        if _are_complements(first, second):
+            self._count('complement')
+            return absorbing
+        for kept, other in ((first, second), (second, first)):
+            if isinstance(other, dual_cls) and kept in other.sub_sentences:
+                self._count('absorption')
+                return kept
+            if isinstance(other, cls) and kept in other.sub_sentences:
+                self._count('idempotence')
+                return other
+        return self._create(cls, first, second)
+
+    def _conjunction(self, first, second):
+        return self._binary(first, second, _TRUE, _FALSE, Conjunction, Disjunction)
+
+    def _disjunction(self, first, second):
+        return self._binary(first, second, _FALSE, _TRUE, Disjunction, Conjunction)
+
+    def _implication(self, antecedent, consequent, node):
+        if antecedent is _FALSE or consequent is _TRUE:
+            self._count('constant')
+            return _TRUE
+        if antecedent is _TRUE:
+            self._count('constant')
+            return consequent
+        if consequent is _FALSE:
+            self._count('constant')
+            return self._negate(antecedent)
+        if antecedent == consequent:
+            self._count('tautology')
+            return _TRUE
+        if _are_complements(antecedent, consequent):
+            self._count('complement')
+            return consequent
+        if isinstance(node, Implication):
+            return self._create(Implication, antecedent, consequent)
+        return self._create(Reduction, consequent, antecedent)
+
+    def _equivalence(self, first, second):
+        for value, other in ((first, second), (second, first)):
+            if value is _TRUE:
+                self._count('constant')
+                return other
+            if value is _FALSE:
+                self._count('constant')
+                return self._negate(other)
+        if first == second:
+            self._count('tautology')
+            return _TRUE
+        if _are_complements(first, second):
+            self._count('complement')
+            return _FALSE
+        return self._create(Equivalence, first, second)
+
+    def _sentence_set(self, children):
+        if _FALSE in children:
+            self._count('constant')
+            return _FALSE
+        members = [c for c in children if c is not _TRUE]
+        if len(members) < len(children):
+            self._count('constant')
+        if not members:
+            return _TRUE
+        return SentenceSet(members)
+
+    def _materialise(self, result, original):
+        if not isinstance(result, _TruthValue):
+            return result
+        if not original.all_constants:
+            # The empty set is the only sentence without constants, and true
+            empty = SentenceSet([])
+            return empty if result.value else self._create(Negation, empty)
+        constant = self._create(SimpleSentence, min(original.all_constants))
+        cls = Disjunction if result.value else Conjunction
+        return self._create(cls, constant, self._create(Negation, constant))
+
+def _are_complements(first, second):
+    return ((isinstance(first, Negation) and first.target == second) or
+        (isinstance(second, Negation) and second.target == first))
+
+def simplify(sentence, minimise=False,
+        max_minimise_constants=DEFAULT_MAX_MINIMISE_CONSTANTS, interner=DEFAULT_INTERNER):
+    return Simplifier(interner).simplify(sentence, minimise, max_minimise_constants)
+
+# Quine-McCluskey. Implicants are (value, don't care mask) pairs over the bits
+# of a TruthAssignment, so the first sorted constant is the highest bit
+def prime_implicants(minterms, num_bits):
+    current = set([(m, 0) for m in minterms])
+    primes = set()
+    while current:
+        merged = set()
+        used = set()
+        for value, mask in current:
+            for index in range(num_bits):
+                bit = 1 << index
+                if (mask | value) & bit:
+                    continue
+                partner = (value | bit, mask)
+                if partner in current:
+                    merged.add((value, mask | bit))
+                    used.add((value, mask))
+                    used.add(partner)
+        primes |= current - used
+        current = merged
+    return primes
+
+def _covers(implicant, minterm):
+    value, mask = implicant
+    return minterm & ~mask == value
+
+# Essential prime implicants first, then greedily whichever covers the most
+# remaining minterms with the fewest literals
+def minimum_cover(minterms, primes):
+    remaining = set(minterms)
+    cover = []
+    for minterm in minterms:
+        covering = [p for p in primes if _covers(p, minterm)]
+        if len(covering) == 1 and covering[0] not in cover:
+            cover.append(covering[0])
+    for implicant in cover:
+        remaining -= set([m for m in remaining if _covers(implicant, m)])
+    while remaining:
+        best = max(sorted(primes), key=lambda p: (
+            len([m for m in remaining if _covers(p, m)]), bin(p[1]).count('1')
+        ))
+        cover.append(best)
+        remaining -= set([m for m in remaining if _covers(best, m)])
+    return sorted(cover)
+
+def _implicant_literals(implicant, constants, interner, negate):
+    value, mask = implicant
+    literals = []
+    for index, constant in enumerate(constants):
+        bit = 1 << (len(constants) - 1 - index)
+        if mask & bit:
+            continue
+        sentence = interner.create(SimpleSentence, constant)
+        if bool(value & bit) == negate:
+            sentence = interner.create(Negation, sentence)
+        literals.append(sentence)
+    return literals
+
+def _chain(cls, sentences, interner):
+    result = sentences[0]
+    for sentence in sentences[1:]:
+        result = interner.create(cls, result, sentence)
+    return result
+
+def minimise_two_level(sentence, interner=DEFAULT_INTERNER):
+    vocabulary = sentence.vocabulary
+    constants = vocabulary.ordered_constants
+    minterms = []
+    maxterms = []
+    for bit_assignment in vocabulary.iter_bit_assignments():
+        bits = sentence.eval_bits(bit_assignment)
+        for row in bit_assignment.iter_rows(bits):
+            minterms.append(bit_assignment.assignment(row).bits)
+        for row in bit_assignment.iter_rows(bit_assignment.mask ^ bits):
+            maxterms.append(bit_assignment.assignment(row).bits)
+    # Constant functions are left to the rule based pass
+    if not minterms or not maxterms:
+        return []
+
+    results = []
+    for method, terms, outer, inner, negate in (
+        (SimplificationMethod.DNF, minterms, Disjunction, Conjunction, False),
+        (SimplificationMethod.CNF, maxterms, Conjunction, Disjunction, True)
+    ):
+        cover = minimum_cover(sorted(terms), prime_implicants(terms, len(constants)))
+        results.append((method, _chain(outer, [
+            _chain(inner, _implicant_literals(i, constants, interner, negate), interner)
+            for i in cover
+        ], interner)))
+    return results
@@ -1,52 +1,156 @@
 from abc import ABCMeta, abstractmethod
-from logic.language import PropositionalVocabulary
-
+from itertools import islice
+from weakref import WeakValueDictionary
+from logic.language import PropositionalVocabulary, PropositionalConstant
+from logic.sat import find_satisfying_assignment
+from logic.bdd import BDDManager
+
+class DecisionMethod(object):
+    TRUTH_TABLE = 'truth_table'
+    SAT = 'sat'
+    BDD = 'bdd'
+
+# Deeper sentences are evaluated, rendered and compared with explicit stacks
+# instead of recursion
+MAX_RECURSIVE_DEPTH = 200
+
+# Each concrete sentence class defines the hooks its traversals need, given
+# the results for its sub sentences: combine_bits (bit-packed evaluation),
+# compile_expression, tseitin_literal and bdd_node
 class Sentence(object):
     __metaclass__ = ABCMeta
-
-    def determine_logical_equivalence(self, other):
+    __slots__ = (
+        '_sub_sentences', '_hash', '_depth', '_all_constants', '_compiled', '__weakref__'
+    )
+
+    def __init__(self, sub_sentences, hash_value):
+        self._sub_sentences = sub_sentences
+        self._hash = hash_value
+        self._depth = 1 + max([s.depth for s in sub_sentences] or [0])
+        self._all_constants = None
+        self._compiled = None
+
+    def determine_logical_equivalence(self, other, lazy=False):
+        if lazy:
+            return LazyLogicalEquivalence(self, other)
         all_constants = other.all_constants.union(self.all_constants)
         vocab = PropositionalVocabulary(all_constants)
-        equivalent_assignments = [
-            assignment 
-            for assignment in vocab.all_assignments 
-            if self.eval(assignment) == other.eval(assignment)
-        ]
-        unequivalent_assignments = [
-            assignment 
-            for assignment in vocab.all_assignments 
-            if self.eval(assignment) != other.eval(assignment)
-        ]
+        equivalent_assignments = []
+        unequivalent_assignments = []
+        for bit_assignment in vocab.iter_bit_assignments():
+            differences = self.eval_bits(bit_assignment) ^ other.eval_bits(bit_assignment)
+            for row, is_different in enumerate(bit_assignment.iter_values(differences)):
+                assignment = bit_assignment.assignment(row)
+                if is_different:
+                    unequivalent_assignments.append(assignment)
+                else:
+                    equivalent_assignments.append(assignment)
         return LogicalEquivalence(equivalent_assignments, unequivalent_assignments)
 
-    def is_logically_equivalent(self, other):
-        return self.determine_logical_equivalence(other).is_equivalent
+    def iter_equivalence_assignments(self, other, equivalent=True):
+        vocab = PropositionalVocabulary(other.all_constants.union(self.all_constants))
+        for bit_assignment in vocab.iter_bit_assignments():
+            rows = self.eval_bits(bit_assignment) ^ other.eval_bits(bit_assignment)
+            if equivalent:
+                rows ^= bit_assignment.mask
+            for row in bit_assignment.iter_rows(rows):
+                yield bit_assignment.assignment(row)
+
+    def is_logically_equivalent(self, other, method=DecisionMethod.SAT):
+        if method == DecisionMethod.BDD:
+            manager = BDDManager()
+            return manager.compile(self) == manager.compile(other)
+        return self.find_equivalence_counterexample(other, method) is None
+
+    def find_equivalence_counterexample(self, other, method=DecisionMethod.SAT):
+        return Negation(Equivalence(self, other)).find_model(method)
 
     @property
     def sub_sentences(self):
-        return tuple()
+        return self._sub_sentences
 
     @property
     def all_constants(self):
-        return frozenset([
-            constant  
-            for sub_sentence in self.sub_sentences
-            for constant in sub_sentence.all_constants
-        ])
+        if self._all_constants is None:
+            constants = set()
+            visited = set()
+            stack = [self]
+            while stack:
+                sentence = stack.pop()
+                if sentence._all_constants is not None:
+                    constants.update(sentence._all_constants)
+                elif id(sentence) not in visited:
+                    visited.add(id(sentence))
+                    stack.extend(sentence.sub_sentences)
+            self._all_constants = frozenset(constants)
+        return self._all_constants
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def intern_key(self):
+        return (self.__class__, ) + self.sub_sentences
+
+    def with_sub_sentences(self, sub_sentences):
+        return self.__class__(*sub_sentences)
 
     @property
     def vocabulary(self):
         return PropositionalVocabulary(self.all_constants)
 
-    def logically_entails(self, other):
-        all_vocab = self.vocabulary + other.vocabulary
-        true_assignments = [
-            assignment 
-            for assignment in all_vocab.all_assignments 
-            if self.eval(assignment)
-        ]
-        other_results = [other.eval(assignment) for assignment in true_assignments]
-        return all(other_results)
+    def logically_entails(self, other, method=DecisionMethod.SAT):
+        if method == DecisionMethod.BDD:
+            manager = BDDManager()
+            return manager.compile(self).entails(manager.compile(other))
+        return self.find_entailment_counterexample(other, method) is None
+
+    def find_entailment_counterexample(self, other, method=DecisionMethod.SAT):
+        return Conjunction(self, Negation(other)).find_model(method)
+
+    def find_model(self, method=DecisionMethod.SAT):
+        if method == DecisionMethod.SAT:
+            return find_satisfying_assignment(self)
+        elif method == DecisionMethod.BDD:
+            return BDDManager().compile(self).find_model()
+        elif method == DecisionMethod.TRUTH_TABLE:
+            for bit_assignment in self.vocabulary.iter_bit_assignments():
+                for row in bit_assignment.iter_rows(self.eval_bits(bit_assignment)):
+                    return bit_assignment.assignment(row)
+            return None
+        else:
+            raise ValueError('Unknown decision method %r' % method)
+
+    def count_models(self):
+        return BDDManager().compile(self).count_models()
+
+    def iter_models(self, limit=None, offset=0):
+        models = BDDManager().compile(self).iter_models(offset)
+        return models if limit is None else islice(models, limit)
+
+    def find_countermodel(self, method=DecisionMethod.SAT):
+        return Negation(self).find_model(method)
+
+    @property
+    def is_satisfiable(self):
+        return self.find_model() is not None
+
+    @property
+    def is_unsatisfiable(self):
+        return not self.is_satisfiable
+
+    @property
+    def is_falsifiable(self):
+        return self.find_countermodel() is not None
+
+    @property
+    def is_valid(self):
+        return not self.is_falsifiable
+
+    @property
+    def is_contingent(self):
+        return self.is_satisfiable and self.is_falsifiable
 
     @property
     def has_multiple_sentences(self):
@@ -56,29 +160,86 @@ class Sentence(object):
     def eval(self, assignment):
         pass
 
+    @abstractmethod
+    def eval_bits(self, bit_assignment):
+        pass
+
+    def str_parts(self):
+        return [object.__str__(self)]
+
+    def repr_parts(self):
+        return [object.__repr__(self)]
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = compile_sentence(self)
+        return self._compiled
+
 class SentenceSet(Sentence):
+    __slots__ = ('_sentences', )
+
     def __init__(self, sentences):
         self._sentences = frozenset(sentences)
+        super(SentenceSet, self).__init__(
+            self._sentences,
+            hash((self.__class__.__name__, self._sentences))
+        )
 
     @property
     def sentences(self):
         return self._sentences
 
     @property
-    def sub_sentences(self):
-        return self._sentences
+    def intern_key(self):
+        return (self.__class__, self._sentences)
+
+    def with_sub_sentences(self, sub_sentences):
+        return SentenceSet(sub_sentences)
 
     def eval(self, assignment):
-        evals = [s.eval(assignment) for s in self._sentences]
-        return all(evals)
+        return all(s.eval(assignment) for s in self._sentences)
+
+    def eval_bits(self, bit_assignment):
+        bits = bit_assignment.mask
+        for sentence in self._sentences:
+            bits &= sentence.eval_bits(bit_assignment)
+        return bits
+
+    def combine_bits(self, mask, operands):
+        for bits in operands:
+            mask &= bits
+        return mask
+
+    def compile_expression(self, operands):
+        return 'all((%s))' % ''.join(['%s, ' % o for o in operands])
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.conjunction(operands)
+
+    def bdd_node(self, manager, operands):
+        return manager.conjunction(operands)
+
+    def __eq__(self, other):
+        return self is other or (self.__class__ == other.__class__ and 
+            self._hash == other._hash and self.sentences == other.sentences)
+
+    def __hash__(self):
+        return self._hash
 
 class SimpleSentence(Sentence):
+    __slots__ = ('_constant', )
+
     def __init__(self, constant):
         self._constant = constant
+        super(SimpleSentence, self).__init__(tuple(), hash(constant))
+        self._all_constants = frozenset((constant, ))
 
     @property
-    def all_constants(self):
-        return frozenset((self._constant, ))
+    def intern_key(self):
+        return (self.__class__, self._constant)
+
+    def with_sub_sentences(self, sub_sentences):
+        return self
 
     def eval(self, assignment):
         value = assignment.get(self._constant)
@@ -88,19 +249,40 @@ class SimpleSentence(Sentence):
             )
         return value
 
+    def eval_bits(self, bit_assignment):
+        bits = bit_assignment.get(self._constant)
+        if bits is None:
+            raise ConstantDoesntExistException(
+                'Constant %s not assigned' % self._constant.label
+            )
+        return bits
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.variable_for(self._constant)
+
+    def bdd_node(self, manager, operands):
+        return manager.variable(self._constant)
+
     @property
     def constant(self):
         return self._constant
 
     def __hash__(self):
-        return hash(self.constant)
+        return self._hash
 
     def __eq__(self, other):
-        return self.__class__ == other.__class__ and self.constant == other.constant
+        return self is other or (self.__class__ == other.__class__ and 
+            self.constant == other.constant)
 
     def __gt__(self, other):
         return self.constant > other.constant
 
+    def str_parts(self):
+        return [self._constant.label]
+
+    def repr_parts(self):
+        return ['%s(%r)' % (self.__class__.__name__, self.constant)]
+
     def __str__(self):
         return self._constant.label
 
@@ -116,6 +298,10 @@ class LogicalEquivalence(object):
     def is_equivalent(self):
         return len(self._unequivalent_assignments) == 0
 
+    @property
+    def counterexample(self):
+        return next(iter(self.unequivalent_assignments), None)
+
     @property
     def equivalent_assignments(self):
         return self._equivalent_assignments
@@ -125,7 +311,7 @@ class LogicalEquivalence(object):
         return self._unequivalent_assignments
 
     def __eq__(self, other):
-        return (self.__class__ == other.__class__ and 
+        return (isinstance(other, LogicalEquivalence) and 
             self.equivalent_assignments == other.equivalent_assignments and 
             self.unequivalent_assignments == other.unequivalent_assignments)
 
@@ -136,90 +322,250 @@ class LogicalEquivalence(object):
             self.unequivalent_assignments
         )
 
+# Computes each assignment set only when it is asked for. is_equivalent and
+# counterexample stop at the first unequivalent assignment
+class LazyLogicalEquivalence(LogicalEquivalence):
+    def __init__(self, sentence_1, sentence_2):
+        self._sentence_1 = sentence_1
+        self._sentence_2 = sentence_2
+        self._equivalent_assignments = None
+        self._unequivalent_assignments = None
+        self._counterexample = None
+        # The counterexample stays None for equivalent sentences, so whether
+        # it was searched for is kept apart
+        self._searched = False
+
+    @property
+    def is_equivalent(self):
+        return self.counterexample is None
+
+    @property
+    def counterexample(self):
+        if self._unequivalent_assignments is not None:
+            return super(LazyLogicalEquivalence, self).counterexample
+        if not self._searched:
+            self._counterexample = next(self._iter_assignments(False), None)
+            self._searched = True
+        return self._counterexample
+
+    @property
+    def equivalent_assignments(self):
+        if self._equivalent_assignments is None:
+            self._equivalent_assignments = frozenset(self._iter_assignments(True))
+        return self._equivalent_assignments
+
+    @property
+    def unequivalent_assignments(self):
+        if self._unequivalent_assignments is None:
+            self._unequivalent_assignments = frozenset(self._iter_assignments(False))
+        return self._unequivalent_assignments
+
+    def _iter_assignments(self, equivalent):
+        return self._sentence_1.iter_equivalence_assignments(self._sentence_2, equivalent)
+
 class ConstantDoesntExistException(Exception):
     pass
 
+class CompiledSentence(object):
+    def __init__(self, constants, function):
+        self._constants = tuple(constants)
+        self._function = function
+
+    @property
+    def constants(self):
+        return self._constants
+
+    def __call__(self, *values):
+        return self._function(values)
+
+    def eval(self, assignment):
+        values = tuple([assignment.get(c) for c in self._constants])
+        if None in values:
+            missing = self._constants[values.index(None)]
+            raise ConstantDoesntExistException(
+                'Constant %s not assigned' % missing.label
+            )
+        return self._function(values)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self._constants)
+
+def compile_sentence(sentence):
+    constants = sentence.vocabulary.ordered_constants
+    slots = dict((c, 'v%d' % i) for i, c in enumerate(constants))
+    lines = []
+    if constants:
+        lines.append('    %s, = values' % ', '.join([slots[c] for c in constants]))
+
+    names = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, visited = stack.pop()
+        if id(node) in names:
+            continue
+        if isinstance(node, SimpleSentence):
+            names[id(node)] = slots[node.constant]
+        elif not visited:
+            stack.append((node, True))
+            stack.extend([(s, False) for s in node.sub_sentences])
+        else:
+            name = 'n%d' % len(names)
+            operands = tuple([names[id(s)] for s in node.sub_sentences])
+            lines.append('    %s = %s' % (name, node.compile_expression(operands)))
+            names[id(node)] = name
+    lines.append('    return %s' % names[id(sentence)])
+
+    source = 'def compiled_sentence(values):\n' + '\n'.join(lines) + '\n'
+    namespace = {}
+    exec(compile(source, '<compiled %s>' % sentence.__class__.__name__, 'exec'), namespace)
+    return CompiledSentence(constants, namespace['compiled_sentence'])
+
 class CompoundSentence(Sentence):
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
-    @property
-    def sub_sentences(self):
-        return tuple()
+    def __init__(self, *sub_sentences):
+        super(CompoundSentence, self).__init__(
+            sub_sentences,
+            hash((self.__class__.__name__, ) + sub_sentences)
+        )
 
     @property
     def has_multiple_sentences(self):
         return len(self.sub_sentences) > 1
 
-    @property
-    def all_constants(self):
-        return frozenset([
-            constant 
-            for sub_sentence in self.sub_sentences 
-            for constant in sub_sentence.all_constants
-        ])
+    # (first operand value, result) when the first operand alone decides eval
+    short_circuit = None
 
     @property
     def symbol(self):
         pass
 
     def __eq__(self, other):
-        return self.__class__ == other.__class__ and self.sub_sentences == other.sub_sentences
+        if self is other:
+            return True
+        if self.__class__ != other.__class__ or self._hash != other._hash:
+            return False
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return sentences_equal(self, other)
+        return self.sub_sentences == other.sub_sentences
 
     def __hash__(self):
-        return hash(self.sub_sentences)
+        return self._hash
 
     def __gt__(self, other):
         return self.sub_sentences < other.sub_sentences
 
+    def str_parts(self):
+        parts = ['(']
+        for sentence in self.sub_sentences:
+            parts.extend((sentence, ' %s ' % self.symbol))
+        parts[-1] = ')'
+        return parts
+
+    def repr_parts(self):
+        parts = ['%s(' % self.__class__.__name__]
+        for sentence in self.sub_sentences:
+            parts.extend((sentence, ', '))
+        parts[-1] = ')'
+        return parts
+
     def __str__(self):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return render_sentence(self, lambda node: node.str_parts())
         joiner = ' %s ' % self.symbol
         return "(" + joiner.join([str(s) for s in self.sub_sentences]) + ")"
 
     def __repr__(self):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return render_sentence(self, lambda node: node.repr_parts())
         return '%s(%s)' % (
             self.__class__.__name__, 
             ", ".join([repr(s) for s in self.sub_sentences])
         )
 
 class Negation(CompoundSentence):
+    __slots__ = ('_target', )
+
     def __init__(self, target):
         self._target = target
+        super(Negation, self).__init__(target)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return not self._target.eval(assignment)
 
-    @property
-    def sub_sentences(self):
-        return tuple((self._target, ))
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return bit_assignment.mask ^ self._target.eval_bits(bit_assignment)
+
+    def combine_bits(self, mask, operands):
+        return mask ^ operands[0]
+
+    def compile_expression(self, operands):
+        return 'not %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return -operands[0]
+
+    def bdd_node(self, manager, operands):
+        return manager.negation(operands[0])
 
     @property
     def target(self):
         return self._target
 
+    def str_parts(self):
+        if self._target.has_multiple_sentences:
+            return [self.symbol + '(', self._target, ')']
+        else:
+            return [self.symbol, self._target]
+
     def __str__(self):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return render_sentence(self, lambda node: node.str_parts())
         if self._target.has_multiple_sentences:
             return self.symbol + '(' + str(self._target) + ')'
         else:
             return self.symbol + str(self._target)
 
-    def __hash__(self):
-        return hash(self.target)
-
     @property
     def symbol(self):
         return '-'
 
 class Conjunction(CompoundSentence):
+    __slots__ = ('_conjunct_1', '_conjunct_2')
+    short_circuit = (False, False)
+
     def __init__(self, conjunct_1, conjunct_2):
         self._conjunct_1 = conjunct_1
         self._conjunct_2 = conjunct_2
+        super(Conjunction, self).__init__(conjunct_1, conjunct_2)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return self._conjunct_1.eval(assignment) and self._conjunct_2.eval(assignment)
-    
-    @property
-    def sub_sentences(self):
-        return tuple((self._conjunct_1, self._conjunct_2))
+
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return (self._conjunct_1.eval_bits(bit_assignment) & 
+            self._conjunct_2.eval_bits(bit_assignment))
+
+    def combine_bits(self, mask, operands):
+        return operands[0] & operands[1]
+
+    def compile_expression(self, operands):
+        return '%s and %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.conjunction(operands)
+
+    def bdd_node(self, manager, operands):
+        return manager.conjunction(operands)
 
     @property
     def conjunct_1(self):
@@ -234,69 +580,364 @@ class Conjunction(CompoundSentence):
         return '^'
 
 class Disjunction(CompoundSentence):
+    __slots__ = ('_disjunct_1', '_disjunct_2')
+    short_circuit = (True, True)
+
     def __init__(self, disjunct_1, disjunct_2):
         self._disjunct_1 = disjunct_1
         self._disjunct_2 = disjunct_2
+        super(Disjunction, self).__init__(disjunct_1, disjunct_2)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return self._disjunct_1.eval(assignment) or self._disjunct_2.eval(assignment)
-    
-    @property
-    def sub_sentences(self):
-        return tuple((self._disjunct_1, self._disjunct_2))
+
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return (self._disjunct_1.eval_bits(bit_assignment) | 
+            self._disjunct_2.eval_bits(bit_assignment))
+
+    def combine_bits(self, mask, operands):
+        return operands[0] | operands[1]
+
+    def compile_expression(self, operands):
+        return '%s or %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.disjunction(operands)
+
+    def bdd_node(self, manager, operands):
+        return manager.disjunction(operands)
 
     @property
     def symbol(self):
         return '|'
 
 class Implication(CompoundSentence):
+    __slots__ = ('_antecedent', '_consequent')
+    short_circuit = (False, True)
+
     def __init__(self, antecedent, consequent):
         self._antecedent = antecedent
         self._consequent = consequent
+        super(Implication, self).__init__(antecedent, consequent)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return not self._antecedent.eval(assignment) or self._consequent.eval(assignment)
-    
+
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return ((bit_assignment.mask ^ self._antecedent.eval_bits(bit_assignment)) | 
+            self._consequent.eval_bits(bit_assignment))
+
+    def combine_bits(self, mask, operands):
+        return (mask ^ operands[0]) | operands[1]
+
+    def compile_expression(self, operands):
+        return 'not %s or %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.disjunction([-operands[0], operands[1]])
+
+    def bdd_node(self, manager, operands):
+        return manager.implication(operands[0], operands[1])
+
     @property
-    def consequent(self):
-        return self._consequent
+    def antecedent(self):
+        return self._antecedent
 
     @property
-    def sub_sentences(self):
-        return tuple((self._antecedent, self._consequent))
+    def consequent(self):
+        return self._consequent
 
     @property
     def symbol(self):
         return '=>'
 
 class Reduction(CompoundSentence):
+    __slots__ = ('_consequent', '_antecedent')
+    short_circuit = (True, True)
+
     def __init__(self, consequent, antecedent):
         self._consequent = consequent
         self._antecedent = antecedent
+        super(Reduction, self).__init__(consequent, antecedent)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return self._consequent.eval(assignment) or not self._antecedent.eval(assignment)
-    
-    @property
-    def sub_sentences(self):
-        return tuple((self._consequent, self._antecedent))
+
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return (self._consequent.eval_bits(bit_assignment) | 
+            (bit_assignment.mask ^ self._antecedent.eval_bits(bit_assignment)))
+
+    def combine_bits(self, mask, operands):
+        return operands[0] | (mask ^ operands[1])
+
+    def compile_expression(self, operands):
+        return '%s or not %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.disjunction([operands[0], -operands[1]])
+
+    def bdd_node(self, manager, operands):
+        return manager.implication(operands[1], operands[0])
 
     @property
     def symbol(self):
         return '<='
 
 class Equivalence(CompoundSentence):
+    __slots__ = ('_target_1', '_target_2')
+
     def __init__(self, target_1, target_2):
         self._target_1 = target_1
         self._target_2 = target_2
+        super(Equivalence, self).__init__(target_1, target_2)
 
     def eval(self, assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_iteratively(self, assignment)
         return self._target_1.eval(assignment) == self._target_2.eval(assignment)
-    
-    @property
-    def sub_sentences(self):
-        return tuple((self._target_1, self._target_2))
+
+    def eval_bits(self, bit_assignment):
+        if self._depth > MAX_RECURSIVE_DEPTH:
+            return eval_bits_iteratively(self, bit_assignment)
+        return bit_assignment.mask ^ (self._target_1.eval_bits(bit_assignment) ^ 
+            self._target_2.eval_bits(bit_assignment))
+
+    def combine_bits(self, mask, operands):
+        return mask ^ (operands[0] ^ operands[1])
+
+    def compile_expression(self, operands):
+        return '%s == %s' % operands
+
+    def tseitin_literal(self, encoder, operands):
+        return encoder.equivalence(operands[0], operands[1])
+
+    def bdd_node(self, manager, operands):
+        return manager.equivalence(operands[0], operands[1])
 
     @property
     def symbol(self):
-        return '<=>'
\ No newline at end of file
+        return '<=>'
+
+# Explicit stack traversals, so sentence depth is only limited by memory
+# rather than the recursion limit
+def iter_sentences(sentence):
+    seen = set()
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(node.sub_sentences)
+
+# Post order over distinct nodes: combine(node, operand results)
+def fold_sentence(sentence, combine):
+    results = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            results[id(node)] = combine(node, [results[id(s)] for s in node.sub_sentences])
+        elif id(node) not in results:
+            stack.append((node, True))
+            stack.extend([(s, False) for s in node.sub_sentences])
+    return results[id(sentence)]
+
+# Same results and short circuiting as eval, operands left to right
+def eval_iteratively(sentence, assignment):
+    results = {}
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        if id(node) in results:
+            stack.pop()
+            continue
+        if not isinstance(node, CompoundSentence):
+            stack.pop()
+            results[id(node)] = node.eval(assignment)
+            continue
+        sub_sentences = node.sub_sentences
+        if id(sub_sentences[0]) not in results:
+            stack.append(sub_sentences[0])
+            continue
+        short_circuit = node.short_circuit
+        if short_circuit is not None and results[id(sub_sentences[0])] == short_circuit[0]:
+            value = short_circuit[1]
+        elif len(sub_sentences) > 1 and id(sub_sentences[1]) not in results:
+            stack.append(sub_sentences[1])
+            continue
+        else:
+            value = node.combine_bits(True, [results[id(s)] for s in sub_sentences])
+        stack.pop()
+        results[id(node)] = value
+    return results[id(sentence)]
+
+def eval_bits_iteratively(sentence, bit_assignment):
+    mask = bit_assignment.mask
+    return fold_sentence(sentence, lambda node, operands: (
+        node.combine_bits(mask, operands) if node.sub_sentences
+        else node.eval_bits(bit_assignment)
+    ))
+
+# parts(node) gives strings and sentences, which are rendered in their place
+def render_sentence(sentence, parts):
+    output = []
+    stack = [sentence]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            output.append(item)
+        else:
+            stack.extend(reversed(parts(item)))
+    return ''.join(output)
+
+def sentences_equal(first, second):
+    compared = set()
+    stack = [(first, second)]
+    while stack:
+        a, b = stack.pop()
+        if a is b or (id(a), id(b)) in compared:
+            continue
+        compared.add((id(a), id(b)))
+        if a.__class__ != b.__class__ or hash(a) != hash(b):
+            return False
+        if isinstance(a, CompoundSentence):
+            stack.extend(zip(a.sub_sentences, b.sub_sentences))
+        elif not a == b:
+            return False
+    return True
+
+class SentenceInterner(object):
+    def __init__(self):
+        self._sentences = WeakValueDictionary()
+
+    def create(self, sentence_class, *args):
+        key = (sentence_class, ) + args
+        sentence = self._sentences.get(key)
+        if sentence is None:
+            sentence = self._sentences.setdefault(key, sentence_class(*args))
+        return sentence
+
+    def intern(self, sentence):
+        canonical = {}
+        stack = [(sentence, False)]
+        while stack:
+            node, visited = stack.pop()
+            if id(node) in canonical:
+                continue
+            if not visited:
+                stack.append((node, True))
+                stack.extend([(s, False) for s in node.sub_sentences])
+            else:
+                sub_sentences = [canonical[id(s)] for s in node.sub_sentences]
+                rebuilt = node
+                if any([a is not b for a, b in zip(sub_sentences, node.sub_sentences)]):
+                    rebuilt = node.with_sub_sentences(sub_sentences)
+                canonical[id(node)] = self._sentences.setdefault(rebuilt.intern_key, rebuilt)
+        return canonical[id(sentence)]
+
+    def __contains__(self, sentence):
+        return self._sentences.get(sentence.intern_key) is sentence
+
+    def __len__(self):
+        return len(self._sentences)
+
+DEFAULT_INTERNER = SentenceInterner()
+
+def intern_sentence(sentence):
+    return DEFAULT_INTERNER.intern(sentence)
+
+# Evaluates every distinct sub sentence of the given sentences once for the
+# block. Pass the same memo to share results with later calls on the block
+def eval_bits_shared(sentences, bit_assignment, memo=None):
+    if memo is None:
+        memo = {}
+    mask = bit_assignment.mask
+    for sentence in sentences:
+        stack = [(sentence, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node in memo:
+                continue
+            if not node.sub_sentences:
+                memo[node] = node.eval_bits(bit_assignment)
+            elif visited:
+                memo[node] = node.combine_bits(
+                    mask, tuple([memo[s] for s in node.sub_sentences])
+                )
+            else:
+                stack.append((node, True))
+                stack.extend([(s, False) for s in node.sub_sentences])
+    return [memo[sentence] for sentence in sentences]
+
+def distinct_sub_sentences(sentences):
+    ordered = []
+    seen = set()
+    for sentence in sentences:
+        stack = [(sentence, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node in seen:
+                continue
+            if visited or not node.sub_sentences:
+                seen.add(node)
+                ordered.append(node)
+            else:
+                stack.append((node, True))
+                stack.extend([(s, False) for s in reversed(list(node.sub_sentences))])
+    return ordered
+
+def sentence_to_postfix(sentence):
+    items = []
+    stack = [(sentence, False)]
+    while stack:
+        node, visited = stack.pop()
+        if isinstance(node, SimpleSentence):
+            items.append(node.constant.label)
+        elif not isinstance(node, CompoundSentence):
+            raise ValueError('Cannot serialise %s' % node.__class__.__name__)
+        elif visited:
+            items.append(node.symbol)
+        else:
+            stack.append((node, True))
+            stack.extend([(s, False) for s in reversed(node.sub_sentences)])
+    return tuple(items)
+
+# substitutions maps constant labels to the sentences to put in their place
+def sentence_from_postfix(items, interner=DEFAULT_INTERNER, substitutions=None):
+    operands = []
+    for item in items:
+        sentence_class = POSTFIX_SYMBOLS.get(item)
+        if sentence_class is None:
+            if substitutions is not None and item in substitutions:
+                operands.append(substitutions[item])
+            else:
+                operands.append(interner.create(SimpleSentence, PropositionalConstant(item)))
+        elif sentence_class is Negation:
+            operands.append(interner.create(Negation, operands.pop()))
+        else:
+            right = operands.pop()
+            operands.append(interner.create(sentence_class, operands.pop(), right))
+    return operands[0]
+
+POSTFIX_SYMBOLS = {
+    '-': Negation,
+    '^': Conjunction,
+    '|': Disjunction,
+    '=>': Implication,
+    '<=': Reduction,
+    '<=>': Equivalence
+}
@@ -9,6 +9,12 @@ from test_syntax import *
 from test_parser import *
 from test_display import *
 from test_proof import *
+from test_sat import *
+from test_columnar import *
+from test_bdd import *
+from test_knowledge import *
+from test_normalform import *
+from test_simplify import *
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,229 @@
+import sys
+from unittest import TestCase
+from utils import data_provider
+from logic.bdd import BDDManager, VariableOrdering, appearance_order
+from logic.language import PropositionalConstant
+from logic.parser import parse
+from logic.syntax import *
+
+def truth_table_count(sentence):
+    return sum(
+        bin(sentence.eval_bits(bit_assignment)).count('1')
+        for bit_assignment in sentence.vocabulary.iter_bit_assignments()
+    )
+
+def interleaved_equivalences(num_pairs):
+    constants = [PropositionalConstant("x%02d" % i) for i in range(2 * num_pairs)]
+    sentence = None
+    for i in range(num_pairs):
+        pair = Equivalence(
+            SimpleSentence(constants[i]), SimpleSentence(constants[i + num_pairs])
+        )
+        sentence = pair if sentence is None else Conjunction(sentence, pair)
+    return sentence
+
+# Nested to the right so each step only adds a node above the rest
+def long_conjunction(constants):
+    sentence = SimpleSentence(constants[-1])
+    for constant in reversed(constants[:-1]):
+        sentence = Conjunction(SimpleSentence(constant), sentence)
+    return sentence
+
+def long_negated_disjunction(constants):
+    sentence = Negation(SimpleSentence(constants[-1]))
+    for constant in reversed(constants[:-1]):
+        sentence = Disjunction(Negation(SimpleSentence(constant)), sentence)
+    return Negation(sentence)
+
+class BDDManagerTest(TestCase):
+    sentences_data_provider = lambda: (
+        ('a', ),
+        ('-a', ),
+        ('a ^ -a', ),
+        ('a | -a', ),
+        ('(a => b) ^ (b => c)', ),
+        ('(a <= b) <=> -(c | a)', ),
+        ('((a ^ b) | (c ^ d)) => (e <=> a)', ),
+    )
+
+    @data_provider(sentences_data_provider)
+    def test_count_models_matches_truth_table(self, text):
+        sentence = parse(text)
+
+        result = BDDManager().compile(sentence).count_models()
+
+        self.assertEqual(truth_table_count(sentence), result)
+
+    @data_provider(sentences_data_provider)
+    def test_find_model_matches_truth_table_with_sorted_order(self, text):
+        sentence = parse(text)
+
+        result = BDDManager(VariableOrdering.SORTED).compile(sentence).find_model()
+
+        self.assertEqual(sentence.find_model(DecisionMethod.TRUTH_TABLE), result)
+
+    def test_equivalent_sentences_share_node(self):
+        manager = BDDManager()
+
+        first = manager.compile(parse('a => b'))
+        second = manager.compile(parse('-b => -a'))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.node, second.node)
+
+    def test_terminals(self):
+        manager = BDDManager()
+
+        self.assertEqual(True, manager.compile(parse('a | -a')).is_true)
+        self.assertEqual(True, manager.compile(parse('a ^ -a')).is_false)
+
+    def test_entails(self):
+        manager = BDDManager()
+        a_and_b = manager.compile(parse('a ^ b'))
+        a_or_b = manager.compile(parse('a | b'))
+
+        self.assertEqual(True, a_and_b.entails(a_or_b))
+        self.assertEqual(False, a_or_b.entails(a_and_b))
+
+    def test_operators(self):
+        manager = BDDManager()
+        a = manager.compile(parse('a'))
+        b = manager.compile(parse('b'))
+
+        self.assertEqual(manager.compile(parse('-(a ^ b)')), ~(a & b))
+        self.assertEqual(manager.compile(parse('a | b')), a | b)
+
+    def test_unknown_ordering(self):
+        with self.assertRaises(ValueError):
+            BDDManager('random')
+
+    def test_appearance_order(self):
+        result = appearance_order(parse('(c ^ a) | (b => c)'))
+
+        self.assertEqual(['c', 'a', 'b'], [c.label for c in result])
+
+    def test_sift_reduces_size(self):
+        manager = BDDManager(VariableOrdering.SORTED)
+        bdd = manager.compile(interleaved_equivalences(6))
+        before = bdd.size
+
+        manager.sift()
+
+        self.assertEqual(189, before)
+        self.assertEqual(18, bdd.size)
+        self.assertEqual(64, bdd.count_models())
+
+    def test_sift_keeps_functions(self):
+        sentence = parse('((a ^ b) | (c ^ d)) => (e <=> a)')
+        manager = BDDManager(VariableOrdering.SORTED)
+        bdd = manager.compile(sentence)
+
+        manager.sift()
+
+        self.assertEqual(bdd, manager.compile(sentence))
+        self.assertEqual(truth_table_count(sentence), bdd.count_models())
+
+    def test_sift_threshold(self):
+        manager = BDDManager(VariableOrdering.SORTED, sift_threshold=50)
+
+        bdd = manager.compile(interleaved_equivalences(6))
+
+        self.assertEqual(18, bdd.size)
+
+    def test_collect_garbage(self):
+        manager = BDDManager()
+        kept = manager.compile(parse('a ^ b'))
+        manager.compile(parse('(c | d) <=> e'))
+
+        manager.collect_garbage()
+
+        self.assertEqual(kept.size, manager.num_nodes)
+
+    def test_tuple_round_trip(self):
+        sentence = parse('(a <= b) <=> -(c | a)')
+        data = BDDManager(VariableOrdering.SORTED).compile(sentence).to_tuple()
+        manager = BDDManager(VariableOrdering.APPEARANCE)
+
+        result = manager.from_tuple(data)
+
+        self.assertEqual(manager.compile(sentence), result)
+
+    def test_tuple_is_canonical(self):
+        first = BDDManager(VariableOrdering.SORTED).compile(parse('a => b')).to_tuple()
+        second = BDDManager(VariableOrdering.SORTED).compile(parse('-b => -a')).to_tuple()
+
+        self.assertEqual(second, first)
+        self.assertEqual((('a', 'b'), ((1, 0, 1), (0, 1, 2)), 3), first)
+
+    def test_iter_models_sorted_order_matches_truth_table(self):
+        sentence = parse('(a <= b) <=> -(c | a)')
+        expected = [
+            bit_assignment.assignment(row)
+            for bit_assignment in sentence.vocabulary.iter_bit_assignments()
+            for row in bit_assignment.iter_rows(sentence.eval_bits(bit_assignment))
+        ]
+
+        result = BDDManager(VariableOrdering.SORTED).compile(sentence).iter_models()
+
+        self.assertEqual(expected, list(result))
+
+    def test_iter_models_offset(self):
+        bdd = BDDManager().compile(parse('(a ^ b) | c'))
+        models = list(bdd.iter_models())
+
+        for offset in range(len(models) + 1):
+            self.assertEqual(models[offset:], list(bdd.iter_models(offset)))
+
+    def test_ite_beyond_recursion_limit(self):
+        constants = [
+            PropositionalConstant("c%d" % i) for i in range(sys.getrecursionlimit() + 500)
+        ]
+        manager = BDDManager()
+        first = manager.compile(long_conjunction(constants))
+        second = manager.compile(long_negated_disjunction(constants))
+
+        self.assertEqual(first, second)
+        self.assertEqual(True, (first | ~second).is_true)
+
+    def test_models_beyond_recursion_limit(self):
+        constants = [
+            PropositionalConstant("c%d" % i) for i in range(sys.getrecursionlimit() + 500)
+        ]
+        bdd = BDDManager().compile(Negation(long_conjunction(constants)))
+        models = bdd.iter_models(2 ** len(constants) - 4)
+
+        self.assertEqual(2 ** len(constants) - 1, bdd.count_models())
+        self.assertEqual([
+            [False] * (len(constants) - 2) + [True, False],
+            [False] * (len(constants) - 1) + [True],
+            [False] * len(constants)
+        ], [[model.get(c) for c in constants] for model in models])
+
+class BDDDecisionMethodTest(TestCase):
+    def test_find_model(self):
+        sentence = parse('(a => b) ^ a')
+
+        result = sentence.find_model(DecisionMethod.BDD)
+
+        self.assertEqual(True, sentence.eval(result))
+
+    def test_unsatisfiable(self):
+        self.assertEqual(None, parse('a ^ -a').find_model(DecisionMethod.BDD))
+
+    def test_equivalence(self):
+        first = parse('a => (b => c)')
+        second = parse('(a ^ b) => c')
+
+        self.assertEqual(True, first.is_logically_equivalent(second, DecisionMethod.BDD))
+
+    def test_equivalence_beyond_recursion_limit(self):
+        constants = [
+            PropositionalConstant("c%d" % i) for i in range(sys.getrecursionlimit() + 500)
+        ]
+        first = long_conjunction(constants)
+        second = long_negated_disjunction(constants)
+
+        self.assertEqual(True, first.is_logically_equivalent(second, DecisionMethod.BDD))
+        self.assertEqual(False, first.is_logically_equivalent(
+            Negation(second), DecisionMethod.BDD
+        ))
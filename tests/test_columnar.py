@@ -0,0 +1,106 @@
+from io import BytesIO, StringIO
+from os.path import join
+from shutil import rmtree
+from struct import unpack
+from tempfile import mkdtemp
+from unittest import TestCase, skipIf
+from logic.columnar import ColumnarTruthTable, NumpyUnavailableException, numpy, pack_bits, unpack_bits
+from logic.display import TruthTable
+from logic.parser import parse
+
+def read_npy(data):
+    header_length = unpack('<H', data[8:10])[0]
+    header = data[10:10 + header_length].decode('latin-1')
+    return header, data[10 + header_length:]
+
+class ColumnarTruthTableTest(TestCase):
+    def setUp(self):
+        self.table = TruthTable.for_sentences([parse('a=>b')]).to_columnar()
+
+    def test_pack_bits(self):
+        self.assertEqual(b'\x05\x01', pack_bits(0x105, 16))
+
+    def test_pack_bits_partial_byte(self):
+        self.assertEqual(b'\x03', pack_bits(0x3, 4))
+
+    def test_unpack_bits(self):
+        self.assertEqual(b'\x01\x00\x01\x00', unpack_bits(0x5, 4))
+
+    def test_shape(self):
+        self.assertEqual((4, 3), (self.table.num_rows, self.table.num_columns))
+        self.assertEqual(['a', 'b', '(a => b)'], self.table.headings)
+
+    def test_column(self):
+        self.assertEqual(b'\x01\x00\x01\x01', self.table.column(2))
+
+    def test_packed_column(self):
+        self.assertEqual(b'\x0d', self.table.packed_column(2))
+
+    def test_matches_matrix(self):
+        table = TruthTable.for_sentences([parse('(a^b)|-c'), parse('c<=>d')])
+        columnar = table.to_columnar()
+
+        for index, column in enumerate(table.matrix):
+            self.assertEqual(column[1:], [v == 1 for v in bytearray(columnar.column(index))])
+
+    def test_write_csv(self):
+        output = StringIO()
+
+        self.table.write_csv(output)
+
+        self.assertEqual(
+            '"a","b","(a => b)"\n1,1,1\n1,0,0\n0,1,1\n0,0,1\n',
+            output.getvalue()
+        )
+
+    def test_write_npy(self):
+        output = BytesIO()
+
+        self.table.write_npy(output)
+
+        header, body = read_npy(output.getvalue())
+        self.assertTrue(header.endswith('\n'))
+        self.assertEqual(0, (10 + len(header)) % 64)
+        self.assertIn("'fortran_order': True, 'shape': (4, 3)", header)
+        self.assertEqual(b'\x01\x01\x00\x00' + b'\x01\x00\x01\x00' + b'\x01\x00\x01\x01', body)
+
+    def test_write_packed_npy(self):
+        output = BytesIO()
+
+        self.table.write_npy(output, packed=True)
+
+        header, body = read_npy(output.getvalue())
+        self.assertIn("'descr': '|u1'", header)
+        self.assertIn("'shape': (3, 1)", header)
+        self.assertEqual(b'\x03\x05\x0d', body)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_to_numpy_without_columns(self):
+        table = ColumnarTruthTable(parse('a=>b').vocabulary, [])
+
+        self.assertEqual((4, 0), table.to_numpy().shape)
+        self.assertEqual((0, 1), table.to_numpy(packed=True).shape)
+
+    @skipIf(numpy is not None, 'numpy is installed')
+    def test_to_numpy_without_numpy(self):
+        self.assertRaises(NumpyUnavailableException, self.table.to_numpy)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_to_numpy(self):
+        result = self.table.to_numpy()
+
+        self.assertEqual((4, 3), result.shape)
+        self.assertEqual([True, False, True, True], list(result[:, 2]))
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_save_and_load_npy(self):
+        directory = mkdtemp()
+        try:
+            path = join(directory, 'table.npy')
+            self.table.save_npy(path)
+
+            result = ColumnarTruthTable.load_npy(path)
+
+            self.assertEqual(self.table.to_numpy().tolist(), result.tolist())
+        finally:
+            rmtree(directory)
@@ -1,6 +1,7 @@
+from io import StringIO
 from unittest import TestCase
 from logic.language import PropositionalConstant, PropositionalVocabulary
-from logic.syntax import Negation, SimpleSentence
+from logic.syntax import Conjunction, Negation, SimpleSentence
 from logic.display import TruthTable
 
 class TruthTableTest(TestCase):
@@ -60,4 +61,55 @@ class TruthTableTest(TestCase):
             [SimpleSentence(a_constant), True, True, False, False],
             [SimpleSentence(b_constant), True, False, True, False],
             [negation_a, False, False, True, True]
-        ], result)
\ No newline at end of file
+        ], result)
+
+    def test_write_simple_string(self):
+        a_constant = PropositionalConstant("a")
+        vocab = PropositionalVocabulary([a_constant, PropositionalConstant("b")])
+        table = TruthTable(vocab, [Negation(SimpleSentence(a_constant))])
+        output = StringIO()
+
+        table.write_simple_string(output)
+
+        self.assertEqual(table.simple_string + "\n", output.getvalue())
+
+    def test_iter_rows(self):
+        a_constant = PropositionalConstant("a")
+        vocab = PropositionalVocabulary([a_constant, PropositionalConstant("b")])
+        table = TruthTable(vocab, [Negation(SimpleSentence(a_constant))])
+
+        result = list(table.iter_rows())
+
+        self.assertEqual([list(row) for row in zip(*table.matrix)][1:], [list(r) for r in result])
+
+    def test_include_sub_sentences(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        sentence = Negation(Conjunction(a, Negation(b)))
+        table = TruthTable.for_sentences([sentence, a], include_sub_sentences=True)
+
+        result = table.matrix
+
+        self.assertEqual([
+            [a, True, True, False, False],
+            [b, True, False, True, False],
+            [Negation(b), False, True, False, True],
+            [Conjunction(a, Negation(b)), False, True, False, False],
+            [sentence, True, False, True, True],
+            [a, True, True, False, False]
+        ], result)
+
+    def test_include_sub_sentences_keeps_requested(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        negation = Negation(b)
+        sentence = Conjunction(a, negation)
+        table = TruthTable.for_sentences(
+            [negation, sentence, a, sentence, negation],
+            include_sub_sentences=True
+        )
+
+        self.assertEqual(
+            [a, b, negation, sentence, a, sentence, negation],
+            table.column_sentences
+        )
@@ -0,0 +1,90 @@
+from random import Random
+from unittest import TestCase
+from logic.knowledge import KnowledgeBase, KnowledgeBaseException
+from logic.parser import parse
+from logic.syntax import DecisionMethod, SentenceSet
+
+class KnowledgeBaseTest(TestCase):
+    def test_empty_is_consistent(self):
+        knowledge_base = KnowledgeBase()
+
+        self.assertEqual(True, knowledge_base.is_consistent)
+        self.assertEqual(0, len(knowledge_base))
+
+    def test_add_and_retract(self):
+        a = parse('a')
+        not_a = parse('-a')
+        knowledge_base = KnowledgeBase([a])
+
+        knowledge_base.add(not_a)
+        inconsistent = knowledge_base.is_consistent
+        knowledge_base.retract(a)
+
+        self.assertEqual(False, inconsistent)
+        self.assertEqual(True, knowledge_base.is_consistent)
+        self.assertEqual(frozenset([not_a]), knowledge_base.sentences)
+
+    def test_re_add_after_retract(self):
+        a = parse('a')
+        knowledge_base = KnowledgeBase([a, parse('-a')])
+
+        knowledge_base.retract(a)
+        knowledge_base.add(a)
+
+        self.assertEqual(False, knowledge_base.is_consistent)
+
+    def test_retract_missing(self):
+        with self.assertRaises(KnowledgeBaseException):
+            KnowledgeBase().retract(parse('a'))
+
+    def test_entails(self):
+        knowledge_base = KnowledgeBase([parse('a => b'), parse('b => c')])
+
+        self.assertEqual(False, knowledge_base.entails(parse('c')))
+        knowledge_base.add(parse('a'))
+        self.assertEqual(True, knowledge_base.entails(parse('c')))
+        self.assertEqual(False, knowledge_base.entails(parse('d')))
+
+    def test_find_entailment_counterexample(self):
+        knowledge_base = KnowledgeBase([parse('a | b')])
+        query = parse('a')
+
+        result = knowledge_base.find_entailment_counterexample(query)
+
+        self.assertEqual(True, knowledge_base.sentence_set.eval(result))
+        self.assertEqual(False, query.eval(result))
+
+    def test_find_model(self):
+        knowledge_base = KnowledgeBase([parse('a => b'), parse('a'), parse('c | -b')])
+
+        result = knowledge_base.find_model()
+
+        self.assertEqual(True, knowledge_base.sentence_set.eval(result))
+
+    def test_find_model_inconsistent(self):
+        self.assertEqual(None, KnowledgeBase([parse('a ^ -a')]).find_model())
+
+    def test_matches_sentence_set(self):
+        random = Random(3)
+        pool = [parse(text) for text in (
+            'a', '-a', 'a => b', 'b => c', '-c', 'c | d', 'd <=> -a', 'b ^ d', '-(a | d)'
+        )]
+        queries = [parse(text) for text in ('c', 'a => d', '-b', 'a | -a')]
+        knowledge_base = KnowledgeBase()
+
+        for _ in range(60):
+            sentence = random.choice(pool)
+            if sentence in knowledge_base:
+                knowledge_base.retract(sentence)
+            else:
+                knowledge_base.add(sentence)
+
+            sentence_set = SentenceSet(knowledge_base.sentences)
+            self.assertEqual(
+                sentence_set.is_satisfiable, knowledge_base.is_consistent
+            )
+            for query in queries:
+                self.assertEqual(
+                    sentence_set.logically_entails(query, DecisionMethod.TRUTH_TABLE),
+                    knowledge_base.entails(query)
+                )
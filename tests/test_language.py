@@ -71,6 +71,30 @@ class TruthAssignmentTest(TestCase):
 
         self.assertEqual(None, result)
 
+    def test_from_bits_matches_dict(self):
+        a = PropositionalConstant("a")
+        b = PropositionalConstant("b")
+        vocab = PropositionalVocabulary([a, b])
+
+        result = TruthAssignment.from_bits(vocab, 0b10)
+
+        self.assertEqual(TruthAssignment({a : True, b : False}), result)
+        self.assertEqual(hash(TruthAssignment({a : True, b : False})), hash(result))
+        self.assertEqual({a : True, b : False}, result.constants_to_value)
+
+    def test_add(self):
+        a = PropositionalConstant("a")
+        b = PropositionalConstant("b")
+
+        result = TruthAssignment({a : True}) + TruthAssignment({b : False})
+
+        self.assertEqual(TruthAssignment({a : True, b : False}), result)
+
+    def test_compact(self):
+        a = TruthAssignment({PropositionalConstant("a") : True})
+
+        self.assertEqual(False, hasattr(a, '__dict__'))
+
     lt_data_provider = lambda: (
         (
             TruthAssignment({PropositionalConstant("a"): True,  PropositionalConstant("b"): True}),
@@ -123,6 +147,71 @@ class PropositionalVocabularyTest(TestCase):
 
         self.assertEqual(expected, vocab.all_assignments)
 
+    def test_iter_assignments_order(self):
+        c1 = PropositionalConstant("one")
+        c2 = PropositionalConstant("two")
+        vocab = PropositionalVocabulary([c2, c1])
+
+        result = list(vocab.iter_assignments())
+
+        expected = [
+            TruthAssignment({c1 : True, c2 : True}),
+            TruthAssignment({c1 : True, c2 : False}),
+            TruthAssignment({c1 : False, c2 : True}),
+            TruthAssignment({c1 : False, c2 : False})
+        ]
+        self.assertEqual(expected, result)
+
+    def test_iter_assignments_is_lazy(self):
+        names = ["c%s" % i for i in range(64)]
+        vocab = PropositionalVocabulary.from_constant_names(names)
+
+        result = next(iter(vocab.iter_assignments()))
+
+        self.assertEqual(64, len(result.constants))
+        self.assertEqual(True, all(result.constants_to_value.values()))
+
+    def test_iter_bit_assignments_single_block(self):
+        c1 = PropositionalConstant("one")
+        c2 = PropositionalConstant("two")
+        vocab = PropositionalVocabulary([c1, c2])
+
+        result = list(vocab.iter_bit_assignments())
+
+        self.assertEqual(1, len(result))
+        self.assertEqual(0b0011, result[0].get(c1))
+        self.assertEqual(0b0101, result[0].get(c2))
+        self.assertEqual(0b1111, result[0].mask)
+
+    def test_iter_bit_assignments_multiple_blocks(self):
+        c1 = PropositionalConstant("one")
+        c2 = PropositionalConstant("two")
+        c3 = PropositionalConstant("three")
+        vocab = PropositionalVocabulary([c1, c2, c3])
+
+        result = list(vocab.iter_bit_assignments(rows_per_block=2))
+
+        self.assertEqual([0, 2, 4, 6], [b.first_row for b in result])
+        self.assertEqual([0b11, 0b11, 0, 0], [b.get(c1) for b in result])
+        self.assertEqual([0b01, 0b01, 0b01, 0b01], [b.get(c2) for b in result])
+
+    def test_iter_bit_assignments_invalid_block_size(self):
+        vocab = PropositionalVocabulary.from_constant_names(["a"])
+
+        with self.assertRaises(ValueError):
+            list(vocab.iter_bit_assignments(rows_per_block=3))
+
+    def test_bit_assignment_rows_match_iter_assignments(self):
+        vocab = PropositionalVocabulary.from_constant_names(["a", "b", "c"])
+
+        result = [
+            bit_assignment.assignment(row)
+            for bit_assignment in vocab.iter_bit_assignments(rows_per_block=4)
+            for row in range(bit_assignment.num_rows)
+        ]
+
+        self.assertEqual(list(vocab.iter_assignments()), result)
+
     def test_str(self):
         vocab = PropositionalVocabulary.from_constant_names(["a", "b"])
 
@@ -0,0 +1,139 @@
+from io import StringIO
+from unittest import TestCase
+from utils import data_provider
+from logic.language import PropositionalConstant
+from logic.normalform import *
+from logic.parser import parse
+from logic.syntax import *
+
+def is_nnf(sentence):
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if is_literal(node):
+            continue
+        if not isinstance(node, (Conjunction, Disjunction)):
+            return False
+        stack.extend(node.sub_sentences)
+    return True
+
+class NormalFormTest(TestCase):
+    sentences_data_provider = lambda: (
+        ('a', ),
+        ('--a', ),
+        ('-(a ^ b)', ),
+        ('-(a | -b)', ),
+        ('a => (b => c)', ),
+        ('-(a <= b)', ),
+        ('(a <=> b) <=> c', ),
+        ('-((a => b) ^ (c | -(d <=> a)))', ),
+    )
+
+    @data_provider(sentences_data_provider)
+    def test_nnf(self, text):
+        sentence = parse(text)
+
+        result = to_nnf(sentence)
+
+        self.assertEqual(True, is_nnf(result))
+        self.assertEqual(True, sentence.is_logically_equivalent(result))
+
+    @data_provider(sentences_data_provider)
+    def test_distributed_cnf(self, text):
+        sentence = parse(text)
+
+        result = to_cnf(sentence)
+
+        self.assertEqual(True, sentence.is_logically_equivalent(result))
+        for clause in cnf_clauses(sentence):
+            self.assertEqual(len(clause), len(set(clause)))
+
+    @data_provider(sentences_data_provider)
+    def test_dnf(self, text):
+        sentence = parse(text)
+
+        result = to_dnf(sentence)
+
+        self.assertEqual(True, sentence.is_logically_equivalent(result))
+
+    @data_provider(sentences_data_provider)
+    def test_tseitin_preserves_model_count(self, text):
+        sentence = parse(text)
+
+        result = to_cnf(sentence, CNFMethod.TSEITIN)
+
+        self.assertEqual(True, result.logically_entails(sentence))
+        self.assertEqual(sentence.count_models(), result.count_models())
+
+    @data_provider(sentences_data_provider)
+    def test_plaisted_greenbaum_equisatisfiable(self, text):
+        sentence = parse(text)
+
+        result = to_cnf(sentence, CNFMethod.PLAISTED_GREENBAUM)
+
+        self.assertEqual(True, result.logically_entails(sentence))
+        self.assertEqual(sentence.is_satisfiable, result.is_satisfiable)
+        self.assertEqual(
+            sentence.is_satisfiable, Conjunction(sentence, result).is_satisfiable
+        )
+
+    def test_cnf_input_unchanged(self):
+        sentence = parse('(a | -b) ^ (c | b)')
+
+        for method in (CNFMethod.DISTRIBUTE, CNFMethod.TSEITIN):
+            self.assertEqual([
+                ((PropositionalConstant('a'), True), (PropositionalConstant('b'), False)),
+                ((PropositionalConstant('b'), True), (PropositionalConstant('c'), True)),
+            ], sorted(cnf_clauses(sentence, method)))
+
+    def test_fresh_constants_avoid_existing(self):
+        sentence = parse('(cnf1 ^ b) | (c ^ d)')
+
+        clauses = cnf_clauses(sentence, CNFMethod.TSEITIN)
+
+        labels = set([c.label for clause in clauses for c, _ in clause])
+        self.assertEqual(set(['cnf1', 'b', 'c', 'd', 'cnf2', 'cnf3']), labels)
+
+    def test_distribution_size_bound(self):
+        sentence = parse('(a ^ b) | (c ^ d) | (e ^ f) | (g ^ h)')
+
+        with self.assertRaises(NormalFormSizeException):
+            cnf_clauses(sentence, max_clauses=8)
+
+        self.assertEqual(16, len(cnf_clauses(sentence, max_clauses=16)))
+
+    def test_definitional_encodings_are_linear(self):
+        sentence = parse('a')
+        for i in range(200):
+            sentence = Equivalence(sentence, SimpleSentence(PropositionalConstant('b%d' % i)))
+
+        tseitin = cnf_clauses(sentence, CNFMethod.TSEITIN)
+        plaisted_greenbaum = cnf_clauses(sentence, CNFMethod.PLAISTED_GREENBAUM)
+
+        self.assertEqual(True, len(tseitin) < 20 * 200)
+        self.assertEqual(True, len(plaisted_greenbaum) < len(tseitin))
+
+    def test_deep_sentence(self):
+        sentence = parse('a')
+        for i in range(5000):
+            sentence = Negation(Conjunction(sentence, SimpleSentence(PropositionalConstant('b'))))
+
+        result = to_nnf(sentence)
+
+        self.assertEqual(True, is_nnf(result))
+
+    def test_empty_sentence_set(self):
+        with self.assertRaises(NormalFormException):
+            to_nnf(SentenceSet([]))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            cnf_clauses(parse('a'), 'magic')
+
+    def test_write_dimacs(self):
+        output = StringIO()
+
+        variables = write_dimacs(cnf_clauses(parse('(a | -b) ^ b')), output)
+
+        self.assertEqual('p cnf 2 2\n1 -2 0\n2 0\n', output.getvalue())
+        self.assertEqual({PropositionalConstant('a'): 1, PropositionalConstant('b'): 2}, variables)
@@ -1,4 +1,7 @@
 from unittest import TestCase
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from threading import Thread
 from utils import data_provider
 from logic.syntax import *
 from logic.language import *
@@ -49,6 +52,34 @@ class TokeniseTest(TestCase):
         with self.assertRaises(TokenisationError):
             tokenise(program)
 
+class IterTokensTest(TestCase):
+    chunk_size_data_provider = lambda: ((1, ), (2, ), (3, ), (7, ), (1024, ))
+
+    @data_provider(chunk_size_data_provider)
+    def test_file_matches_tokenise(self, chunk_size):
+        program = "(abc <=> b_2)^-c\n| d <= e => long_constant_name\n"
+
+        result = tuple(iter_tokens(StringIO(program), chunk_size))
+
+        self.assertEqual(tokenise(program), result)
+
+    def test_lazy(self):
+        tokens = iter_tokens("a ^ & b")
+
+        self.assertEqual(ConstantToken("a"), next(tokens))
+        self.assertEqual(ConjunctionToken(), next(tokens))
+        with self.assertRaises(TokenisationError):
+            next(tokens)
+
+    def test_operator_tokens_are_shared(self):
+        tokens = tokenise("a ^ b ^ c")
+
+        self.assertIs(tokens[1], tokens[3])
+
+    def test_invalid_across_chunks(self):
+        with self.assertRaises(TokenisationError):
+            tuple(iter_tokens(StringIO("a ^ b_c&d"), 4))
+
 class ParseProgramTest(TestCase):
     valid_data_provider = lambda: (
         (SimpleSentence(PropositionalConstant("a")), tokenise("a")),
@@ -113,4 +144,173 @@ class ParseProgramTest(TestCase):
     def test_valid_expressions(self, expected, tokens):
         expression = parse_program(tokens)
 
-        self.assertEqual(expected, expression)
\ No newline at end of file
+        self.assertEqual(expected, expression)
+
+class ParseTest(TestCase):
+    def test_builds_interned_sentences(self):
+        result_1 = parse("(a ^ b) | (a ^ b)")
+        result_2 = parse("(a^b)|(a^b)")
+
+        self.assertIs(result_1, result_2)
+        self.assertIs(result_1.sub_sentences[0], result_1.sub_sentences[1])
+
+    def test_custom_interner(self):
+        interner = SentenceInterner()
+
+        result = parse("-a", interner)
+
+        self.assertIn(result, interner)
+        self.assertEqual(2, len(interner))
+
+    def test_parse_file(self):
+        result = parse(StringIO("a ^\n(b | c)\n"))
+
+        self.assertEqual(parse("a ^ (b | c)"), result)
+
+class PrattParserTest(TestCase):
+    @data_provider(ParseProgramTest.valid_data_provider)
+    def test_matches_parse_program(self, expected, tokens):
+        expression = PrattParser().parse(tokens)
+
+        self.assertEqual(expected, expression)
+        self.assertIs(parse_program(tokens), expression)
+
+    def test_double_negation(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+
+        self.assertEqual(Negation(Negation(a)), parse("--a"))
+        self.assertEqual(Conjunction(a, Negation(Negation(b))), parse("a ^ --b"))
+        self.assertEqual(Negation(Negation(a)), parse_program(tokenise("--a")))
+
+    def test_deeply_nested(self):
+        depth = 20000
+
+        result = parse("(" * depth + "-" * depth + "a" + ")" * depth)
+
+        self.assertEqual(depth + 1, result.depth)
+
+    def test_long_chain(self):
+        result = parse(" ^ ".join(["c%d" % (i % 10) for i in range(50000)]))
+
+        self.assertEqual(50000, result.depth)
+
+    invalid_data_provider = lambda: (
+        ("", ),
+        ("a ^", ),
+        ("(a", ),
+        ("a)", ),
+        ("a b", ),
+        ("()", ),
+        ("^ a", )
+    )
+
+    @data_provider(invalid_data_provider)
+    def test_invalid_expressions(self, program):
+        with self.assertRaises(ParsingError):
+            parse(program)
+
+class ParseManyTest(TestCase):
+    lines = ["a ^ b\n", "\n", "a ^ ^ b\n", "-(c => d)\n", "Bad\n", "e"]
+
+    def test_reports_errors_per_line(self):
+        results = list(parse_many(self.lines))
+
+        self.assertEqual([1, 3, 4, 5, 6], [r.line_number for r in results])
+        self.assertEqual([True, False, True, False, True], [r.is_valid for r in results])
+        self.assertEqual(parse("-(c => d)"), results[2].sentence)
+        self.assertEqual(None, results[1].sentence)
+        self.assertIsInstance(results[3].error, TokenisationError)
+
+    def test_process_pool_matches_sequential(self):
+        results = list(parse_many(self.lines, processes=2, chunk_size=2))
+
+        self.assertEqual(list(parse_many(self.lines)), results)
+        self.assertIs(parse("a ^ b"), results[0].sentence)
+
+    def test_process_pool_reads_a_bounded_window_ahead(self):
+        read = []
+        def lines():
+            for number in range(100):
+                read.append(number)
+                yield "a%d\n" % number
+
+        results = parse_many(lines(), processes=1, chunk_size=2)
+        first = next(results)
+
+        self.assertEqual("a0", first.text)
+        self.assertTrue(len(read) <= 2 * (CHUNKS_IN_FLIGHT_PER_PROCESS + 1))
+        self.assertEqual(99, len(list(results)))
+
+    def test_parse_file(self):
+        with NamedTemporaryFile('w', suffix='.txt') as formulas:
+            formulas.write("".join(self.lines))
+            formulas.flush()
+
+            results = list(parse_file(formulas.name))
+
+        self.assertEqual(list(parse_many(self.lines)), results)
+
+class ParseCacheTest(TestCase):
+    def test_hits_and_misses(self):
+        cache = ParseCache(capacity=10)
+
+        result_1 = cache.parse("a ^ b")
+        result_2 = cache.parse("  a  ^\tb ")
+
+        self.assertIs(result_1, result_2)
+        self.assertEqual(parse("a ^ b"), result_1)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(0.5, cache.hit_rate)
+
+    def test_evicts_least_recently_used(self):
+        cache = ParseCache(capacity=2)
+        cache.parse("a")
+        cache.parse("b")
+        cache.parse("a")
+
+        cache.parse("c")
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(2, len(cache))
+
+    def test_invalidate(self):
+        cache = ParseCache()
+        cache.parse("a")
+        cache.parse("b")
+
+        cache.invalidate("a")
+        self.assertNotIn("a", cache)
+        self.assertIn("b", cache)
+
+        cache.invalidate()
+        self.assertEqual(0, len(cache))
+
+    def test_errors_not_cached(self):
+        cache = ParseCache()
+
+        with self.assertRaises(ParsingError):
+            cache.parse("a ^")
+
+        self.assertEqual(0, len(cache))
+
+    def test_shared_across_threads(self):
+        cache = ParseCache(capacity=8)
+        texts = ["c%d => c%d" % (i % 12, i % 5) for i in range(300)]
+        results = {}
+
+        def work(worker):
+            results[worker] = [cache.parse(t) for t in texts]
+
+        threads = [Thread(target=work, args=(i, )) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = [parse(t) for t in texts]
+        for worker in range(4):
+            self.assertEqual(expected, results[worker])
+        self.assertEqual(4 * len(texts), cache.hits + cache.misses)
\ No newline at end of file
@@ -1,9 +1,14 @@
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
 from unittest import TestCase
 from logic.syntax import Implication, SimpleSentence, Conjunction, Negation
 from logic.language import PropositionalConstant
+from logic.parser import parse
 from logic.proof import BruteForceMendelsonProver, ProofProblem, \
     InvalidMendelsonProblem, ImplicationElimination, ImplicationCreation, \
-    ImplicationDistribution, ContradictionRealisation
+    ImplicationDistribution, ContradictionRealisation, SearchStrategy, \
+    ProofChecker, ProofCheckResult, Premise, ProofCache
 from utils import data_provider
 
 class ContradictionRealisationTest(TestCase):
@@ -55,6 +60,16 @@ class ImplicationDistributionTest(TestCase):
         )
         self.assertEqual(expected, result)
 
+    def test_equality(self):
+        sentence_a = SimpleSentence(PropositionalConstant("a"))
+        sentence_b = SimpleSentence(PropositionalConstant("b"))
+        distribution = ImplicationDistribution(sentence_a, sentence_b, sentence_a)
+
+        self.assertEqual(ImplicationDistribution(sentence_a, sentence_b, sentence_a), distribution)
+        self.assertNotEqual(ImplicationDistribution(sentence_b, sentence_b, sentence_a), distribution)
+        self.assertNotEqual(ImplicationCreation(sentence_a, sentence_b), ContradictionRealisation(sentence_a, sentence_b))
+        self.assertEqual(1, len(set([distribution, ImplicationDistribution(sentence_a, sentence_b, sentence_a)])))
+
 class BruteForceMendelsonProverTest(TestCase):
     def test_prove_already_proven(self):
         prover = BruteForceMendelsonProver()
@@ -140,4 +155,402 @@ class BruteForceMendelsonProverTest(TestCase):
         )
         solution = prover(problem)
 
-        self.assertEqual(tuple([ImplicationElimination(implication)]), solution)
\ No newline at end of file
+        self.assertEqual(tuple([ImplicationElimination(implication)]), solution)
+
+    def test_is_valid_mendelson_sentence_deep(self):
+        prover = BruteForceMendelsonProver()
+        sentence_p = SimpleSentence(PropositionalConstant("p"))
+        sentence = sentence_p
+        for _ in range(20000):
+            sentence = Implication(Negation(sentence), sentence_p)
+
+        self.assertEqual(True, prover.is_valid_mendelson_sentence(sentence))
+        self.assertEqual(False, prover.is_valid_mendelson_sentence(Negation(
+            Implication(sentence, Conjunction(sentence_p, sentence_p))
+        )))
+
+    strategy_data_provider = lambda: (
+        (SearchStrategy.BREADTH_FIRST, ),
+        (SearchStrategy.ITERATIVE_DEEPENING, ),
+        (SearchStrategy.BEST_FIRST, )
+    )
+
+    @data_provider(strategy_data_provider)
+    def test_prove_identity(self, strategy):
+        prover = BruteForceMendelsonProver(strategy)
+        problem = ProofProblem([], parse("p => p"))
+
+        solution = prover(problem)
+
+        self.assertEqual(5, len(solution))
+        self.assertEqual(parse("p => p"), solution[-1].resulting_premise)
+        self.assertEqual(ProofCheckResult(), ProofChecker().check(problem, solution))
+
+    proof_length_data_provider = lambda: (
+        (["p => q", "p"], "q", 1),
+        (["p"], "q => p", 2),
+        (["-p => q", "-p => -q"], "p", 3),
+        (["p => q", "q => r"], "p => r", 5),
+    )
+
+    @data_provider(proof_length_data_provider)
+    def test_prove_chained(self, premises, conclusion, expected_length):
+        for strategy in (SearchStrategy.BREADTH_FIRST, SearchStrategy.ITERATIVE_DEEPENING,
+                SearchStrategy.BEST_FIRST):
+            prover = BruteForceMendelsonProver(strategy)
+            problem = ProofProblem([parse(p) for p in premises], parse(conclusion))
+
+            solution = prover(problem)
+
+            self.assertEqual(expected_length, len(solution))
+            self.assertEqual(ProofCheckResult(), ProofChecker().check(problem, solution))
+
+    def test_prove_textbook_results(self):
+        # In order, so the later results can use the earlier ones as lemmas
+        problems = [
+            ProofProblem([parse("p => (q => r)")], parse("q => (p => r)")),
+            ProofProblem([], parse("--p => p")),
+            ProofProblem([], parse("p => --p")),
+            ProofProblem([parse("p => q")], parse("-q => -p")),
+            ProofProblem([], parse("(p => q) => ((q => r) => (p => r))")),
+        ]
+        prover = BruteForceMendelsonProver(cache=ProofCache())
+
+        for problem in problems:
+            result = prover.search(problem)
+
+            self.assertEqual(True, result.is_proven)
+            self.assertEqual(True, ProofChecker().check(problem, result.proof).is_valid)
+
+    def test_prove_textbook_results_without_lemmas(self):
+        problems = [
+            ProofProblem([parse("p => (q => r)")], parse("q => (p => r)")),
+            ProofProblem([], parse("--p => p")),
+            ProofProblem([], parse("(p => q) => ((q => r) => (p => r))")),
+        ]
+
+        for strategy in (SearchStrategy.BREADTH_FIRST, SearchStrategy.ITERATIVE_DEEPENING,
+                SearchStrategy.BEST_FIRST):
+            for problem in problems:
+                proof = BruteForceMendelsonProver(strategy)(problem)
+
+                self.assertEqual(True, ProofChecker().check(problem, proof).is_valid)
+
+    def test_prove_deterministic(self):
+        problem = ProofProblem([parse("p => q"), parse("q => r")], parse("p => r"))
+
+        solutions = set([BruteForceMendelsonProver()(problem) for _ in range(3)])
+
+        self.assertEqual(1, len(solutions))
+
+    def test_prove_depth_budget(self):
+        prover = BruteForceMendelsonProver(max_depth=2)
+
+        self.assertEqual(tuple(), prover(ProofProblem([], parse("p => p"))))
+
+    def test_prove_node_budget(self):
+        prover = BruteForceMendelsonProver(max_nodes=10)
+
+        self.assertEqual(tuple(), prover(ProofProblem([], parse("p => p"))))
+
+    def test_prove_unknown_strategy(self):
+        prover = BruteForceMendelsonProver('unknown')
+
+        with self.assertRaises(ValueError):
+            prover(ProofProblem([], parse("p => p")))
+
+    def test_search_statistics(self):
+        problem = ProofProblem([], parse("p => p"))
+
+        best_first = BruteForceMendelsonProver(SearchStrategy.BEST_FIRST).search(problem)
+        breadth_first = BruteForceMendelsonProver().search(problem)
+
+        self.assertEqual(True, best_first.is_proven)
+        self.assertEqual(SearchStrategy.BEST_FIRST, best_first.statistics.strategy)
+        self.assertLess(best_first.statistics.nodes_expanded, breadth_first.statistics.nodes_expanded)
+        self.assertLessEqual(best_first.statistics.nodes_expanded, best_first.statistics.nodes_generated)
+        self.assertGreaterEqual(best_first.statistics.elapsed, 0)
+
+    @data_provider(strategy_data_provider)
+    def test_search_saturated(self, strategy):
+        result = BruteForceMendelsonProver(strategy).search(ProofProblem([parse("p")], parse("q")))
+
+        self.assertEqual(False, result.is_proven)
+        self.assertEqual(True, result.statistics.saturated)
+        self.assertEqual(False, result.statistics.timed_out)
+
+    budget_data_provider = lambda: (
+        (BruteForceMendelsonProver(max_depth=2), ),
+        (BruteForceMendelsonProver(max_nodes=10), ),
+        (BruteForceMendelsonProver(SearchStrategy.BEST_FIRST, max_depth=2), ),
+        (BruteForceMendelsonProver(time_limit=0), ),
+    )
+
+    @data_provider(budget_data_provider)
+    def test_search_budget_not_saturated(self, prover):
+        result = prover.search(ProofProblem([], parse("p => p")))
+
+        self.assertEqual(False, result.is_proven)
+        self.assertEqual(False, result.statistics.saturated)
+
+    def test_search_not_proven(self):
+        prover = BruteForceMendelsonProver(SearchStrategy.BEST_FIRST, max_nodes=10)
+
+        result = prover.search(ProofProblem([], parse("p => p")))
+
+        self.assertEqual(False, result.is_proven)
+        self.assertEqual(tuple(), result.proof)
+        self.assertLessEqual(result.statistics.nodes_generated, 10)
+
+    def test_search_already_proven(self):
+        problem = ProofProblem([parse("p")], parse("p"))
+
+        result = BruteForceMendelsonProver().search(problem)
+
+        self.assertEqual(True, result.is_proven)
+        self.assertEqual(0, result.statistics.nodes_expanded)
+
+    def test_search_time_limit(self):
+        prover = BruteForceMendelsonProver(time_limit=0)
+
+        result = prover.search(ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")))
+
+        self.assertEqual(tuple(), result.proof)
+        self.assertEqual(True, result.statistics.timed_out)
+
+    @data_provider(strategy_data_provider)
+    def test_search_time_limit_while_widening(self, strategy):
+        prover = BruteForceMendelsonProver(strategy, max_nodes=10 ** 6, time_limit=0.1)
+
+        result = prover.search(ProofProblem([parse("p")], parse("q => r")))
+
+        self.assertEqual(False, result.is_proven)
+        self.assertEqual(True, result.statistics.timed_out)
+        self.assertEqual(False, result.statistics.saturated)
+        self.assertLess(result.statistics.elapsed, 1)
+
+    @data_provider(strategy_data_provider)
+    def test_search_many(self, strategy):
+        problems = [
+            ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")),
+            ProofProblem([], parse("p => p")),
+            ProofProblem([parse("p")], parse("p")),
+            ProofProblem([parse("p")], parse("q")),
+        ]
+        prover = BruteForceMendelsonProver(strategy)
+        expected = [prover(p) for p in problems]
+
+        sequential = list(prover.search_many(problems))
+        parallel = list(prover.search_many(problems, processes=2))
+
+        self.assertEqual(expected, [r.proof for r in sequential])
+        self.assertEqual(expected, [r.proof for r in parallel])
+        self.assertEqual(problems, [r.problem for r in parallel])
+        self.assertEqual([True, True, True, False], [r.is_proven for r in parallel])
+        self.assertEqual([False, False, False, True], [r.statistics.saturated for r in parallel])
+
+    def test_search_many_invalid(self):
+        problems = [ProofProblem([], Conjunction(parse("p"), parse("q")))]
+
+        with self.assertRaises(InvalidMendelsonProblem):
+            list(BruteForceMendelsonProver().search_many(problems, processes=2))
+
+    parallel_data_provider = lambda: (
+        (SearchStrategy.BREADTH_FIRST, 1),
+        (SearchStrategy.BREADTH_FIRST, 2),
+        (SearchStrategy.BREADTH_FIRST, 3),
+        (SearchStrategy.ITERATIVE_DEEPENING, 2),
+    )
+
+    @data_provider(parallel_data_provider)
+    def test_prove_parallel_matches_sequential(self, strategy, processes):
+        problems = [
+            ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")),
+            ProofProblem([parse("-p => q"), parse("-p => -q")], parse("p")),
+            ProofProblem([parse("p")], parse("q")),
+        ]
+
+        for problem in problems:
+            expected = BruteForceMendelsonProver(strategy).search(problem)
+            result = BruteForceMendelsonProver(strategy, processes=processes).search(problem)
+
+            self.assertEqual(expected.proof, result.proof)
+            self.assertEqual(expected.statistics.nodes_generated, result.statistics.nodes_generated)
+            self.assertEqual(expected.statistics.nodes_expanded, result.statistics.nodes_expanded)
+
+    def test_prove_parallel_with_lemmas(self):
+        problem = ProofProblem([parse("(p => p) => q")], parse("q"))
+        results = []
+        for processes in (None, 2):
+            cache = ProofCache()
+            BruteForceMendelsonProver(cache=cache)(ProofProblem([], parse("a => a")))
+            prover = BruteForceMendelsonProver(max_depth=2, cache=cache, processes=processes)
+            results.append(prover.search(problem))
+
+        self.assertEqual(True, results[0].is_proven)
+        self.assertEqual(results[0].proof, results[1].proof)
+        self.assertEqual(results[0].statistics.nodes_generated, results[1].statistics.nodes_generated)
+
+    def test_prove_parallel_node_budget(self):
+        problem = ProofProblem([parse("p => q"), parse("q => r")], parse("p => r"))
+
+        result = BruteForceMendelsonProver(max_nodes=10, processes=2).search(problem)
+
+        self.assertEqual(False, result.is_proven)
+        self.assertEqual(
+            BruteForceMendelsonProver(max_nodes=10).search(problem).statistics.nodes_generated,
+            result.statistics.nodes_generated
+        )
+
+    def test_prove_parallel_best_first(self):
+        with self.assertRaises(ValueError):
+            BruteForceMendelsonProver(SearchStrategy.BEST_FIRST, processes=2)
+
+class ProofCheckerTest(TestCase):
+    def test_check_prover_proofs(self):
+        problems = [
+            ProofProblem([], parse("p => p")),
+            ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")),
+            ProofProblem([parse("-p => q"), parse("-p => -q")], parse("p")),
+        ]
+        checker = ProofChecker()
+
+        for strategy in (SearchStrategy.BREADTH_FIRST, SearchStrategy.BEST_FIRST):
+            prover = BruteForceMendelsonProver(strategy)
+            for problem in problems:
+                self.assertEqual(ProofCheckResult(), checker.check(problem, prover(problem)))
+
+    def test_check_premise_steps(self):
+        sentence_p = parse("p")
+        implication = parse("p => q")
+        problem = ProofProblem([sentence_p, implication], parse("q"))
+
+        result = ProofChecker().check(problem, [
+            Premise(sentence_p), Premise(implication), ImplicationElimination(implication)
+        ])
+
+        self.assertEqual(True, result.is_valid)
+
+    invalid_proof_data_provider = lambda: (
+        ([Premise(parse("q"))], 0),
+        ([ImplicationElimination(parse("q => r"))], 0),
+        ([ImplicationElimination(parse("p => q")), ImplicationElimination(parse("r => q"))], 1),
+        ([ImplicationCreation(parse("p"), parse("p ^ q"))], 0),
+        ([ImplicationElimination(parse("p => q")), parse("q")], 1),
+        ([ImplicationCreation(parse("p"), parse("q"))], 1),
+    )
+
+    @data_provider(invalid_proof_data_provider)
+    def test_check_invalid(self, proof, expected_index):
+        problem = ProofProblem([parse("p"), parse("p => q"), parse("r => q")], parse("r"))
+
+        result = ProofChecker().check(problem, proof)
+
+        self.assertEqual(False, result.is_valid)
+        self.assertEqual(expected_index, result.step_index)
+
+    def test_check_long_proof(self):
+        atoms = [SimpleSentence(PropositionalConstant("p%d" % i)) for i in range(20001)]
+        implications = [Implication(a, b) for a, b in zip(atoms, atoms[1:])]
+        problem = ProofProblem([atoms[0]] + implications, atoms[-1])
+        proof = [ImplicationElimination(i) for i in implications]
+
+        self.assertEqual(True, ProofChecker().check(problem, proof).is_valid)
+        self.assertEqual(10000, ProofChecker().check(problem, proof[:10000] + proof[10001:]).step_index)
+
+class ProofCacheTest(TestCase):
+    def test_canonical_hit(self):
+        cache = ProofCache()
+        prover = BruteForceMendelsonProver(cache=cache)
+        prover(ProofProblem([], parse("a => a")))
+
+        result = prover.search(ProofProblem([], parse("b => b")))
+
+        self.assertEqual(True, result.statistics.from_cache)
+        self.assertEqual(parse("b => b"), result.proof[-1].resulting_premise)
+        self.assertEqual(True, ProofChecker().check(result.problem, result.proof).is_valid)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_premises_renamed(self):
+        cache = ProofCache()
+        prover = BruteForceMendelsonProver(cache=cache)
+        prover(ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")))
+
+        problem = ProofProblem([parse("y => z"), parse("x => y")], parse("x => z"))
+        result = prover.search(problem)
+
+        self.assertEqual(True, result.statistics.from_cache)
+        self.assertEqual(True, ProofChecker().check(problem, result.proof).is_valid)
+
+    def test_evicts_least_recently_used(self):
+        cache = ProofCache(capacity=1)
+        prover = BruteForceMendelsonProver(cache=cache)
+        prover(ProofProblem([], parse("a => a")))
+        prover(ProofProblem([parse("p")], parse("q => p")))
+
+        self.assertNotIn(ProofProblem([], parse("a => a")), cache)
+        self.assertIn(ProofProblem([parse("a")], parse("b => a")), cache)
+        self.assertEqual(1, len(cache))
+
+    def test_unproven_not_cached(self):
+        cache = ProofCache()
+
+        BruteForceMendelsonProver(cache=cache)(ProofProblem([parse("p")], parse("q")))
+
+        self.assertEqual(0, len(cache))
+
+    def test_theorems_spliced_as_lemmas(self):
+        cache = ProofCache()
+        problem = ProofProblem([parse("(p => p) => q")], parse("q"))
+        uncached = BruteForceMendelsonProver().search(problem)
+        prover = BruteForceMendelsonProver(max_depth=2, cache=cache)
+        self.assertEqual(tuple(), prover(problem))
+        BruteForceMendelsonProver(cache=cache)(ProofProblem([], parse("a => a")))
+
+        result = prover.search(problem)
+
+        self.assertEqual(False, result.statistics.from_cache)
+        self.assertEqual(True, ProofChecker().check(problem, result.proof).is_valid)
+        self.assertLess(result.statistics.nodes_expanded, uncached.statistics.nodes_expanded)
+        self.assertEqual([(('v1', 'v1', '=>'))], [c for c, _ in cache.theorems()])
+
+    def test_persisted(self):
+        directory = mkdtemp()
+        try:
+            path = join(directory, 'proofs.db')
+            cache = ProofCache(path=path)
+            BruteForceMendelsonProver(cache=cache)(ProofProblem([], parse("a => a")))
+            cache.close()
+
+            cache = ProofCache(path=path)
+            result = BruteForceMendelsonProver(cache=cache).search(
+                ProofProblem([], parse("c => c"))
+            )
+            theorems = cache.theorems()
+            cache.invalidate()
+            cache.close()
+        finally:
+            rmtree(directory)
+
+        self.assertEqual(True, result.statistics.from_cache)
+        self.assertEqual(5, len(result.proof))
+        self.assertEqual(1, len(theorems))
+
+    def test_search_many(self):
+        problems = [
+            ProofProblem([parse("p => q"), parse("q => r")], parse("p => r")),
+            ProofProblem([], parse("p => p")),
+        ]
+        prover = BruteForceMendelsonProver(cache=ProofCache())
+
+        first = list(prover.search_many(problems, processes=2))
+        second = list(prover.search_many(problems, processes=2))
+
+        self.assertEqual([r.proof for r in first], [r.proof for r in second])
+        self.assertEqual([False, False], [r.statistics.from_cache for r in first])
+        self.assertEqual([True, True], [r.statistics.from_cache for r in second])
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            ProofCache(capacity=0)
@@ -0,0 +1,174 @@
+from itertools import product
+from random import Random
+from unittest import TestCase
+from logic.sat import Solver, TseitinEncoder, find_satisfying_assignment
+from logic.syntax import *
+from logic.language import *
+from utils import data_provider
+
+def brute_force_satisfiable(num_variables, clauses):
+    for values in product((True, False), repeat=num_variables):
+        if all(any(values[abs(l) - 1] == (l > 0) for l in c) for c in clauses):
+            return True
+    return False
+
+def pigeonhole_clauses(num_pigeons, num_holes):
+    variable = lambda pigeon, hole: pigeon * num_holes + hole + 1
+    clauses = [
+        [variable(p, h) for h in range(num_holes)]
+        for p in range(num_pigeons)
+    ]
+    for h in range(num_holes):
+        for p1 in range(num_pigeons):
+            for p2 in range(p1 + 1, num_pigeons):
+                clauses.append([-variable(p1, h), -variable(p2, h)])
+    return clauses
+
+class SolverTest(TestCase):
+    clauses_data_provider = lambda: (
+        (True, []),
+        (True, [[1]]),
+        (False, [[1], [-1]]),
+        (True, [[1, 2], [-1, 2], [1, -2]]),
+        (False, [[1, 2], [-1, 2], [1, -2], [-1, -2]]),
+        (True, [[1, -1]]),
+        (False, [[]])
+    )
+
+    @data_provider(clauses_data_provider)
+    def test_solve(self, expected, clauses):
+        solver = Solver()
+        for clause in clauses:
+            solver.add_clause(clause)
+
+        result = solver.solve()
+
+        self.assertEqual(expected, result)
+
+    def test_model_satisfies_clauses(self):
+        clauses = [[1, 2, 3], [-1, -2], [-2, -3], [-1, -3], [2, -3]]
+        solver = Solver()
+        for clause in clauses:
+            solver.add_clause(clause)
+
+        solver.solve()
+
+        for clause in clauses:
+            self.assertEqual(True, any([solver.model_value(l) for l in clause]))
+
+    def test_pigeonhole_unsatisfiable(self):
+        solver = Solver()
+        for clause in pigeonhole_clauses(6, 5):
+            solver.add_clause(clause)
+
+        result = solver.solve()
+
+        self.assertEqual(False, result)
+
+    def test_random_clauses_match_brute_force(self):
+        random = Random(42)
+        for _ in range(300):
+            num_variables = random.randint(1, 8)
+            clauses = [
+                [random.choice((1, -1)) * random.randint(1, num_variables) for _ in range(3)]
+                for _ in range(random.randint(1, 40))
+            ]
+            solver = Solver()
+            for clause in clauses:
+                solver.add_clause(clause)
+
+            result = solver.solve()
+
+            self.assertEqual(brute_force_satisfiable(num_variables, clauses), result)
+
+    def test_add_clause_after_solve(self):
+        solver = Solver()
+        solver.add_clause([1, 2])
+        solver.solve()
+        solver.add_clause([-1])
+        solver.add_clause([-2])
+
+        result = solver.solve()
+
+        self.assertEqual(False, result)
+
+    def test_assumptions_match_brute_force(self):
+        random = Random(7)
+        for _ in range(100):
+            num_variables = random.randint(1, 8)
+            clauses = [
+                [random.choice((1, -1)) * random.randint(1, num_variables) for _ in range(3)]
+                for _ in range(random.randint(1, 30))
+            ]
+            solver = Solver()
+            for clause in clauses:
+                solver.add_clause(clause)
+
+            for _ in range(5):
+                assumptions = [
+                    random.choice((1, -1)) * random.randint(1, num_variables)
+                    for _ in range(random.randint(0, 3))
+                ]
+
+                result = solver.solve(assumptions)
+
+                expected = brute_force_satisfiable(
+                    num_variables, clauses + [[literal] for literal in assumptions]
+                )
+                self.assertEqual(expected, result)
+                if result:
+                    self.assertEqual(True, all([solver.model_value(l) for l in assumptions]))
+
+    def test_failed_assumptions_keep_solver_usable(self):
+        solver = Solver()
+        solver.add_clause([1, 2])
+
+        self.assertEqual(False, solver.solve([-1, -2]))
+        self.assertEqual(True, solver.solve([-1]))
+        self.assertEqual(True, solver.model_value(2))
+
+class TseitinEncoderTest(TestCase):
+    def test_constants_share_variables(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        encoder = TseitinEncoder()
+
+        encoder.encode(Conjunction(a, Negation(a)))
+
+        self.assertEqual(1, len(encoder.constants_to_variables))
+
+    def test_negation_reuses_literal(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        encoder = TseitinEncoder()
+
+        literal = encoder.encode(Negation(Negation(a)))
+
+        self.assertEqual(encoder.encode(a), literal)
+        self.assertEqual(1, encoder.num_variables)
+
+class FindSatisfyingAssignmentTest(TestCase):
+    def test_satisfiable(self):
+        a = PropositionalConstant("a")
+        b = PropositionalConstant("b")
+        sentence = Conjunction(SimpleSentence(a), Negation(SimpleSentence(b)))
+
+        result = find_satisfying_assignment(sentence)
+
+        self.assertEqual(TruthAssignment({a : True, b : False}), result)
+
+    def test_unsatisfiable(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+
+        result = find_satisfying_assignment(Equivalence(a, Negation(a)))
+
+        self.assertEqual(None, result)
+
+    def test_many_constants(self):
+        constants = [SimpleSentence(PropositionalConstant("c%d" % i)) for i in range(2000)]
+        chain = constants[0]
+        for constant in constants[1:]:
+            chain = Conjunction(chain, constant)
+        sentence = Conjunction(chain, Negation(Disjunction(constants[0], constants[1])))
+
+        result = find_satisfying_assignment(sentence)
+
+        self.assertEqual(None, result)
@@ -0,0 +1,122 @@
+from unittest import TestCase
+from utils import data_provider
+from logic.language import PropositionalConstant
+from logic.parser import parse
+from logic.simplify import *
+from logic.syntax import *
+
+class SimplifyTest(TestCase):
+    rules_data_provider = lambda: (
+        ('a ^ a', 'a', 'idempotence'),
+        ('--a', 'a', 'double_negation'),
+        ('---a', '-a', 'double_negation'),
+        ('a | (a ^ b)', 'a', 'absorption'),
+        ('(b | a) ^ a', 'a', 'absorption'),
+        ('(a ^ -a) | b', 'b', 'complement'),
+        ('(a | -a) ^ b', 'b', 'complement'),
+        ('(a => a) ^ b', 'b', 'tautology'),
+        ('(a <=> a) => b', 'b', 'tautology'),
+        ('(a <=> -a) | b', 'b', 'complement'),
+        ('a => -a', '-a', 'complement'),
+        ('-(a ^ -a) <=> b', 'b', 'constant'),
+        ('(a ^ b) ^ a', '(a ^ b)', 'idempotence'),
+    )
+
+    @data_provider(rules_data_provider)
+    def test_rules(self, text, expected, rule):
+        result = simplify(parse(text))
+
+        self.assertEqual(parse(expected), result.sentence)
+        self.assertIn(rule, result.rule_counts)
+        self.assertEqual(SimplificationMethod.RULES, result.method)
+
+    def test_statistics(self):
+        result = simplify(parse('--(a ^ a)'))
+
+        self.assertEqual(5, result.original_size)
+        self.assertEqual(1, result.simplified_size)
+        self.assertEqual(0.8, result.reduction)
+        self.assertEqual({'double_negation': 1, 'idempotence': 1}, result.rule_counts)
+
+    def test_contradiction_materialised(self):
+        result = simplify(parse('(b ^ -b) | (a ^ -a)'))
+
+        self.assertEqual(parse('a ^ -a'), result.sentence)
+
+    truth_value_without_constants_data_provider = lambda: (
+        (SentenceSet([]), True),
+        (Negation(SentenceSet([])), False),
+        (Conjunction(SentenceSet([]), Negation(SentenceSet([]))), False),
+        (Disjunction(Negation(SentenceSet([])), SentenceSet([])), True),
+    )
+
+    @data_provider(truth_value_without_constants_data_provider)
+    def test_truth_value_without_constants(self, sentence, expected):
+        result = simplify(sentence)
+
+        self.assertEqual(expected, result.sentence.is_valid)
+        self.assertEqual(expected, result.sentence.is_satisfiable)
+        self.assertEqual(True, sentence.is_logically_equivalent(result.sentence))
+
+    def test_never_grows(self):
+        result = simplify(parse('a => a'))
+
+        self.assertEqual(parse('a => a'), result.sentence)
+        self.assertEqual(SimplificationMethod.NONE, result.method)
+
+    def test_minimise_dnf(self):
+        result = simplify(parse('(a ^ b) | (a ^ -b)'), minimise=True)
+
+        self.assertEqual(parse('a'), result.sentence)
+        self.assertEqual(SimplificationMethod.DNF, result.method)
+
+    def test_minimise_cnf(self):
+        result = simplify(parse('((a ^ b) | c) ^ a'), minimise=True)
+
+        self.assertEqual(parse('a ^ (b | c)'), result.sentence)
+        self.assertEqual(SimplificationMethod.CNF, result.method)
+
+    def test_minimise_skipped_for_large_vocabulary(self):
+        sentence = parse('(a ^ b) | (a ^ -b)')
+
+        result = simplify(sentence, minimise=True, max_minimise_constants=1)
+
+        self.assertEqual(sentence, result.sentence)
+
+    def test_results_equivalent(self):
+        for text in ('(a => b) <=> (-b => -a)', '-(a <= (b ^ --c)) | (c ^ c)', 'a ^ (b | (a ^ c))'):
+            sentence = parse(text)
+            for minimise in (False, True):
+                result = simplify(sentence, minimise)
+
+                self.assertEqual(True, sentence.is_logically_equivalent(result.sentence))
+
+    def test_sentence_set(self):
+        result = simplify(SentenceSet([parse('--a'), parse('b | -b')]))
+
+        self.assertEqual(SentenceSet([parse('a')]), result.sentence)
+
+    def test_memoised_across_calls(self):
+        simplifier = Simplifier()
+        shared = parse('--a')
+
+        simplifier.simplify(Conjunction(shared, parse('b')))
+        result = simplifier.simplify(Disjunction(shared, parse('c')))
+
+        self.assertEqual({}, result.rule_counts)
+        self.assertEqual(parse('a | c'), result.sentence)
+
+class QuineMcCluskeyTest(TestCase):
+    def test_prime_implicants(self):
+        result = prime_implicants([0, 1, 2, 5, 6, 7], 3)
+
+        self.assertEqual(set([(0, 1), (0, 2), (2, 4), (1, 4), (5, 2), (6, 1)]), result)
+
+    def test_minimum_cover(self):
+        minterms = [0, 1, 2, 5, 6, 7]
+
+        result = minimum_cover(minterms, prime_implicants(minterms, 3))
+
+        self.assertEqual(3, len(result))
+        for minterm in minterms:
+            self.assertEqual(True, any([minterm & ~mask == value for value, mask in result]))
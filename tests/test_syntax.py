@@ -23,6 +23,15 @@ class SimpleSentenceTest(TestCase):
         with self.assertRaises(ConstantDoesntExistException):
             sentence.eval(assignment)
 
+    def test_compiled_eval_not_found(self):
+        constant = PropositionalConstant("hello")
+        other_constant = PropositionalConstant("world")
+        sentence = Conjunction(SimpleSentence(constant), SimpleSentence(other_constant))
+        assignment = TruthAssignment({constant : True})
+
+        with self.assertRaises(ConstantDoesntExistException):
+            sentence.compile().eval(assignment)
+
     def test_all_constants(self):
         constant = PropositionalConstant("hello")
         sentence = SimpleSentence(constant)
@@ -63,6 +72,27 @@ class AbstractSentenceTest(object):
         self.assertEqual(False, result.is_equivalent)
         self.assertEqual(False, bool_result)
 
+    def test_lazy_logical_equivalence_matches_eager(self):
+        example = self.create_example_sentence()
+        negation = Negation(example)
+
+        for other in (example, negation):
+            eager = example.determine_logical_equivalence(other)
+            lazy = example.determine_logical_equivalence(other, lazy=True)
+
+            self.assertEqual(eager.is_equivalent, lazy.is_equivalent)
+            self.assertEqual(eager.equivalent_assignments, lazy.equivalent_assignments)
+            self.assertEqual(eager.unequivalent_assignments, lazy.unequivalent_assignments)
+
+    def test_lazy_logical_equivalence_counterexample(self):
+        example = self.create_example_sentence()
+        negation = Negation(example)
+
+        result = example.determine_logical_equivalence(negation, lazy=True)
+
+        self.assertIn(result.counterexample, result.unequivalent_assignments)
+        self.assertEqual(None, example.determine_logical_equivalence(example, lazy=True).counterexample)
+
     def test_logically_entails_self(self):
         example = self.create_example_sentence()
 
@@ -78,6 +108,80 @@ class AbstractSentenceTest(object):
 
         self.assertEqual(False, result)
 
+    def test_eval_bits_matches_eval(self):
+        example = self.create_example_sentence()
+
+        for bit_assignment in example.vocabulary.iter_bit_assignments(rows_per_block=2):
+            bits = example.eval_bits(bit_assignment)
+            results = list(bit_assignment.iter_values(bits))
+
+            expected = [
+                example.eval(bit_assignment.assignment(row))
+                for row in range(bit_assignment.num_rows)
+            ]
+            self.assertEqual(expected, results)
+
+    def test_compile_matches_eval(self):
+        example = self.create_example_sentence()
+        compiled = example.compile()
+
+        for assignment in example.vocabulary.iter_assignments():
+            values = [assignment.get(c) for c in compiled.constants]
+
+            self.assertEqual(example.eval(assignment), compiled.eval(assignment))
+            self.assertEqual(example.eval(assignment), compiled(*values))
+
+    def test_compile_is_cached(self):
+        example = self.create_example_sentence()
+
+        self.assertIs(example.compile(), example.compile())
+
+    def test_count_models_matches_truth_table(self):
+        example = self.create_example_sentence()
+
+        expected = sum(
+            bin(example.eval_bits(bit_assignment)).count('1')
+            for bit_assignment in example.vocabulary.iter_bit_assignments()
+        )
+
+        self.assertEqual(expected, example.count_models())
+
+    def test_iter_models(self):
+        example = self.create_example_sentence()
+
+        result = list(example.iter_models())
+
+        self.assertEqual(example.count_models(), len(set(result)))
+        self.assertEqual(True, all([example.eval(m) for m in result]))
+        self.assertEqual(result[1:3], list(example.iter_models(limit=2, offset=1)))
+
+    def test_decision_methods_agree(self):
+        example = self.create_example_sentence()
+        other = Disjunction(example, SimpleSentence(PropositionalConstant("other")))
+
+        for method in (DecisionMethod.SAT, DecisionMethod.TRUTH_TABLE, DecisionMethod.BDD):
+            self.assertEqual(True, example.logically_entails(other, method))
+            self.assertEqual(False, other.logically_entails(example, method))
+            self.assertEqual(False, example.is_logically_equivalent(other, method))
+
+    def test_find_entailment_counterexample(self):
+        example = self.create_example_sentence()
+        negation = Negation(example)
+
+        result = example.find_entailment_counterexample(negation)
+
+        self.assertEqual(True, example.eval(result))
+        self.assertEqual(False, negation.eval(result))
+
+    def test_is_contingent(self):
+        example = self.create_example_sentence()
+
+        self.assertEqual(True, example.is_contingent)
+        self.assertEqual(True, example.is_satisfiable)
+        self.assertEqual(True, example.is_falsifiable)
+        self.assertEqual(False, example.is_valid)
+        self.assertEqual(False, example.is_unsatisfiable)
+
     def test_hash(self):
         example = self.create_example_sentence()
 
@@ -85,6 +189,345 @@ class AbstractSentenceTest(object):
 
         self.assertEqual(int, type(result))
 
+class SentencePropertiesTest(TestCase):
+    def test_valid(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        sentence = Disjunction(a, Negation(a))
+
+        self.assertEqual(True, sentence.is_valid)
+        self.assertEqual(False, sentence.is_contingent)
+        self.assertEqual(None, sentence.find_countermodel())
+
+    def test_unsatisfiable(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        sentence = Conjunction(a, Negation(a))
+
+        self.assertEqual(True, sentence.is_unsatisfiable)
+        self.assertEqual(False, sentence.is_contingent)
+        self.assertEqual(None, sentence.find_model(DecisionMethod.TRUTH_TABLE))
+
+    def test_find_equivalence_counterexample(self):
+        a = PropositionalConstant("a")
+        b = PropositionalConstant("b")
+        implication = Implication(SimpleSentence(a), SimpleSentence(b))
+        reduction = Reduction(SimpleSentence(a), SimpleSentence(b))
+
+        result = implication.find_equivalence_counterexample(reduction)
+
+        self.assertNotEqual(implication.eval(result), reduction.eval(result))
+
+    def test_unknown_method(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+
+        with self.assertRaises(ValueError):
+            a.find_model("unknown")
+
+class SentenceInternerTest(TestCase):
+    def test_create_returns_same_instance(self):
+        interner = SentenceInterner()
+        a = interner.create(SimpleSentence, PropositionalConstant("a"))
+        b = interner.create(SimpleSentence, PropositionalConstant("b"))
+
+        result_1 = interner.create(Conjunction, a, interner.create(Negation, b))
+        result_2 = interner.create(Conjunction, a, interner.create(Negation, b))
+
+        self.assertIs(result_1, result_2)
+        self.assertIs(a, interner.create(SimpleSentence, PropositionalConstant("a")))
+
+    def test_intern_tree(self):
+        interner = SentenceInterner()
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        sentence = Disjunction(
+            Conjunction(a, b),
+            Conjunction(SimpleSentence(PropositionalConstant("a")), b)
+        )
+
+        result = interner.intern(sentence)
+
+        self.assertEqual(sentence, result)
+        self.assertIs(result.sub_sentences[0], result.sub_sentences[1])
+        self.assertIs(result, interner.intern(Disjunction(Conjunction(a, b), Conjunction(a, b))))
+        self.assertIn(result, interner)
+
+    def test_unreferenced_sentences_released(self):
+        interner = SentenceInterner()
+        interner.intern(Negation(SimpleSentence(PropositionalConstant("a"))))
+
+        self.assertEqual(0, len(interner))
+
+class PostfixTest(TestCase):
+    def test_round_trip(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        sentence = Equivalence(
+            Implication(Negation(a), Reduction(a, b)),
+            Disjunction(Conjunction(a, b), b)
+        )
+
+        postfix = sentence_to_postfix(sentence)
+        result = sentence_from_postfix(postfix)
+
+        self.assertEqual(
+            ('a', '-', 'a', 'b', '<=', '=>', 'a', 'b', '^', 'b', '|', '<=>'),
+            postfix
+        )
+        self.assertEqual(sentence, result)
+
+    def test_sentence_set_unsupported(self):
+        with self.assertRaises(ValueError):
+            sentence_to_postfix(SentenceSet([]))
+
+    def test_substitutions(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+
+        result = sentence_from_postfix(('a', 'b', '=>', 'a', '^'), substitutions={'a': Negation(b)})
+
+        self.assertEqual(Conjunction(Implication(Negation(b), b), Negation(b)), result)
+
+class LazyLogicalEquivalenceTest(TestCase):
+    def setUp(self):
+        self.scans = []
+        self.scanned = []
+        self.iter_equivalence_assignments = Sentence.iter_equivalence_assignments
+
+        def counting(sentence, other, equivalent=True):
+            self.scans.append(equivalent)
+            for assignment in self.iter_equivalence_assignments(sentence, other, equivalent):
+                self.scanned.append(assignment)
+                yield assignment
+        Sentence.iter_equivalence_assignments = counting
+
+    def tearDown(self):
+        Sentence.iter_equivalence_assignments = self.iter_equivalence_assignments
+
+    def test_stops_at_first_counterexample(self):
+        constants = [PropositionalConstant("p%d" % i) for i in range(20)]
+        first = SimpleSentence(constants[0])
+        for constant in constants[1:]:
+            first = Conjunction(first, SimpleSentence(constant))
+        second = Negation(first)
+
+        result = first.determine_logical_equivalence(second, lazy=True)
+
+        self.assertEqual(False, result.is_equivalent)
+        self.assertEqual(True, first.eval(result.counterexample))
+        self.assertEqual(False, result.is_equivalent)
+        self.assertEqual([False], self.scans)
+        self.assertEqual(1, len(self.scanned))
+
+    def test_equivalent_scanned_once(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        first = Implication(a, b)
+        second = Disjunction(Negation(a), b)
+
+        result = first.determine_logical_equivalence(second, lazy=True)
+
+        self.assertEqual(True, result.is_equivalent)
+        self.assertEqual(True, result.is_equivalent)
+        self.assertEqual(None, result.counterexample)
+        self.assertEqual([False], self.scans)
+
+    def test_equals_eager(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+
+        self.assertEqual(
+            a.determine_logical_equivalence(Disjunction(a, b)),
+            a.determine_logical_equivalence(Disjunction(a, b), lazy=True)
+        )
+
+class ModelCountingTest(TestCase):
+    def setUp(self):
+        sentence = None
+        for i in range(60):
+            constant = SimpleSentence(PropositionalConstant("p%02d" % i))
+            sentence = constant if sentence is None else Disjunction(sentence, constant)
+        self.large_disjunction = sentence
+
+    def test_count_models_large_vocabulary(self):
+        self.assertEqual(2 ** 60 - 1, self.large_disjunction.count_models())
+
+    def test_iter_models_offset_large_vocabulary(self):
+        result = list(self.large_disjunction.iter_models(offset=2 ** 60 - 2))
+
+        self.assertEqual(1, len(result))
+        self.assertEqual([True], [v for v in result[0].constants_to_value.values() if v])
+
+    def test_unsatisfiable(self):
+        sentence = Conjunction(
+            SimpleSentence(PropositionalConstant("a")),
+            Negation(SimpleSentence(PropositionalConstant("a")))
+        )
+
+        self.assertEqual(0, sentence.count_models())
+        self.assertEqual([], list(sentence.iter_models()))
+
+class DeepSentenceTest(TestCase):
+    def setUp(self):
+        self.a = SimpleSentence(PropositionalConstant("a"))
+        self.b = SimpleSentence(PropositionalConstant("b"))
+        self.depth = 20000
+
+    def create_chain(self):
+        sentence = self.a
+        for i in range(self.depth):
+            sentence = Conjunction(sentence, self.b) if i % 2 else Implication(sentence, Negation(self.b))
+        return sentence
+
+    def test_eval(self):
+        sentence = self.create_chain()
+
+        result = sentence.eval(TruthAssignment({self.a.constant: True, self.b.constant: True}))
+
+        self.assertEqual(True, result)
+
+    partial_assignment_data_provider = lambda: (
+        (Conjunction, False, False),
+        (Disjunction, True, True),
+        (Implication, False, True),
+        (Reduction, True, True),
+    )
+
+    @data_provider(partial_assignment_data_provider)
+    def test_eval_short_circuits(self, sentence_class, a_value, expected):
+        assignment = TruthAssignment({self.a.constant: a_value})
+        shallow = sentence_class(self.a, self.b)
+        deep = self.a
+        for _ in range(MAX_RECURSIVE_DEPTH + 10):
+            deep = Negation(Negation(deep))
+        deep = sentence_class(deep, self.b)
+
+        self.assertEqual(expected, shallow.eval(assignment))
+        self.assertEqual(expected, deep.eval(assignment))
+        with self.assertRaises(ConstantDoesntExistException):
+            sentence_class(self.b, self.a).eval(assignment)
+
+    def test_eval_bits(self):
+        sentence = self.create_chain()
+        bit_assignment = next(sentence.vocabulary.iter_bit_assignments())
+
+        result = list(bit_assignment.iter_values(sentence.eval_bits(bit_assignment)))
+
+        self.assertEqual([
+            sentence.eval(bit_assignment.assignment(row)) for row in range(4)
+        ], result)
+        self.assertEqual([True, False, False, False], result)
+
+    def test_str(self):
+        result = str(self.create_chain())
+
+        self.assertEqual('(' * self.depth + 'a => -b)', result[:self.depth + 8])
+        self.assertEqual(' ^ b)', result[-5:])
+
+    def test_repr(self):
+        result = repr(self.create_chain())
+
+        self.assertEqual(True, result.startswith('Conjunction(Implication(Conjunction('))
+        self.assertEqual(True, result.endswith("SimpleSentence(PropositionalConstant('b')))"))
+
+    def test_equality(self):
+        self.assertEqual(self.create_chain(), self.create_chain())
+        self.assertNotEqual(self.create_chain(), Negation(self.create_chain()))
+
+    def test_all_constants(self):
+        self.assertEqual(
+            frozenset([self.a.constant, self.b.constant]),
+            self.create_chain().all_constants
+        )
+
+    def test_str_matches_nested_rendering(self):
+        sentence = Negation(Equivalence(Negation(self.a), Disjunction(self.a, Negation(Negation(self.b)))))
+
+        self.assertEqual('-((-a <=> (a | --b)))', str(sentence))
+
+class SharedEvaluationTest(TestCase):
+    def setUp(self):
+        self.a = SimpleSentence(PropositionalConstant("a"))
+        self.b = SimpleSentence(PropositionalConstant("b"))
+        self.c = SimpleSentence(PropositionalConstant("c"))
+        self.shared = Conjunction(self.a, Disjunction(self.b, self.c))
+        self.sentences = [
+            Conjunction(self.a, self.b),
+            Implication(self.c, self.shared),
+            Equivalence(Negation(self.shared), Reduction(self.a, self.c)),
+            SentenceSet([self.shared, self.b])
+        ]
+
+    def test_matches_eval_bits(self):
+        vocab = SentenceSet(self.sentences).vocabulary
+
+        for bit_assignment in vocab.iter_bit_assignments(rows_per_block=4):
+            self.assertEqual(
+                [s.eval_bits(bit_assignment) for s in self.sentences],
+                eval_bits_shared(self.sentences, bit_assignment)
+            )
+
+    def test_memo_holds_each_distinct_sub_sentence(self):
+        bit_assignment = next(SentenceSet(self.sentences).vocabulary.iter_bit_assignments())
+        memo = {}
+
+        eval_bits_shared(self.sentences, bit_assignment, memo)
+
+        self.assertEqual(
+            set(distinct_sub_sentences(self.sentences)),
+            set(memo.keys())
+        )
+
+    def test_distinct_sub_sentences_order(self):
+        result = distinct_sub_sentences([Implication(self.c, self.shared), self.shared])
+
+        self.assertEqual([
+            self.c,
+            self.a,
+            self.b,
+            Disjunction(self.b, self.c),
+            self.shared,
+            Implication(self.c, self.shared)
+        ], result)
+
+class CachedPropertiesTest(TestCase):
+    def test_depth(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        sentence = Implication(Negation(Negation(a)), a)
+
+        self.assertEqual(1, a.depth)
+        self.assertEqual(4, sentence.depth)
+
+    def test_equal_structures_hash_equal(self):
+        sentence_1 = Equivalence(
+            SimpleSentence(PropositionalConstant("a")),
+            Negation(SimpleSentence(PropositionalConstant("b")))
+        )
+        sentence_2 = Equivalence(
+            SimpleSentence(PropositionalConstant("a")),
+            Negation(SimpleSentence(PropositionalConstant("b")))
+        )
+
+        self.assertEqual(sentence_1, sentence_2)
+        self.assertEqual(hash(sentence_1), hash(sentence_2))
+
+    def test_compact(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+
+        for sentence in (a, Negation(a), Conjunction(a, a), SentenceSet([a])):
+            self.assertEqual(False, hasattr(sentence, '__dict__'))
+
+    def test_negation_hash_differs_from_target(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+
+        self.assertNotEqual(hash(a), hash(Negation(a)))
+
+    def test_all_constants_shared_subtrees(self):
+        a = SimpleSentence(PropositionalConstant("a"))
+        b = SimpleSentence(PropositionalConstant("b"))
+        shared = Conjunction(a, b)
+        sentence = Disjunction(shared, Negation(shared))
+
+        self.assertEqual(frozenset([a.constant, b.constant]), sentence.all_constants)
+
 class SentenceSetTest(AbstractSentenceTest, TestCase):
     extract_vocabulary_data_provider = lambda: (
         (
@@ -137,6 +580,13 @@ class SentenceSetTest(AbstractSentenceTest, TestCase):
 
         self.assertEqual(expected, result)
 
+    def test_eq(self):
+        set_1 = SentenceSet([SimpleSentence(PropositionalConstant("a"))])
+        set_2 = SentenceSet([SimpleSentence(PropositionalConstant("a"))])
+
+        self.assertEqual(set_1, set_2)
+        self.assertEqual(hash(set_1), hash(set_2))
+
     def create_example_sentence(self):
         return SentenceSet([
             SimpleSentence(PropositionalConstant("a")),